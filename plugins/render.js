@@ -21,6 +21,24 @@ function getCrsp() {
   return _crsp;
 }
 
+// URL overrides from scripts/slug_index.py (built with the cascade by
+// npm run data): makes { category: { make: slug } } and overrides
+// { category: { make: { position: slug } } }, only for makes/entries whose
+// slug isn't plain slugify().
+const SLUG_INDEX_VERSION = 3;
+
+let _slugIndex = null;
+function getSlugIndex() {
+  if (!_slugIndex) {
+    const index = JSON.parse(readFileSync(resolve(ROOT, "data/slug_index.json"), "utf-8"));
+    if (index.v !== SLUG_INDEX_VERSION) {
+      throw new Error(`Unsupported slug index version: ${index.v} (rebuild with npm run data)`);
+    }
+    _slugIndex = index;
+  }
+  return _slugIndex;
+}
+
 // ── KRA constants ─────────────────────────────────────────────────────────
 
 const AD_SLOT_INFEED  = "4007052987"; // AdSense fluid in-feed slot, shown in-content after the vehicle details card
@@ -45,12 +63,13 @@ const DEPRECIATION = [
 
 // ── Helpers ───────────────────────────────────────────────────────────────
 
+// Same output as scripts/slugs.py
 export function slugify(s) {
   return String(s).toLowerCase()
     .replace(/[^a-z0-9\s-]/g, "")
+    .trim()
     .replace(/\s+/g, "-")
-    .replace(/-+/g, "-")
-    .trim();
+    .replace(/-+/g, "-");
 }
 
 function kes(n) {
@@ -81,15 +100,17 @@ function calcDuty(crsp, year) {
   };
 }
 
-// Build a slug→index lookup for a make's models
-function buildModelIndex(models) {
-  const seen = {};
-  return models.map((m, i) => {
-    let slug = slugify(m.model) || `model-${i}`;
-    if (seen[slug] !== undefined) slug = `${slug}-${i}`;
-    seen[slug] = i;
-    return { ...m, slug };
-  });
+// A make's page slug, as assigned by scripts/slug_index.py (unique within
+// the category)
+export function makeSlugFor(category, make) {
+  return getSlugIndex().makes[category]?.[make] || slugify(make);
+}
+
+// Attach each of a make's models its page slug, as assigned by
+// scripts/slug_index.py (unique within the make)
+export function buildModelIndex(category, make, models) {
+  const overrides = getSlugIndex().overrides[category]?.[make] || {};
+  return models.map((m, i) => ({ ...m, slug: overrides[i] || slugify(m.model) }));
 }
 
 /**
@@ -103,7 +124,7 @@ export function relatedVehicles(category, make, currentModel, limit = 6) {
   const models = data[category]?.[make];
   if (!models) return [];
 
-  const indexed = buildModelIndex(models);
+  const indexed = buildModelIndex(category, make, models);
   const others = indexed.filter(m => m.slug !== currentModel.slug);
   if (!others.length) return [];
 
@@ -129,8 +150,8 @@ export function relatedVehiclesCrossMake(category, currentMake, currentModel, li
   const base = typeof currentModel.crsp === "number" ? currentModel.crsp : 0;
   const pool = [];
   for (const [mk, models] of Object.entries(makes)) {
-    const mkSlug = slugify(mk);
-    for (const m of buildModelIndex(models)) {
+    const mkSlug = makeSlugFor(category, mk);
+    for (const m of buildModelIndex(category, mk, models)) {
       if (mk === currentMake && m.slug === currentModel.slug) continue; // exclude self
       pool.push({ make: mk, makeSlug: mkSlug, ...m });
     }
@@ -161,8 +182,8 @@ function findVehicleByComboSlug(comboSlug) {
       const makes = data[category];
       if (!makes) continue;
       for (const make of Object.keys(makes)) {
-        if (slugify(make) !== makeSlug) continue;
-        const indexed = buildModelIndex(makes[make]);
+        if (makeSlugFor(category, make) !== makeSlug) continue;
+        const indexed = buildModelIndex(category, make, makes[make]);
         const model = indexed.find(x => x.slug === modelSlug);
         if (model) {
           return { category, catSlug: slugify(category), make, makeSlug, model, models: indexed };
@@ -498,7 +519,7 @@ function renderCategoryPage(category, catSlug) {
   const totalModels = makeEntries.reduce((s, [, ms]) => s + ms.length, 0);
 
   const cards = makeEntries.map(([make, models]) => {
-    const makeSlug = slugify(make);
+    const makeSlug = makeSlugFor(category, make);
     return `
     <a href="/${catSlug}/${makeSlug}/"
        class="bg-surface border border-border rounded-xl px-4 py-3 hover:border-amber transition-colors block group">
@@ -542,7 +563,7 @@ function renderMakePage(category, catSlug, make, makeSlug) {
   const models = data[category]?.[make];
   if (!models) return null;
 
-  const indexed = buildModelIndex(models);
+  const indexed = buildModelIndex(category, make, models);
   const sorted  = [...indexed].sort((a, b) => a.model.localeCompare(b.model));
 
   const cards = sorted.map(m => {
@@ -597,7 +618,7 @@ function renderModelPage(category, catSlug, make, makeSlug, modelSlug) {
   const models = data[category]?.[make];
   if (!models) return null;
 
-  const indexed = buildModelIndex(models);
+  const indexed = buildModelIndex(category, make, models);
   const m = indexed.find(x => x.slug === modelSlug);
   if (!m) return null;
 
@@ -746,7 +767,7 @@ function renderYearPage(category, catSlug, make, makeSlug, modelSlug, year) {
   const models = data[category]?.[make];
   if (!models) return null;
 
-  const indexed = buildModelIndex(models);
+  const indexed = buildModelIndex(category, make, models);
   const m = indexed.find(x => x.slug === modelSlug);
   if (!m) return null;
 
@@ -1069,7 +1090,7 @@ export function renderUrl(pathname) {
 
   const makeBySlug = {};
   for (const make of Object.keys(data[category] || {})) {
-    makeBySlug[slugify(make)] = make;
+    makeBySlug[makeSlugFor(category, make)] = make;
   }
   const make = makeBySlug[makeSlug];
   if (!make) return null;
@@ -0,0 +1,294 @@
+"""
+Batch duty quotes for a whole shipment.
+
+Reads one unit per line — CSV with a header row, or NDJSON — with make,
+model, model_number and year (optional cc, fuel and tx narrow down models
+that share a name and number), resolves each against the CRSP cascade and
+writes the unit's full duty breakdown. Shipment totals and throughput go
+to stderr, and to --totals as JSON.
+
+  make,model,model_number,year
+  Toyota,Harrier,6AA-AXUH80-ANXGB,2022
+
+  {"make": "Toyota", "model": "Harrier", "model_number": "6AA-AXUH80-ANXGB", "year": 2022}
+
+Lookups go through an index keyed on normalised (make, model, model
+number), built once from the cascade; input is read and priced in chunks
+of --chunk lines (one calculate_duty_batch call each), so memory stays
+flat however long the input is.
+
+Every output row carries a status:
+  ok         priced
+  not_found  no CRSP entry for this make/model (/model number)
+  ambiguous  several entries with different CRSP values match; add
+             model_number, cc, fuel or tx to pick one
+  too_old    older than the age limit, cannot be imported
+  bad_input  missing make/model, or a year that isn't a number between
+             MIN_YEAR and the current year
+
+Run: python3 scripts/batch_quote.py [INPUT|-] [--out PATH] [--to csv|ndjson]
+                                    [--totals PATH] [--chunk 4096]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from crsp_store import load_cascade
+from duty import COMPONENTS, CURRENT_YEAR, REGIME, calculate_duty_batch
+
+KEY_FIELDS = ("make", "model", "model_number", "year")
+NARROW_FIELDS = ("cc", "fuel", "tx")
+OUT_FIELDS = ["line", "status", "make", "model", "model_number", "year", "category", "crsp",
+              "depr_pct"] + COMPONENTS + ["matches"]
+STATUSES = ("ok", "not_found", "ambiguous", "too_old", "bad_input")
+# Earlier years are typos, not vehicles (too_old covers the real ones)
+MIN_YEAR = 1900
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def norm(value):
+    """Case- and whitespace-insensitive lookup key."""
+    return _SPACE_RE.sub(" ", str(value or "")).strip().casefold()
+
+
+# ── Index ─────────────────────────────────────────────────────────────────
+
+class QuoteIndex:
+    """(make, model, model number) → CRSP entries, with (make, model) and
+    (make, model number) fallbacks for lines that leave one of them out."""
+
+    def __init__(self, cascade):
+        self.exact, self.by_model, self.by_number = {}, {}, {}
+        for category, makes in cascade["data"].items():
+            for make, models in makes.items():
+                mk = norm(make)
+                for entry in models:
+                    hit = (category, entry)
+                    model, mn = norm(entry["model"]), norm(entry.get("mn"))
+                    self.exact.setdefault((mk, model, mn), []).append(hit)
+                    self.by_model.setdefault((mk, model), []).append(hit)
+                    if mn:
+                        self.by_number.setdefault((mk, mn), []).append(hit)
+
+    @classmethod
+    def load(cls):
+        return cls(load_cascade())
+
+    def lookup(self, make, model, model_number=None, cc=None, fuel=None, tx=None):
+        """Matching (category, entry) pairs, narrowed by any spec fields given."""
+        mk, model, mn = norm(make), norm(model), norm(model_number)
+        if model and mn:
+            hits = self.exact.get((mk, model, mn)) or []
+        elif model:
+            hits = self.by_model.get((mk, model)) or []
+        else:
+            hits = self.by_number.get((mk, mn)) or []
+        for field, want in zip(NARROW_FIELDS, (cc, fuel, tx)):
+            if want not in (None, "") and len(hits) > 1:
+                hits = [h for h in hits if norm(h[1].get(field)) == norm(want)]
+        return hits
+
+
+def resolve(index, unit):
+    """(status, category, crsp, matches) for one input unit."""
+    if not norm(unit.get("make")) or not (norm(unit.get("model")) or norm(unit.get("model_number"))):
+        return "bad_input", None, None, 0
+    hits = index.lookup(*(unit.get(f) for f in ("make", "model", "model_number") + NARROW_FIELDS))
+    if not hits:
+        return "not_found", None, None, 0
+    if len({entry["crsp"] for _, entry in hits}) > 1:
+        return "ambiguous", None, None, len(hits)
+    category, entry = hits[0]
+    return "ok", category, entry["crsp"], len(hits)
+
+
+# ── Input ─────────────────────────────────────────────────────────────────
+
+def read_units(stream, fmt=None):
+    """Yield input units as dicts from a CSV (header row) or NDJSON stream.
+
+    fmt=None sniffs the first non-blank line: "{" means NDJSON.
+    """
+    lines = iter(stream)
+    if fmt is None:
+        head = []
+        for line in lines:
+            head.append(line)
+            if line.strip():
+                break
+        fmt = "ndjson" if head and head[-1].lstrip().startswith("{") else "csv"
+        lines = itertools.chain(head, lines)
+    if fmt == "ndjson":
+        for line in lines:
+            if line.strip():
+                try:
+                    unit = json.loads(line)
+                except ValueError:
+                    unit = {}
+                # Arrays, strings, numbers: reported as bad_input like unparseable lines
+                yield unit if isinstance(unit, dict) else {}
+    else:
+        reader = csv.DictReader(lines)
+        reader.fieldnames = [norm(f).replace(" ", "_") for f in reader.fieldnames or []]
+        yield from reader
+
+
+def parse_year(value):
+    """Year of manufacture, or None unless it is a number in MIN_YEAR..CURRENT_YEAR."""
+    try:
+        year = int(float(value))
+    except (TypeError, ValueError, OverflowError):  # OverflowError: inf, 1e400
+        return None
+    return year if MIN_YEAR <= year <= CURRENT_YEAR else None
+
+
+# ── Quoting ───────────────────────────────────────────────────────────────
+
+def quote_chunk(index, units, first_line):
+    """Output rows for one chunk of units, priced in a single batch."""
+    rows, priced = [], []
+    for n, unit in enumerate(units, first_line):
+        year = parse_year(unit.get("year"))
+        status, category, crsp, matches = resolve(index, unit) if year is not None else ("bad_input", None, None, 0)
+        row = {
+            "line": n, "status": status,
+            **{f: unit.get(f) for f in KEY_FIELDS},
+            "category": category, "crsp": crsp, "matches": matches,
+        }
+        if status == "ok":
+            row["year"] = year
+            priced.append(row)
+        rows.append(row)
+
+    if priced:
+        batch = calculate_duty_batch([r["crsp"] for r in priced], [r["year"] for r in priced])
+        cols = {k: batch[k].tolist() for k in COMPONENTS + ["depr_pct"]}
+        valid = batch["valid"].tolist()
+        for i, row in enumerate(priced):
+            if valid[i]:
+                row.update((k, cols[k][i]) for k in cols)
+            else:
+                row["status"] = "too_old"
+    return rows
+
+
+def quote_stream(index, units, chunk=4096):
+    """Yield output rows for an iterable of units, chunk by chunk."""
+    line = 1
+    while True:
+        block = list(itertools.islice(units, chunk))
+        if not block:
+            return
+        yield from quote_chunk(index, block, line)
+        line += len(block)
+
+
+def new_totals():
+    return {
+        "regime": REGIME["id"], "lines": 0,
+        "status": dict.fromkeys(STATUSES, 0),
+        "duty": dict.fromkeys(COMPONENTS, 0),
+    }
+
+
+def add_to_totals(totals, row):
+    totals["lines"] += 1
+    totals["status"][row["status"]] += 1
+    if row["status"] == "ok":
+        duty = totals["duty"]
+        for k in COMPONENTS:
+            duty[k] += row[k]
+
+
+# ── Output ────────────────────────────────────────────────────────────────
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, OUT_FIELDS, extrasaction="ignore", lineterminator="\n")
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+class NdjsonWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps({k: row.get(k) for k in OUT_FIELDS}, ensure_ascii=False) + "\n")
+
+
+WRITERS = {"csv": CsvWriter, "ndjson": NdjsonWriter}
+
+
+def print_totals(totals, seconds, out=sys.stderr):
+    counts = totals["status"]
+    rate = totals["lines"] / seconds if seconds else 0.0
+    print(f"{totals['lines']:,} lines in {seconds:.2f} s ({rate:,.0f} lines/s), regime {totals['regime']}", file=out)
+    print("  " + "  ".join(f"{s} {counts[s]:,}" for s in STATUSES), file=out)
+    if counts["ok"]:
+        print(f"  Shipment duty for {counts['ok']:,} priced units:", file=out)
+        for k in COMPONENTS:
+            print(f"    {k:<12} KES {totals['duty'][k]:>18,}", file=out)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────
+
+def positive_int(value):
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Duty quotes for a CSV/NDJSON list of units.")
+    parser.add_argument("input", nargs="?", default="-", help="input file, or - for stdin (default)")
+    parser.add_argument("--from", dest="fmt", choices=sorted(WRITERS), help="input format (default: sniffed)")
+    parser.add_argument("--to", choices=sorted(WRITERS), help="output format (default: the input's, by extension; else csv)")
+    parser.add_argument("--out", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--totals", type=Path, help="also write shipment totals to this JSON file")
+    parser.add_argument("--chunk", type=positive_int, default=4096, help="lines priced per batch (default: 4096)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    index = QuoteIndex.load()
+    index_s = time.perf_counter() - t0
+
+    fmt = args.fmt or {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}.get(Path(args.input).suffix)
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.out == "-" else open(args.out, "w", newline="", encoding="utf-8")
+    totals = new_totals()
+    try:
+        writer = WRITERS[args.to or fmt or "csv"](dst)
+        t1 = time.perf_counter()
+        for row in quote_stream(index, read_units(src, fmt), args.chunk):
+            writer.write(row)
+            add_to_totals(totals, row)
+        seconds = time.perf_counter() - t1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    totals["seconds"] = round(seconds, 3)
+    totals["lines_per_s"] = round(totals["lines"] / seconds) if seconds else 0
+    print(f"Index built in {index_s * 1000:.0f} ms", file=sys.stderr)
+    print_totals(totals, seconds)
+    if args.totals:
+        args.totals.write_text(json.dumps(totals, indent=2))
+        print(f"Written → {args.totals}", file=sys.stderr)
+    return totals
+
+
+if __name__ == "__main__":
+    main()
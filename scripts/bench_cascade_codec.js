@@ -0,0 +1,71 @@
+/**
+ * Size / parse-time benchmark: the category shards the calculator fetches
+ * (public/data/cascade/, columnar) vs the same categories as row-oriented
+ * JSON cut from data/crsp_cascade.json.
+ *
+ * Run: node scripts/bench_cascade_codec.js [iterations]
+ * (after python3 scripts/build_crsp_cascade.py)
+ *
+ * Parse time is JSON.parse (+ decodeCascade for the columnar form) — the
+ * main-thread work the calculator does after fetching a category.
+ */
+
+import { readFileSync } from "fs";
+import { resolve } from "path";
+import { gzipSync, brotliCompressSync, constants } from "zlib";
+import { decodeCascade } from "../src/cascade.js";
+
+const ROOT  = new URL("..", import.meta.url).pathname;
+const ITERS = Number(process.argv[2] || 50);
+const SHARD_DIR = resolve(ROOT, "public/data/cascade");
+
+const cascade  = JSON.parse(readFileSync(resolve(ROOT, "data/crsp_cascade.json"), "utf-8"));
+const manifest = JSON.parse(readFileSync(resolve(SHARD_DIR, "manifest.json"), "utf-8"));
+
+function sizes(buf) {
+  return {
+    raw:    buf.length,
+    gzip:   gzipSync(buf, { level: 9 }).length,
+    brotli: brotliCompressSync(buf, { params: { [constants.BROTLI_PARAM_QUALITY]: 11 } }).length,
+  };
+}
+
+function timeIt(fn) {
+  for (let i = 0; i < 5; i++) fn(); // warm up
+  const times = [];
+  for (let i = 0; i < ITERS; i++) {
+    const t0 = process.hrtime.bigint();
+    fn();
+    times.push(Number(process.hrtime.bigint() - t0) / 1e6);
+  }
+  times.sort((a, b) => a - b);
+  return +times[times.length >> 1].toFixed(3);
+}
+
+const results = {};
+const total = { row_brotli: 0, col_brotli: 0, row_parse_ms: 0, col_parse_ms: 0 };
+for (const category of manifest.categories) {
+  const rowText = JSON.stringify(cascade.data[category]);
+  const colText = readFileSync(resolve(SHARD_DIR, manifest.shards[category].file), "utf-8");
+
+  // Sanity check: the decoder must reproduce the category exactly
+  if (JSON.stringify(decodeCascade(JSON.parse(colText)).data[category]) !== rowText) {
+    console.error(`decodeCascade output does not match crsp_cascade.json for ${category}`);
+    process.exit(1);
+  }
+
+  const row = sizes(Buffer.from(rowText));
+  const col = sizes(Buffer.from(colText));
+  const r = {
+    row_raw: row.raw, col_raw: col.raw,
+    row_brotli: row.brotli, col_brotli: col.brotli,
+    row_parse_ms: timeIt(() => JSON.parse(rowText)),
+    col_parse_ms: timeIt(() => decodeCascade(JSON.parse(colText))),
+  };
+  results[category] = r;
+  for (const k of Object.keys(total)) total[k] += r[k];
+}
+results.total = Object.fromEntries(Object.entries(total).map(([k, v]) => [k, +v.toFixed(3)]));
+
+console.table(results);
+console.log(JSON.stringify(results));
@@ -0,0 +1,103 @@
+"""
+Memory and load time of CRSP data as plain json dicts vs crsp_store.
+
+Each case loads one dataset in a fresh Python process and reports:
+  held MB   tracemalloc bytes still allocated once loading is done
+  RSS MB    process RSS growth over the load (VmRSS after − before)
+  peak MB   VmHWM growth — the transient high-water mark while parsing
+  load ms   wall time of the load call
+
+Cases:
+  sheets   data/crsp_vehicles.json + crsp_motorcycles.json
+           (json.loads vs CrspStore.load — build_crsp_cascade.py)
+  cascade  data/crsp_cascade.json
+           (json.loads vs load_cascade — generate_pages.py)
+
+Run: python3 scripts/bench_crsp_store.py [--repeat 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from crsp_store import CrspStore, load_cascade  # imported up front: import cost is not part of a load
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+CASES = {
+    ("sheets", "json"): lambda: [json.loads((DATA_DIR / n).read_text())
+                                 for n in ("crsp_vehicles.json", "crsp_motorcycles.json")],
+    ("sheets", "store"): lambda: CrspStore.load(DATA_DIR),
+    ("cascade", "json"): lambda: json.loads((DATA_DIR / "crsp_cascade.json").read_text()),
+    ("cascade", "store"): lambda: load_cascade(),
+}
+
+
+def proc_kb(field):
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    return 0
+
+
+def measure(dataset, loader):
+    """Run in the child: load once and report what it cost."""
+    rss0, hwm0 = proc_kb("VmRSS"), proc_kb("VmHWM")
+    t0 = time.perf_counter()
+    data = CASES[dataset, loader]()
+    seconds = time.perf_counter() - t0
+    result = {
+        "rss_mb": (proc_kb("VmRSS") - rss0) / 2**10,
+        "peak_mb": (proc_kb("VmHWM") - hwm0) / 2**10,
+        "load_ms": seconds * 1000,
+    }
+    # Second, traced load for the allocation count (tracemalloc slows it down)
+    del data
+    tracemalloc.start()
+    data = CASES[dataset, loader]()
+    result["held_mb"] = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del data
+    return result
+
+
+def run_case(dataset, loader, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", dataset, loader],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout
+        runs.append(json.loads(out))
+    # Median run by load time; memory figures barely move between runs
+    return sorted(runs, key=lambda r: r["load_ms"])[len(runs) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return
+
+    results = {f"{d}/{l}": run_case(d, l, args.repeat) for d, l in CASES}
+    print(f"  {'case':<15} {'held MB':>8} {'RSS MB':>8} {'peak MB':>8} {'load ms':>8}")
+    for name, r in results.items():
+        print(f"  {name:<15} {r['held_mb']:>8.2f} {r['rss_mb']:>8.2f} {r['peak_mb']:>8.2f} {r['load_ms']:>8.1f}")
+    for dataset in ("sheets", "cascade"):
+        before, after = results[f"{dataset}/json"], results[f"{dataset}/store"]
+        print(f"  {dataset}: {1 - after['held_mb'] / before['held_mb']:.0%} less held, "
+              f"{1 - after['rss_mb'] / max(before['rss_mb'], 1e-9):.0%} less RSS")
+    print()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Time each page output backend on the real page set.
+
+Every page is rendered once into memory, then written through each backend
+into a fresh temporary directory (cold: nothing on disk yet) and, for the
+directory backends, a second time over its own output (warm: every file
+already exists and is identical — the common incremental-deploy case).
+Dirty pages are synced to disk before each timed run.
+
+Run: python3 scripts/bench_page_output.py [--no-years] [--tmp DIR]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from generate_pages import iter_shards, load_data, shard_pages
+from page_output import DIRECTORY_BACKENDS, open_output
+
+ARCHIVES = ("site.tar", "site.tar.gz", "site.zip")
+
+
+def render_all(years):
+    pages = []
+    for category, make in iter_shards(load_data()):
+        for rel_dir, _kind, _inputs, render in shard_pages(load_data(), category, make, years):
+            pages.append((rel_dir / "index.html", render().encode("utf-8")))
+    return pages
+
+
+def run(backend, root, pages):
+    # Flush the previous run's dirty pages so writeback isn't billed to this one
+    if hasattr(os, "sync"):
+        os.sync()
+    t0 = time.perf_counter()
+    writer = open_output(backend, root)
+    for rel_path, data in pages:
+        writer.write(rel_path, data)
+    stats = writer.close()
+    return {"seconds": round(time.perf_counter() - t0, 3), **{
+        k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items() if k != "seconds"
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--no-years", dest="years", action="store_false")
+    parser.add_argument("--tmp", type=Path, help="scratch directory (default: system temp)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    pages = render_all(args.years)
+    mb = sum(len(d) for _, d in pages) / 2**20
+    print(f"Rendered {len(pages)} pages ({mb:.1f} MB) in {time.perf_counter() - t0:.1f}s\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="dutycheck-out-", dir=args.tmp) as tmp:
+        tmp = Path(tmp)
+        for backend in DIRECTORY_BACKENDS:
+            root = tmp / backend
+            results[backend] = {"cold": run(backend, root, pages), "warm": run(backend, root, pages)}
+            shutil.rmtree(root)
+        for name in ARCHIVES:
+            results[name] = {"cold": run(str(tmp / name), None, pages)}
+
+    print(f"  {'backend':<12} {'cold s':>8} {'warm s':>8} {'pages/s':>9}  notes")
+    for backend, r in results.items():
+        cold, warm = r["cold"], r.get("warm")
+        notes = []
+        if "archive_bytes" in cold:
+            notes.append(f"{cold['archive_bytes'] / 2**20:.1f} MB archive")
+        if warm and warm["identical"]:
+            notes.append(f"warm: {warm['identical']} identical, {warm['written']} written")
+        print(f"  {backend:<12} {cold['seconds']:>8.2f} {warm['seconds'] if warm else float('nan'):>8.2f} "
+              f"{len(pages) / cold['seconds']:>9.0f}  {', '.join(notes)}")
+    print()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Reproducible benchmark harness for the data pipeline and page generator.
+
+Each stage runs in its own fresh Python process inside a throwaway copy of
+the repo layout (scripts/, data/, public/), so timings are isolated, peak
+RSS is per stage, and the real data/ and public/ are never touched.
+
+Stages:
+  crsp_to_json.parse_vehicles      parse + stream-write crsp_vehicles.json
+  crsp_to_json.parse_motorcycles   parse + stream-write crsp_motorcycles.json
+  crsp_to_json.parse_depreciation  parse + write depreciation.json
+  build_crsp_cascade.build         cascade + derived artifacts
+  generate_pages.main              full --force build, split into render/write
+
+Datasets:
+  real        the July 2025 KRA workbook
+  synthetic   the same workbook with every CRSP row repeated --scale times
+              (default 10×), model names suffixed so every row is a new page
+
+Results are written as JSON to bench_results/pipeline-<commit>.json so runs
+can be compared between commits.
+
+Run: python3 scripts/bench_pipeline.py [--datasets real,synthetic] [--scale 10] [--repeat 1]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT        = Path(__file__).parent.parent
+SCRIPTS_DIR = ROOT / "scripts"
+RESULTS_DIR = ROOT / "bench_results"
+
+STAGES = [
+    "crsp_to_json.parse_vehicles",
+    "crsp_to_json.parse_motorcycles",
+    "crsp_to_json.parse_depreciation",
+    "build_crsp_cascade.build",
+    "generate_pages.main",
+]
+
+
+def peak_rss_mb():
+    # VmHWM is this process image's own peak; ru_maxrss survives exec on
+    # Linux, so a child spawned from a big parent would inherit its peak.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 2**10, 1)
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# ── Child: run one stage in this process ─────────────────────────────────────
+
+def run_stage(stage):
+    """Executed inside the throwaway tree; returns the stage's measurements."""
+    import crsp_to_json as c2j
+
+    result = {}
+    if stage.startswith("crsp_to_json."):
+        c2j.DATA_DIR.mkdir(exist_ok=True)
+        wb = c2j.open_workbook()
+        rss_before = peak_rss_mb()
+        t0 = time.perf_counter()
+        if stage.endswith("parse_vehicles"):
+            result["rows"] = c2j.write_json_array(c2j.DATA_DIR / "crsp_vehicles.json", c2j.parse_vehicles(wb))
+        elif stage.endswith("parse_motorcycles"):
+            result["rows"] = c2j.write_json_array(c2j.DATA_DIR / "crsp_motorcycles.json", c2j.parse_motorcycles(wb))
+        else:
+            depreciation = c2j.parse_depreciation(wb)
+            (c2j.DATA_DIR / "depreciation.json").write_text(json.dumps(depreciation, indent=2))
+            (c2j.DATA_DIR / "duty_rates.json").write_text(json.dumps(c2j.DUTY_RATES, indent=2))
+        result["seconds"] = time.perf_counter() - t0
+
+    elif stage == "build_crsp_cascade.build":
+        import build_crsp_cascade
+
+        rss_before = peak_rss_mb()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_crsp_cascade.build()
+        result["seconds"] = time.perf_counter() - t0
+
+    elif stage == "generate_pages.main":
+        import generate_pages
+
+        rss_before = peak_rss_mb()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = generate_pages.main(["--force"])
+        result["seconds"] = time.perf_counter() - t0
+        result["pages"] = stats["written"]
+        result["render_s"] = stats["render_s"]
+        result["write_s"] = stats["write_s"]
+        result["bytes"] = stats["bytes"]
+
+    else:
+        raise SystemExit(f"unknown stage: {stage}")
+
+    result["rss_before_mb"] = rss_before
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+# ── Parent: datasets and orchestration ───────────────────────────────────────
+
+def make_tree(base, workbook):
+    """Throwaway repo layout whose scripts resolve data/ and public/ inside base."""
+    shutil.copytree(SCRIPTS_DIR, base / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    (base / "data").mkdir()
+    # Source input like the workbook: the scripts resolve the duty regime at import
+    shutil.copy2(ROOT / "data" / "duty_regimes.json", base / "data" / "duty_regimes.json")
+    (base / "public").mkdir()
+    (base / "New-CRSP---July-2025.xlsx").symlink_to(workbook.resolve())
+    return base
+
+
+def make_synthetic_workbook(source, dest, scale):
+    """Copy the workbook, repeating every CRSP data row `scale` times."""
+    import openpyxl
+
+    src = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    # A regular (not write-only) workbook records sheet dimensions, so blank
+    # rows read back at full width exactly like the KRA file
+    out = openpyxl.Workbook()
+    out.remove(out.active)
+    for name in src.sheetnames:
+        ws = out.create_sheet(name)
+        rows = src[name].iter_rows(values_only=True)
+        if name == "TEMPLATE 2025":
+            for row in rows:
+                ws.append(row)
+            continue
+        for row in rows:
+            ws.append(row)
+            if row and row[0] == "Make":
+                break
+        data = list(rows)
+        for k in range(scale):
+            for row in data:
+                if k and row[1]:
+                    row = (row[0], f"{row[1]} S{k}") + row[2:]
+                ws.append(row)
+    out.save(dest)
+    src.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_dataset(tree, repeat):
+    results = {}
+    for stage in STAGES:
+        runs = []
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, str(tree / "scripts" / "bench_pipeline.py"), "--child", stage],
+                capture_output=True, text=True,
+            )
+            if proc.returncode:
+                raise SystemExit(f"{stage} failed:\n{proc.stderr}")
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        best = min(runs, key=lambda r: r["seconds"])
+        best["runs_s"] = [round(r["seconds"], 4) for r in runs]
+        results[stage] = {k: round(v, 4) if isinstance(v, float) else v for k, v in best.items()}
+        print(f"  {stage:<34} {best['seconds']:>8.3f}s  peak RSS {best['peak_rss_mb']:>7.1f} MB",
+              file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CRSP data pipeline stage by stage.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--datasets", default="real,synthetic")
+    parser.add_argument("--scale", type=int, default=10, help="synthetic dataset multiplier (default: 10)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("--out", type=Path, help="results file (default: bench_results/pipeline-<commit>.json)")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_stage(args.child)))
+        return
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "datasets": {},
+    }
+    workbook = ROOT / "New-CRSP---July-2025.xlsx"
+
+    with tempfile.TemporaryDirectory(prefix="dutycheck-bench-") as tmp:
+        tmp = Path(tmp)
+        for dataset in args.datasets.split(","):
+            if dataset == "real":
+                source = workbook
+            elif dataset == "synthetic":
+                source = tmp / f"crsp-x{args.scale}.xlsx"
+                print(f"Building synthetic {args.scale}× workbook...", file=sys.stderr)
+                make_synthetic_workbook(workbook, source, args.scale)
+            else:
+                raise SystemExit(f"unknown dataset: {dataset}")
+            name = dataset if dataset == "real" else f"synthetic_x{args.scale}"
+            print(f"{name}:", file=sys.stderr)
+            tree = make_tree(tmp / name, source)
+            report["datasets"][name] = bench_dataset(tree, args.repeat)
+            shutil.rmtree(tree / "public")
+
+    out = args.out or RESULTS_DIR / f"pipeline-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Written → {out.relative_to(ROOT) if out.is_relative_to(ROOT) else out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
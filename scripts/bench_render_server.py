@@ -0,0 +1,118 @@
+"""
+Local load generator for the preview render server.
+
+Starts render_server in-process on an ephemeral port, then drives it from
+keep-alive client threads. Paths follow a Zipf-like popularity curve over
+all pages (a few hot models, a long tail), and a share of requests
+revalidate with If-None-Match like a browser with a warm cache would.
+
+Reports throughput and latency percentiles for a cold pass (every page
+rendered once) and the mixed steady-state run.
+
+Run: python3 scripts/bench_render_server.py [--requests N] [--clients C]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+
+from render_server import make_server
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def run_clients(port, plan, clients):
+    """plan: list of (path, etag_or_None). Returns (elapsed_s, latencies_ms, statuses)."""
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    chunks = [plan[i::clients] for i in range(clients)]
+
+    def worker(chunk):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        mine, seen = [], {}
+        for path, etag in chunk:
+            headers = {"If-None-Match": etag} if etag else {}
+            t0 = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            res = conn.getresponse()
+            res.read()
+            mine.append((time.perf_counter() - t0) * 1000)
+            seen[res.status] = seen.get(res.status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for k, v in seen.items():
+                statuses[k] = statuses.get(k, 0) + v
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, sorted(latencies), statuses
+
+
+def summarise(elapsed, latencies, statuses):
+    return {
+        "requests": len(latencies),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--revalidate", type=float, default=0.3,
+                        help="share of requests sent with If-None-Match (default: 0.3)")
+    parser.add_argument("--cache-mb", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    server = make_server(port=0, cache_mb=args.cache_mb, quiet=True)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    paths = sorted(server.routes)
+    rng = random.Random(args.seed)
+    rng.shuffle(paths)
+
+    # Cold: each page once, nothing cached yet
+    cold = summarise(*run_clients(port, [(p, None) for p in paths], args.clients))
+
+    # Steady state: Zipf-ish popularity, some conditional requests
+    weights = [1 / (rank + 1) for rank in range(len(paths))]
+    picks = rng.choices(paths, weights=weights, k=args.requests)
+    plan = []
+    for path in picks:
+        etag = None
+        if rng.random() < args.revalidate:
+            page = server.cache.get(path)
+            etag = page[0] if page else None
+        plan.append((path, etag))
+    steady = summarise(*run_clients(port, plan, args.clients))
+
+    server.shutdown()
+    print(json.dumps({
+        "pages": len(paths),
+        "startup_ms": round(server.startup_s * 1000, 1),
+        "clients": args.clients,
+        "cold": cold,
+        "steady": steady,
+        "cache": {"pages": len(server.cache), "mb": round(server.cache.bytes / 2**20, 1),
+                  "hits": server.cache.hits, "misses": server.cache.misses},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
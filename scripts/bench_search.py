@@ -0,0 +1,95 @@
+"""
+Benchmark: replay a realistic query log against the prebuilt search index.
+
+The log is synthesised from the cascade with a fixed seed and mimics how
+people use a search-as-you-type box: a vehicle is picked (weighted toward
+popular makes), and its query is typed one keystroke at a time, e.g.
+"h", "ha", ..., "harrier", "harrier 2", "harrier 2.0". Some queries lead
+with the make, some add a cc/litre or fuel token, some use a model number.
+
+Run: python3 scripts/bench_search.py [--queries N] [--seed S]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from search_index import SearchIndex, tokenize
+
+CASCADE_FILE = Path(__file__).parent.parent / "data" / "crsp_cascade.json"
+
+
+def query_log(cascade, n, seed):
+    rng = random.Random(seed)
+    entries = [
+        (make, m)
+        for makes in cascade["data"].values()
+        for make, models in makes.items()
+        for m in models
+    ]
+    # Sampling entries (not makes) weights big makes up, like real traffic
+    log = []
+    while len(log) < n:
+        make, m = rng.choice(entries)
+        words = tokenize(m["model"])[:2]
+        style = rng.random()
+        if style < 0.3:
+            words = tokenize(make) + words[:1]
+        elif style < 0.5 and isinstance(m.get("cc"), int):
+            words = words[:1] + [f"{m['cc'] / 1000:.1f}"]
+        elif style < 0.6 and m.get("fuel"):
+            words = words[:1] + [m["fuel"].lower()]
+        elif style < 0.7 and m.get("mn"):
+            words = tokenize(m["mn"])[:1]
+        text = " ".join(words)
+        # Every keystroke is a query
+        log.extend(text[:i] for i in range(1, len(text) + 1) if not text[:i].endswith(" "))
+    return log[:n]
+
+
+def replay(index, log):
+    times = []
+    hits = 0
+    for q in log:
+        t0 = time.perf_counter()
+        results = index.search(q)
+        times.append((time.perf_counter() - t0) * 1e6)
+        hits += bool(results)
+    times.sort()
+    return {
+        "queries": len(log),
+        "with_results": hits,
+        "mean_us": round(statistics.fmean(times), 1),
+        "p50_us": round(times[len(times) // 2], 1),
+        "p99_us": round(times[int(len(times) * 0.99)], 1),
+        "max_us": round(times[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    cascade = json.loads(CASCADE_FILE.read_text())
+    log = query_log(cascade, args.queries, args.seed)
+
+    t0 = time.perf_counter()
+    index = SearchIndex.load()
+    load_ms = (time.perf_counter() - t0) * 1e3
+
+    # Cold: every distinct token is scored for the first time
+    cold = replay(index, log)
+    # Warm: same log again with the per-token cache populated
+    warm = replay(index, log)
+
+    results = {"entries": len(index.labels), "load_ms": round(load_ms, 1), "cold": cold, "warm": warm}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Time the CRSP workbook parse with openpyxl vs xlsx_reader.
+
+Each parser (vehicles, motorcycles, depreciation) runs on a freshly opened
+workbook, so every timing includes opening the zip and, for the first sheet
+read, loading shared strings and styles. Outputs of the two readers are
+compared and the run fails if they differ in any row.
+
+Run: python3 scripts/bench_xlsx_reader.py [--repeat 3] [--xlsx PATH]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from crsp_to_json import EXCEL_FILE, open_workbook, parse_depreciation, parse_motorcycles, parse_vehicles
+
+PARSERS = {
+    "vehicles": lambda wb: list(parse_vehicles(wb)),
+    "motorcycles": lambda wb: list(parse_motorcycles(wb)),
+    "depreciation": parse_depreciation,
+}
+READERS = {"openpyxl": False, "fast": True}
+
+
+def time_parse(path, parser, fast, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        wb = open_workbook(path, fast=fast)
+        out = parser(wb)
+        wb.close()
+        seconds = time.perf_counter() - t0
+        best = seconds if best is None else min(best, seconds)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument("--xlsx", type=Path, default=EXCEL_FILE)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"  {'sheet':<14} {'openpyxl s':>11} {'fast s':>8} {'speedup':>8}  output")
+    for name, parse in PARSERS.items():
+        (slow, expected), (fast, actual) = (time_parse(args.xlsx, parse, f, args.repeat) for f in READERS.values())
+        same = json.dumps(expected, ensure_ascii=False) == json.dumps(actual, ensure_ascii=False)
+        results[name] = {"openpyxl_s": round(slow, 4), "fast_s": round(fast, 4), "identical": same}
+        print(f"  {name:<14} {slow:>11.3f} {fast:>8.3f} {slow / fast:>7.1f}×  {'identical' if same else 'DIFFERS'}")
+    total_slow = sum(r["openpyxl_s"] for r in results.values())
+    total_fast = sum(r["fast_s"] for r in results.values())
+    print(f"  {'total':<14} {total_slow:>11.3f} {total_fast:>8.3f} {total_slow / total_fast:>7.1f}×")
+    if not all(r["identical"] for r in results.values()):
+        raise SystemExit("readers disagree")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,15 @@
 Build a cascade-ready CRSP data structure for the calculator UI.
 
 Output: data/crsp_cascade.json
+        public/data/cascade/          (per-category shards in the columnar encoding
+                                       of cascade_codec.py + manifest.json, fetched
+                                       by the calculator; see src/cascade.js)
+        data/search_index.json        (make/model search, see search_index.py)
+        data/slug_index.json          (page URLs, see slug_index.py)
+        data/slug_collisions.json     (how duplicate model slugs were resolved)
+        data/redirects.json           (legacy model URLs → current ones; merged into
+                                       vercel.json by merge_redirects.py)
+        data/duty_matrix.bin + .json  (precomputed duty, see duty_matrix.py)
 Shape:
 {
   "categories": ["Motorcycle", "SUV", ...],
@@ -17,13 +26,26 @@ Shape:
     }
   }
 }
+
+Run: python3 scripts/build_crsp_cascade.py [--trace PATH]
 """
 
+import argparse
+import hashlib
 import json
 from pathlib import Path
 from collections import defaultdict
 
+from cascade_codec import encode_columnar
+from crsp_store import CODES, CrspStore
+from duty_matrix import write_duty_matrix
+from search_index import write_index
+from slug_index import write_redirects, write_slug_index
+from slugs import slugify
+import tracing
+
 DATA_DIR = Path(__file__).parent.parent / "data"
+SHARD_DIR = Path(__file__).parent.parent / "public" / "data" / "cascade"
 
 # ── Normalize body types to clean display categories ─────────────────────────
 
@@ -106,50 +128,112 @@ def title_case(s):
     return " ".join(w.capitalize() if w.isupper() else w for w in s.split())
 
 
-def build():
-    vehicles = json.loads((DATA_DIR / "crsp_vehicles.json").read_text())
-    motorcycles = json.loads((DATA_DIR / "crsp_motorcycles.json").read_text())
+def written(*paths):
+    """Count the files' sizes into the bytes_written trace counter."""
+    if tracing.enabled():
+        tracing.count("bytes_written", sum(Path(p).stat().st_size for p in paths))
+
+
+def write_shards(cascade, slugs):
+    """Write one content-hashed file per category plus a small manifest.
+
+    Each shard is the columnar encoding (cascade_codec.py) of a cascade
+    holding just that category; src/cascade.js decodes it on load. The
+    category's slug overrides (slug_index.py) ride along as "slugs":
+    {make: {position: slug}} and "make_slugs": {make: slug}, so the
+    calculator links to the page URLs.
+    public/data/cascade/manifest.json lists the categories in display order
+    with their make/model counts and shard file, so the calculator can fetch
+    only the category that was clicked. Shard names change whenever their
+    content does, so they can be cached forever.
+    """
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    shards = {}
+    for cat, makes in cascade["data"].items():
+        with tracing.span(cat, cat="category"):
+            col = encode_columnar({"categories": [cat], "data": {cat: makes}})
+            if slugs["overrides"].get(cat):
+                col["slugs"] = slugs["overrides"][cat]
+            if slugs["makes"].get(cat):
+                col["make_slugs"] = slugs["makes"][cat]
+            raw = json.dumps(col, separators=(",", ":"), ensure_ascii=False)
+            digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+            name = f"{slugify(cat)}.{digest[:10]}.json"
+            (SHARD_DIR / name).write_text(raw)
+        written(SHARD_DIR / name)
+        shards[cat] = {
+            "file": name,
+            "hash": f"sha256-{digest}",
+            "makes": len(makes),
+            "models": sum(len(m) for m in makes.values()),
+            "bytes": len(raw.encode("utf-8")),
+        }
+
+    manifest = {"categories": cascade["categories"], "shards": shards}
+    (SHARD_DIR / "manifest.json").write_text(
+        json.dumps(manifest, separators=(",", ":"), ensure_ascii=False)
+    )
+    written(SHARD_DIR / "manifest.json")
+
+    # Drop shards from previous builds
+    live = {s["file"] for s in shards.values()} | {"manifest.json"}
+    for path in SHARD_DIR.glob("*.json"):
+        if path.name not in live:
+            path.unlink()
+    return manifest
+
 
+def assemble(store):
+    """The cascade dict from the parsed sheets, and how many rows it left out."""
     cascade = defaultdict(lambda: defaultdict(list))
 
+    # Per-code lookup tables: each distinct make/body/fuel is normalised once
+    make_names = CODES["make"].map(title_case)
+    categories = CODES["body_type"].map(lambda body: CATEGORY_MAP.get(body.strip()))
+    fuels = CODES["fuel"].map(str.title)
+    cc_values, tx_values = CODES["engine_cc"].values, CODES["transmission"].values
+
     # Motor vehicles
+    v = store.vehicles
     skipped = 0
-    for v in vehicles:
-        body = (v.get("body_type") or "").strip()
-        category = CATEGORY_MAP.get(body)
+    for make, model, mn, cc, tx, body, fuel, crsp in zip(
+        v.codes("make"), v.codes("model"), v.codes("model_number"), v.codes("engine_cc"),
+        v.codes("transmission"), v.codes("body_type"), v.codes("fuel"), v.codes("crsp_kes"),
+    ):
+        category = categories[body]
         if not category:
             skipped += 1
             continue
 
-        make = title_case(v["make"])
         entry = {
-            "model": title_case(v["model"]),
-            "crsp": v["crsp_kes"],
+            "model": title_case(model),
+            "crsp": crsp,
         }
-        mn = v.get("model_number")
         if mn and mn != "None":
             entry["mn"] = mn
-        if v.get("engine_cc"):
-            entry["cc"] = v["engine_cc"]
-        if v.get("fuel"):
-            entry["fuel"] = v["fuel"].title()
-        if v.get("transmission"):
-            entry["tx"] = v["transmission"]
+        if cc_values[cc]:
+            entry["cc"] = cc_values[cc]
+        if fuels[fuel]:
+            entry["fuel"] = fuels[fuel]
+        if tx_values[tx]:
+            entry["tx"] = tx_values[tx]
 
-        cascade[category][make].append(entry)
+        cascade[category][make_names[make]].append(entry)
 
     # Motorcycles (separate source sheet)
-    for m in motorcycles:
-        make = title_case(m["make"])
+    m = store.motorcycles
+    for make, model, cc, fuel, crsp in zip(
+        m.codes("make"), m.codes("model"), m.codes("engine_cc"), m.codes("fuel"), m.codes("crsp_kes"),
+    ):
         entry = {
-            "model": title_case(m["model"]),
-            "crsp": m["crsp_kes"],
+            "model": title_case(model),
+            "crsp": crsp,
         }
-        if m.get("engine_cc"):
-            entry["cc"] = m["engine_cc"]
-        if m.get("fuel"):
-            entry["fuel"] = m["fuel"].title()
-        cascade["Motorcycle"][make].append(entry)
+        if cc_values[cc]:
+            entry["cc"] = cc_values[cc]
+        if fuels[fuel]:
+            entry["fuel"] = fuels[fuel]
+        cascade["Motorcycle"][make_names[make]].append(entry)
 
     # Sort makes and models alphabetically
     sorted_cascade = {}
@@ -165,8 +249,21 @@ def build():
         "data": sorted_cascade,
     }
 
-    raw = json.dumps(out, separators=(",", ":"), ensure_ascii=False)
-    (DATA_DIR / "crsp_cascade.json").write_text(raw)
+    return out, skipped
+
+
+def build():
+    with tracing.span("load"):
+        store = CrspStore.load(DATA_DIR)
+    with tracing.span("assemble"):
+        out, skipped = assemble(store)
+    sorted_cascade = out["data"]
+    tracing.count("rows_skipped", skipped)
+
+    with tracing.span("write cascade"):
+        raw = json.dumps(out, separators=(",", ":"), ensure_ascii=False)
+        (DATA_DIR / "crsp_cascade.json").write_text(raw)
+    written(DATA_DIR / "crsp_cascade.json")
 
     total = sum(len(models) for cat in sorted_cascade.values() for models in cat.values())
     print(f"Categories: {len(sorted_cascade)}")
@@ -177,6 +274,41 @@ def build():
     print(f"Output size:   {len(raw)/1024:.1f} KB")
     print("Written → data/crsp_cascade.json")
 
+    with tracing.span("slug index"):
+        slugs, collisions = write_slug_index(out)
+        redirects = write_redirects(out, slugs)
+    written(DATA_DIR / "slug_index.json", DATA_DIR / "slug_collisions.json", DATA_DIR / "redirects.json")
+    renamed = sum(len(m) for makes in slugs["overrides"].values() for m in makes.values())
+    print(f"Slug index:    {len(collisions)} collision groups, {renamed} disambiguated URLs, "
+          f"{len(redirects)} redirects from legacy URLs")
+    print("Written → data/slug_index.json + data/slug_collisions.json + data/redirects.json")
+
+    with tracing.span("write shards"):
+        manifest = write_shards(out, slugs)
+    largest = max(s["bytes"] for s in manifest["shards"].values())
+    total_shards = sum(s["bytes"] for s in manifest["shards"].values())
+    print(f"Shards:        {len(manifest['shards'])} categories, columnar, {total_shards/1024:.1f} KB "
+          f"(largest {largest/1024:.1f} KB)")
+    print("Written → public/data/cascade/manifest.json + per-category shards")
+
+    with tracing.span("search index"):
+        index, size = write_index(out)
+    written(DATA_DIR / "search_index.json")
+    print(f"Search index:  {len(index['vocab'])} tokens ({size/1024:.1f} KB)")
+    print("Written → data/search_index.json")
+
+    with tracing.span("duty matrix"):
+        header, size = write_duty_matrix(sorted_cascade)
+    written(DATA_DIR / "duty_matrix.bin", DATA_DIR / "duty_matrix.json")
+    print(f"\nDuty matrix:   {header['shape'][1]} entries × {len(header['years'])} years  "
+          f"({size/1024:.1f} KB, version {header['version']})")
+    print("Written → data/duty_matrix.bin + data/duty_matrix.json")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the cascade and derived indexes from data/crsp_*.json.")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of this run (also: CRSP_TRACE)")
+    args = parser.parse_args()
+    tracing.start(args.trace, "build_crsp_cascade")
     build()
+    tracing.finish()
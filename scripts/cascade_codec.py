@@ -0,0 +1,113 @@
+"""
+Columnar encoding of crsp_cascade.json, used for the per-category shards
+the calculator fetches (public/data/cascade/, see build_crsp_cascade.py).
+
+The cascade repeats "model"/"crsp"/"cc"/"fuel"/"tx" keys for every one of
+~5,700 entries. The columnar form stores one array per field instead:
+
+{
+  "v": 1,
+  "categories": ["Motorcycle", ...],
+  "cat_index":  [0, 4, 44, ...],      # per category: first group, plus end
+  "makes":      ["Honda", ...],       # string table
+  "groups":     [make_id, count, ...],# (make, model count) pairs, cascade order
+  "model":      ["400x", ...],
+  "crsp":       [971616, ...],
+  "mn":         ["", ...],            # "" = absent
+  "cc":         [399, ...],           # 0 = absent or non-numeric, see cc_text
+  "cc_text":    [index, "63 kWh", ...],
+  "fuels":      ["Gasoline", ...],    # string table
+  "fuel":       [1, ...],             # 1-based into fuels, 0 = absent
+  "txs":        ["AT", ...],
+  "tx":         [0, ...]
+}
+
+decode_columnar() rebuilds the exact cascade dict (same key order), so
+json.dumps of the decoded value is byte-identical to crsp_cascade.json.
+The matching client-side decoder is decodeCascade() in src/cascade.js.
+Benchmark: node scripts/bench_cascade_codec.js
+"""
+
+FORMAT_VERSION = 1
+
+
+def _table(values):
+    """Build a string table; returns (table, {value: 1-based code})."""
+    table = sorted({v for v in values if v})
+    return table, {v: i + 1 for i, v in enumerate(table)}
+
+
+def encode_columnar(cascade):
+    entries = [
+        m
+        for category in cascade["categories"]
+        for models in cascade["data"][category].values()
+        for m in models
+    ]
+    makes = sorted({make for makes in cascade["data"].values() for make in makes})
+    make_id = {make: i for i, make in enumerate(makes)}
+    fuels, fuel_code = _table(m.get("fuel") for m in entries)
+    txs, tx_code     = _table(m.get("tx") for m in entries)
+
+    cat_index, groups = [], []
+    for category in cascade["categories"]:
+        cat_index.append(len(groups) // 2)
+        for make, models in cascade["data"][category].items():
+            groups += [make_id[make], len(models)]
+    cat_index.append(len(groups) // 2)
+
+    cc, cc_text = [], []
+    for i, m in enumerate(entries):
+        value = m.get("cc")
+        if isinstance(value, int):
+            cc.append(value)
+        else:
+            cc.append(0)
+            if value:
+                cc_text += [i, value]
+
+    return {
+        "v": FORMAT_VERSION,
+        "categories": cascade["categories"],
+        "cat_index": cat_index,
+        "makes": makes,
+        "groups": groups,
+        "model": [m["model"] for m in entries],
+        "crsp": [m["crsp"] for m in entries],
+        "mn": [m.get("mn", "") for m in entries],
+        "cc": cc,
+        "cc_text": cc_text,
+        "fuels": fuels,
+        "fuel": [fuel_code.get(m.get("fuel"), 0) for m in entries],
+        "txs": txs,
+        "tx": [tx_code.get(m.get("tx"), 0) for m in entries],
+    }
+
+
+def decode_columnar(col):
+    if col.get("v") != FORMAT_VERSION:
+        raise ValueError(f"unsupported columnar cascade version: {col.get('v')}")
+
+    cc_text = dict(zip(col["cc_text"][::2], col["cc_text"][1::2]))
+    data = {}
+    pos = 0
+    for c, category in enumerate(col["categories"]):
+        makes = data[category] = {}
+        for g in range(col["cat_index"][c], col["cat_index"][c + 1]):
+            make_id, count = col["groups"][2 * g], col["groups"][2 * g + 1]
+            models = makes[col["makes"][make_id]] = []
+            for i in range(pos, pos + count):
+                entry = {"model": col["model"][i], "crsp": col["crsp"][i]}
+                if col["mn"][i]:
+                    entry["mn"] = col["mn"][i]
+                cc = col["cc"][i] or cc_text.get(i)
+                if cc:
+                    entry["cc"] = cc
+                if col["fuel"][i]:
+                    entry["fuel"] = col["fuels"][col["fuel"][i] - 1]
+                if col["tx"][i]:
+                    entry["tx"] = col["txs"][col["tx"][i] - 1]
+                models.append(entry)
+            pos += count
+
+    return {"categories": col["categories"], "data": data}
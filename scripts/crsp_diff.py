@@ -0,0 +1,199 @@
+"""
+Diff two CRSP releases into a change set, for incremental rebuilds.
+
+Rows are matched by everything except the price: make, model, model number,
+transmission, cc, fuel and the other spec columns. Each row of the new
+release ends up as one of:
+
+  unchanged  same spec, same price
+  repriced   same spec, new price
+  modified   same make/model/model number but other spec fields changed
+             (a KRA correction, e.g. cc or body type)
+  added / removed
+
+Identical spec rows that differ only in price (KRA lists some trims
+several times) are paired off by price, lowest with lowest.
+
+Either side can be a workbook (.xlsx, parsed like crsp_to_json.py) or a
+directory holding crsp_vehicles.json + crsp_motorcycles.json. The old side
+defaults to the current data/.
+
+Output: data/crsp_changes.json
+  {"old", "new", "summary", "touched": [[category, make], ...],
+   "added", "removed", "repriced", "modified"}
+
+"touched" lists every cascade (category, make) a change lands in, on
+either side. generate_pages.py --changes data/crsp_changes.json then
+renders only those makes' pages plus their category pages.
+
+Typical release update:
+  python3 scripts/crsp_diff.py New-CRSP.xlsx --apply   # diff + write data/crsp_*.json
+  python3 scripts/build_crsp_cascade.py
+  python3 scripts/generate_pages.py --changes data/crsp_changes.json
+"""
+
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from build_crsp_cascade import CATEGORY_MAP, title_case
+from crsp_to_json import DATA_DIR, open_workbook, parse_motorcycles, parse_vehicles, write_json_array
+
+CHANGES_FILE = DATA_DIR / "crsp_changes.json"
+SHEETS = {"vehicle": "crsp_vehicles.json", "motorcycle": "crsp_motorcycles.json"}
+
+
+# ── Loading ───────────────────────────────────────────────────────────────
+
+def load_release(source):
+    """{"vehicle": [row, ...], "motorcycle": [row, ...]} from .xlsx or a data dir."""
+    source = Path(source)
+    if source.suffix == ".xlsx":
+        wb = open_workbook(source)
+        rows = {"vehicle": list(parse_vehicles(wb)), "motorcycle": list(parse_motorcycles(wb))}
+        wb.close()
+        return rows
+    return {kind: json.loads((source / name).read_text()) for kind, name in SHEETS.items()}
+
+
+def release_digest(rows):
+    raw = json.dumps(rows, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+# ── Matching ──────────────────────────────────────────────────────────────
+
+def spec(row):
+    return json.dumps({k: v for k, v in row.items() if k != "crsp_kes"}, sort_keys=True, ensure_ascii=False)
+
+
+def row_key(row):
+    return (row["make"], row["model"], row.get("model_number"))
+
+
+def location(kind, row):
+    """(category, make) the row lands in in the cascade, or None if skipped."""
+    if kind == "motorcycle":
+        return ("Motorcycle", title_case(row["make"]))
+    category = CATEGORY_MAP.get((row.get("body_type") or "").strip())
+    return (category, title_case(row["make"])) if category else None
+
+
+def diff_rows(kind, old_rows, new_rows):
+    """Change records for one sheet → (changes dict, unchanged count)."""
+    old_by_spec, new_by_spec = defaultdict(list), defaultdict(list)
+    for row in old_rows:
+        old_by_spec[spec(row)].append(row)
+    for row in new_rows:
+        new_by_spec[spec(row)].append(row)
+
+    changes = {"added": [], "removed": [], "repriced": [], "modified": []}
+    unmatched_old, unmatched_new = [], []
+    unchanged = 0
+    for s in old_by_spec.keys() | new_by_spec.keys():
+        old = sorted(old_by_spec.get(s, []), key=lambda r: r["crsp_kes"])
+        new = sorted(new_by_spec.get(s, []), key=lambda r: r["crsp_kes"])
+        # Same spec and price first, then pair the rest off by price
+        new_prices = defaultdict(int)
+        for r in new:
+            new_prices[r["crsp_kes"]] += 1
+        left_old = []
+        for r in old:
+            if new_prices[r["crsp_kes"]]:
+                new_prices[r["crsp_kes"]] -= 1
+                unchanged += 1
+            else:
+                left_old.append(r)
+        left_new = []
+        for r in new:
+            if new_prices[r["crsp_kes"]]:
+                new_prices[r["crsp_kes"]] -= 1
+                left_new.append(r)
+        for o, n in zip(left_old, left_new):
+            changes["repriced"].append({"kind": kind, "row": n, "old_crsp": o["crsp_kes"], "new_crsp": n["crsp_kes"]})
+        unmatched_old += left_old[len(left_new):]
+        unmatched_new += left_new[len(left_old):]
+
+    # Rows whose spec changed but whose make/model/model number still pair 1:1
+    old_by_key, new_by_key = defaultdict(list), defaultdict(list)
+    for row in unmatched_old:
+        old_by_key[row_key(row)].append(row)
+    for row in unmatched_new:
+        new_by_key[row_key(row)].append(row)
+    for key in old_by_key.keys() | new_by_key.keys():
+        old, new = old_by_key.get(key, []), new_by_key.get(key, [])
+        if len(old) == 1 and len(new) == 1:
+            fields = sorted(k for k in old[0].keys() | new[0].keys() if old[0].get(k) != new[0].get(k))
+            changes["modified"].append({"kind": kind, "old": old[0], "new": new[0], "fields": fields})
+            continue
+        changes["removed"] += [{"kind": kind, "row": r} for r in old]
+        changes["added"] += [{"kind": kind, "row": r} for r in new]
+    return changes, unchanged
+
+
+def diff_releases(old, new):
+    changes = {"added": [], "removed": [], "repriced": [], "modified": []}
+    unchanged = 0
+    for kind in SHEETS:
+        sheet_changes, n = diff_rows(kind, old[kind], new[kind])
+        unchanged += n
+        for name, records in sheet_changes.items():
+            changes[name] += sorted(records, key=lambda c: json.dumps(c, sort_keys=True, ensure_ascii=False))
+
+    touched = set()
+    for name, records in changes.items():
+        for c in records:
+            for row in ([c["old"], c["new"]] if name == "modified" else [c["row"]]):
+                loc = location(c["kind"], row)
+                if loc:
+                    touched.add(loc)
+                    c.setdefault("locations", []).append(list(loc))
+
+    summary = {name: len(records) for name, records in changes.items()}
+    summary["unchanged"] = unchanged
+    return {"summary": summary, "touched": sorted(list(t) for t in touched), **changes}
+
+
+def load_touched(path=CHANGES_FILE):
+    """[(category, make), ...] from a change set file."""
+    return [tuple(t) for t in json.loads(Path(path).read_text())["touched"]]
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two CRSP releases into a change set.")
+    parser.add_argument("new", type=Path, help="new release: .xlsx or a directory of crsp_*.json")
+    parser.add_argument("--old", type=Path, default=DATA_DIR, help="old release (default: data/)")
+    parser.add_argument("-o", "--out", type=Path, default=CHANGES_FILE, help="change set path")
+    parser.add_argument("--apply", action="store_true",
+                        help="also write the new release's rows to data/crsp_*.json")
+    args = parser.parse_args(argv)
+
+    old, new = load_release(args.old), load_release(args.new)
+    changes = diff_releases(old, new)
+    changes = {
+        "old": {"source": str(args.old), "sha1": release_digest(old)},
+        "new": {"source": str(args.new), "sha1": release_digest(new)},
+        **changes,
+    }
+    args.out.write_text(json.dumps(changes, indent=1, ensure_ascii=False))
+
+    s = changes["summary"]
+    print(f"{s['added']} added, {s['removed']} removed, {s['repriced']} repriced, "
+          f"{s['modified']} modified, {s['unchanged']} unchanged")
+    print(f"Touches {len(changes['touched'])} makes in "
+          f"{len({c for c, _ in changes['touched']})} categories")
+    print(f"Written → {args.out}")
+
+    if args.apply:
+        for kind, name in SHEETS.items():
+            write_json_array(DATA_DIR / name, new[kind])
+        print(f"Written → data/{', data/'.join(SHEETS.values())}")
+    return changes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Compact in-memory CRSP data shared by the pipeline scripts.
+
+json.loads gives one dict per row: ~900 bytes for an 11-field vehicle row
+before its strings, and the same "GASOLINE" / "AT" / "SUV" values repeated
+thousands of times. This module keeps the same data in two compact forms:
+
+  Sheet          one CRSP sheet (data/crsp_vehicles.json or
+                 crsp_motorcycles.json) as parallel columns. Categorical
+                 fields (make, fuel, body type, cc, ...) are 16-bit codes
+                 into a shared Codes table, prices a 64-bit array, free
+                 text (model, model number) interned strings.
+  CascadeEntry   one data/crsp_cascade.json model entry as a slotted record;
+                 fuel and transmission are Codes codes. It reads like the
+                 dict it replaces (entry["model"], entry.get("cc"),
+                 entry.items()), so page code is unchanged; pass
+                 default=json_default when json.dumps meets one.
+
+Used by build_crsp_cascade.py (sheets) and generate_pages.py /
+render_server.py (cascade). crsp_to_json.py streams rows straight to disk
+and never holds a sheet; VEHICLE_FIELDS / MOTORCYCLE_FIELDS mirror the dicts
+it writes, and Sheet.row() gives them back key for key.
+
+Memory: python3 scripts/bench_crsp_store.py
+"""
+
+import json
+import sys
+from array import array
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+CASCADE_FILE = DATA_DIR / "crsp_cascade.json"
+
+# Row schema of data/crsp_*.json, in file order
+VEHICLE_FIELDS = ("make", "model", "model_number", "transmission", "drive", "engine_cc",
+                  "body_type", "gvw", "seating", "fuel", "crsp_kes")
+MOTORCYCLE_FIELDS = ("make", "model", "model_number", "transmission", "engine_cc",
+                     "seating", "fuel", "crsp_kes")
+SHEET_FILES = {"vehicle": "crsp_vehicles.json", "motorcycle": "crsp_motorcycles.json"}
+SHEET_FIELDS = {"vehicle": VEHICLE_FIELDS, "motorcycle": MOTORCYCLE_FIELDS}
+
+TEXT_FIELDS = {"model", "model_number"}
+PRICE_FIELDS = {"crsp_kes"}
+
+
+# ── Code tables ───────────────────────────────────────────────────────────
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Codes:
+    """value ↔ small int code. Code 0 is always None; strings are interned.
+    Codes are assigned in first-seen order, keyed on (type, value) so 1 and
+    1.0 stay distinct."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values = [None]
+        self._codes = {(type(None), None): 0}
+
+    def encode(self, value):
+        key = (type(value), value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(_intern(value))
+        return code
+
+    def encode_all(self, values):
+        """Codes for a whole column: new values are added once, then plain lookups."""
+        keys = [(type(value), value) for value in values]
+        for key in dict.fromkeys(keys):
+            if key not in self._codes:
+                self.encode(key[1])
+        return map(self._codes.__getitem__, keys)
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+    def map(self, fn):
+        """[fn(value) for every code], None kept as None — a per-code lookup table."""
+        return [None if v is None else fn(v) for v in self.values]
+
+
+# One table per categorical field, shared by every Sheet so codes compare
+# across sheets and releases
+CODES = {field: Codes() for field in VEHICLE_FIELDS if field not in TEXT_FIELDS | PRICE_FIELDS}
+FUELS = Codes()          # cascade entry fuel ("Gasoline", ...)
+TRANSMISSIONS = Codes()  # cascade entry tx ("AT", "6MT", ...)
+
+
+# ── Sheets ────────────────────────────────────────────────────────────────
+
+class Sheet:
+    """One CRSP sheet as columns: sheet.codes("fuel")[i], sheet.column("model")[i]."""
+
+    __slots__ = ("kind", "fields", "_columns")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.fields = SHEET_FIELDS[kind]
+        self._columns = {}
+        for field in self.fields:
+            if field in TEXT_FIELDS:
+                self._columns[field] = []
+            elif field in PRICE_FIELDS:
+                self._columns[field] = array("q")
+            else:
+                self._columns[field] = array("H")
+
+    @classmethod
+    def from_rows(cls, kind, rows):
+        sheet = cls(kind)
+        sheet.extend(rows)
+        return sheet
+
+    @classmethod
+    def load(cls, kind, path=None, batch=512):
+        """Sheet from data/crsp_*.json without ever holding all its dicts.
+
+        object_hook hands over each row dict as soon as it is parsed and
+        puts None in the list instead; rows are turned into columns a batch
+        at a time, so their memory is reused rather than left behind as
+        freed-but-resident arenas.
+        """
+        sheet = cls(kind)
+        path = path or DATA_DIR / SHEET_FILES[kind]
+        pending = []
+
+        def hook(row):
+            pending.append(row)
+            if len(pending) >= batch:
+                sheet.extend(pending)
+                pending.clear()
+
+        json.loads(Path(path).read_text(), object_hook=hook)
+        sheet.extend(pending)
+        return sheet
+
+    def extend(self, rows):
+        """Append rows (dicts) column by column."""
+        rows = list(rows)
+        for field, column in self._columns.items():
+            values = [row.get(field) for row in rows]
+            if field in TEXT_FIELDS:
+                column.extend(map(_intern, values))
+            elif field in PRICE_FIELDS:
+                column.extend(values)
+            else:
+                column.extend(CODES[field].encode_all(values))
+
+    def append(self, row):
+        self.extend([row])
+
+    def __len__(self):
+        return len(self._columns["make"])
+
+    def codes(self, field):
+        """Raw column: codes into CODES[field] (or the text/price values themselves)."""
+        return self._columns[field]
+
+    def column(self, field):
+        """Decoded values of one field."""
+        column = self._columns[field]
+        if field in TEXT_FIELDS or field in PRICE_FIELDS:
+            return column
+        values = CODES[field].values
+        return [values[c] for c in column]
+
+    def row(self, i):
+        """Row i as the dict crsp_to_json.py wrote."""
+        out = {}
+        for field in self.fields:
+            value = self._columns[field][i]
+            out[field] = value if field in TEXT_FIELDS or field in PRICE_FIELDS else CODES[field][value]
+        return out
+
+    def rows(self):
+        return map(self.row, range(len(self)))
+
+
+class CrspStore:
+    """Both sheets of one CRSP release."""
+
+    __slots__ = ("vehicles", "motorcycles")
+
+    def __init__(self, vehicles, motorcycles):
+        self.vehicles = vehicles
+        self.motorcycles = motorcycles
+
+    @classmethod
+    def load(cls, data_dir=DATA_DIR):
+        data_dir = Path(data_dir)
+        return cls(*(Sheet.load(kind, data_dir / name) for kind, name in SHEET_FILES.items()))
+
+    def sheets(self):
+        return {"vehicle": self.vehicles, "motorcycle": self.motorcycles}
+
+
+# ── Cascade entries ───────────────────────────────────────────────────────
+
+ENTRY_KEYS = ("model", "crsp", "mn", "cc", "fuel", "tx")  # crsp_cascade.json key order
+
+
+class CascadeEntry:
+    """One model of data/crsp_cascade.json; behaves as a read-only dict.
+
+    Absent keys (no "mn", no "cc", ...) stay absent: get() returns the
+    default, entry["cc"] raises KeyError, items() skips them.
+    """
+
+    __slots__ = ("model", "crsp", "mn", "cc", "_fuel", "_tx")
+
+    def __init__(self, model, crsp, mn=None, cc=None, fuel=None, tx=None):
+        self.model = model
+        self.crsp = crsp
+        self.mn = mn
+        self.cc = sys.intern(cc) if isinstance(cc, str) else cc
+        self._fuel = FUELS.encode(fuel)
+        self._tx = TRANSMISSIONS.encode(tx)
+
+    @property
+    def fuel(self):
+        return FUELS.values[self._fuel]
+
+    @property
+    def tx(self):
+        return TRANSMISSIONS.values[self._tx]
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in ENTRY_KEYS else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return [k for k in ENTRY_KEYS if getattr(self, k) is not None]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.keys()]
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return self.as_dict() == (other.as_dict() if isinstance(other, CascadeEntry) else other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"CascadeEntry({self.as_dict()!r})"
+
+
+def json_default(obj):
+    """json.dumps(..., default=json_default) for structures holding CascadeEntry."""
+    if isinstance(obj, CascadeEntry):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def _cascade_hook(obj):
+    if "model" in obj and "crsp" in obj:
+        return CascadeEntry(**obj)
+    return obj
+
+
+def load_cascade(path=CASCADE_FILE):
+    """data/crsp_cascade.json with each model entry as a CascadeEntry."""
+    return json.loads(Path(path).read_text(), object_hook=_cascade_hook)
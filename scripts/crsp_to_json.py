@@ -1,32 +1,56 @@
 """
 Convert KRA CRSP Excel (July 2025) to structured JSON files.
-Run: python3 scripts/crsp_to_json.py
+Run: python3 scripts/crsp_to_json.py [--fast] [--trace PATH]
 
 Outputs:
   data/crsp_vehicles.json      — all 5,200+ motor vehicle entries
   data/crsp_motorcycles.json   — motorcycle entries
   data/depreciation.json       — depreciation tables from TEMPLATE sheet
+  data/duty_rates.json         — rates of the duty regime in force (data/duty_regimes.json)
 """
 
+import argparse
 import json
-import openpyxl
+import os
+import textwrap
 from pathlib import Path
 
+import tracing
+from rate_tables import current_regime, duty_rates
+
 EXCEL_FILE = Path(__file__).parent.parent / "New-CRSP---July-2025.xlsx"
 DATA_DIR = Path(__file__).parent.parent / "data"
-DATA_DIR.mkdir(exist_ok=True)
 
-wb = openpyxl.load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+
+def open_workbook(path=EXCEL_FILE, fast=False):
+    """Open the CRSP workbook in streaming (read-only) mode.
+
+    fast=True uses xlsx_reader.XlsxReader instead of openpyxl: same values,
+    parsed straight from the sheet XML.
+    """
+    if fast:
+        from xlsx_reader import XlsxReader
+        return XlsxReader(path)
+    import openpyxl
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def find_sheet(wb, prefix):
+    """Sheet by name prefix, so "M.Vehicle CRSP July 2025" also matches the next release."""
+    for name in wb.sheetnames:
+        if name.startswith(prefix):
+            return wb[name]
+    raise KeyError(f"no sheet starting with {prefix!r} in {wb.sheetnames}")
 
 
 # ── Motor Vehicles ──────────────────────────────────────────────────────────
 
-def parse_vehicles():
-    ws = wb["M.Vehicle CRSP July 2025"]
-    vehicles = []
+def parse_vehicles(wb):
+    """Yield one dict per motor vehicle row, streaming from the sheet."""
+    ws = find_sheet(wb, "M.Vehicle CRSP")
     headers_found = False
 
-    for row in ws.iter_rows(values_only=True):
+    for row in ws.iter_rows(max_col=11, values_only=True):  # A-K: Make … CRSP
         # Skip until we find the header row
         if not headers_found:
             if row[0] == "Make":
@@ -37,9 +61,10 @@ def parse_vehicles():
 
         # Skip empty rows
         if not make or not model or not crsp:
+            tracing.count("rows_skipped")
             continue
 
-        vehicles.append({
+        yield {
             "make": str(make).strip(),
             "model": str(model).strip(),
             "model_number": str(model_number).strip() if model_number else None,
@@ -51,20 +76,17 @@ def parse_vehicles():
             "seating": seating,
             "fuel": str(fuel).strip() if fuel else None,
             "crsp_kes": round(float(crsp)),
-        })
-
-    print(f"Motor vehicles: {len(vehicles)} entries")
-    return vehicles
+        }
 
 
 # ── Motorcycles ─────────────────────────────────────────────────────────────
 
-def parse_motorcycles():
-    ws = wb["Motor Cycles July 2025"]
-    bikes = []
+def parse_motorcycles(wb):
+    """Yield one dict per motorcycle row, streaming from the sheet."""
+    ws = find_sheet(wb, "Motor Cycles")
     headers_found = False
 
-    for row in ws.iter_rows(values_only=True):
+    for row in ws.iter_rows(max_col=8, values_only=True):
         if not headers_found:
             if row[0] == "Make":
                 headers_found = True
@@ -73,9 +95,10 @@ def parse_motorcycles():
         make, model, model_number, transmission, engine_cc, seating, fuel, crsp = row[:8]
 
         if not make or not model or not crsp:
+            tracing.count("rows_skipped")
             continue
 
-        bikes.append({
+        yield {
             "make": str(make).strip(),
             "model": str(model).strip(),
             "model_number": str(model_number).strip() if model_number else None,
@@ -84,24 +107,20 @@ def parse_motorcycles():
             "seating": seating,
             "fuel": str(fuel).strip() if fuel else None,
             "crsp_kes": round(float(crsp)),
-        })
-
-    print(f"Motorcycles: {len(bikes)} entries")
-    return bikes
+        }
 
 
 # ── Depreciation Tables ─────────────────────────────────────────────────────
 # From TEMPLATE 2025 sheet rows 3-11 (0-indexed: rows 2-10)
 
-def parse_depreciation():
-    ws = wb["TEMPLATE 2025"]
-    rows = list(ws.iter_rows(values_only=True))
+def parse_depreciation(wb):
+    ws = find_sheet(wb, "TEMPLATE")
 
     # Direct imports depreciation (columns B-C, rows 3-11)
     direct = []
     previously_registered = []
 
-    for row in rows[2:]:  # skip 2 header rows
+    for row in ws.iter_rows(min_row=3, max_col=10, values_only=True):  # skip 2 header rows
         label_direct = row[1]
         pct_direct = row[2]
         label_prev = row[8]
@@ -122,45 +141,73 @@ def parse_depreciation():
     }
 
 
-# ── Duty Rates (hardcoded from KRA, these don't change with CRSP) ────────────
+# ── Duty Rates (from the regime in force, see rate_tables.py) ───────────────
 
-DUTY_RATES = {
-    "import_duty_rate": 0.25,       # 25% of customs value
-    "excise_duty_rate": 0.20,       # 20% of (CV + import duty)
-    "vat_rate": 0.16,               # 16% of (CV + import duty + excise)
-    "idf_rate": 0.0225,             # 2.25% of CV (min KES 5,000)
-    "rdl_rate": 0.015,              # 1.5% of CV
-    "idf_minimum_kes": 5000,
-    "crsp_tax_strip_divisor": 2.4469,  # strips built-in taxes from CRSP to get customs value
-    "note": "Rates as per KRA Finance Act 2025. Tax-strip divisor derived from official KRA valuation template."
-}
+DUTY_RATES = duty_rates(current_regime())
 
 
 # ── Write outputs ────────────────────────────────────────────────────────────
 
+def write_json_array(path, items):
+    """Stream an iterable of dicts to a JSON array file, one item at a time.
+
+    The output is byte-identical to json.dumps(list(items), indent=2) but
+    never holds more than one item in memory. Returns the item count.
+
+    Items go to a sibling temp file that replaces path only once the
+    iterable is exhausted, so an error mid-sheet leaves the previous file
+    intact instead of a truncated array.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    count = 0
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[")
+            for item in items:
+                f.write(",\n" if count else "\n")
+                f.write(textwrap.indent(json.dumps(item, indent=2, ensure_ascii=False), "  "))
+                count += 1
+            f.write("\n]" if count else "]")
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return count
+
+
+def write_text(path, text):
+    path.write_text(text)
+    tracing.count("bytes_written", path.stat().st_size)
+
+
 if __name__ == "__main__":
-    vehicles = parse_vehicles()
-    motorcycles = parse_motorcycles()
-    depreciation = parse_depreciation()
-
-    (DATA_DIR / "crsp_vehicles.json").write_text(
-        json.dumps(vehicles, indent=2, ensure_ascii=False)
-    )
-    print(f"Written → data/crsp_vehicles.json")
-
-    (DATA_DIR / "crsp_motorcycles.json").write_text(
-        json.dumps(motorcycles, indent=2, ensure_ascii=False)
-    )
-    print(f"Written → data/crsp_motorcycles.json")
-
-    (DATA_DIR / "depreciation.json").write_text(
-        json.dumps(depreciation, indent=2, ensure_ascii=False)
-    )
+    parser = argparse.ArgumentParser(description="Convert the KRA CRSP workbook to JSON.")
+    parser.add_argument("--fast", action="store_true",
+                        help="read the workbook with xlsx_reader instead of openpyxl (identical output)")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of this run (also: CRSP_TRACE)")
+    args = parser.parse_args()
+    tracing.start(args.trace, "crsp_to_json")
+
+    DATA_DIR.mkdir(exist_ok=True)
+    with tracing.span("open workbook", fast=args.fast):
+        wb = open_workbook(fast=args.fast)
+
+    for kind, parse in (("vehicles", parse_vehicles), ("motorcycles", parse_motorcycles)):
+        path = DATA_DIR / f"crsp_{kind}.json"
+        with tracing.span(f"parse {kind}"):
+            n = write_json_array(path, parse(wb))
+        tracing.count("rows_parsed", n)
+        tracing.count("bytes_written", path.stat().st_size)
+        print(f"{'Motor vehicles' if kind == 'vehicles' else 'Motorcycles'}: {n} entries")
+        print(f"Written → data/crsp_{kind}.json")
+
+    with tracing.span("parse depreciation"):
+        write_text(DATA_DIR / "depreciation.json", json.dumps(parse_depreciation(wb), indent=2, ensure_ascii=False))
     print(f"Written → data/depreciation.json")
 
-    (DATA_DIR / "duty_rates.json").write_text(
-        json.dumps(DUTY_RATES, indent=2, ensure_ascii=False)
-    )
+    write_text(DATA_DIR / "duty_rates.json", json.dumps(DUTY_RATES, indent=2, ensure_ascii=False))
     print(f"Written → data/duty_rates.json")
 
+    wb.close()
     print("\nDone. All CRSP data extracted to /data/")
+    tracing.finish()
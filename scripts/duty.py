@@ -0,0 +1,75 @@
+"""
+KRA import duty engine — scalar and vectorised.
+
+calculate_duty(crsp, year) prices one vehicle-year. calculate_duty_batch()
+prices whole arrays of them with NumPy in a single pass, using the same
+float64 operations in the same order so every rounded component matches
+the scalar version exactly (both round half to even).
+
+Both run on the compiled engine of the current duty regime
+(rate_tables.py); reports comparing regimes use rate_tables directly.
+
+Used by: generate_pages.py and any reporting tools that need duty for the
+full CRSP table.
+"""
+
+import numpy as np
+
+from rate_tables import COMPONENTS, current_regime, engine
+
+# ── KRA constants ─────────────────────────────────────────────────────────
+# Rates, divisor and depreciation come from the regime in force (see
+# rate_tables.py and data/duty_regimes.json); CURRENT_YEAR is the year
+# vehicles are valued in.
+
+CURRENT_YEAR = 2026
+REGIME       = current_regime()
+ENGINE       = engine(REGIME, CURRENT_YEAR)
+
+DIVISOR      = REGIME["divisor"]
+IDF_MINIMUM  = REGIME["idf_minimum"]
+# (max age in years, depreciation rate)
+DEPRECIATION = [tuple(step) for step in REGIME["depreciation"]]
+MAX_AGE      = ENGINE.max_age
+
+# Years shown on model pages, newest first
+VALID_YEARS = list(range(CURRENT_YEAR, CURRENT_YEAR - MAX_AGE - 1, -1))
+
+# ── Scalar ────────────────────────────────────────────────────────────────
+
+def get_depreciation(age):
+    return ENGINE.depreciation(age)
+
+def calculate_duty(crsp, year):
+    return ENGINE.duty(crsp, year)
+
+# ── Batch ─────────────────────────────────────────────────────────────────
+
+def calculate_duty_batch(crsp, years):
+    """Vectorised calculate_duty over broadcastable arrays of CRSP and year.
+
+    Returns a dict of int64 arrays: every name in COMPONENTS plus "depr_pct"
+    and "age", and a boolean "valid" mask. Entries where the scalar version
+    returns None (older than MAX_AGE) have valid=False and zeroed components.
+    """
+    return ENGINE.batch(crsp, years)
+
+def duty_grid(crsps, years=VALID_YEARS):
+    """Duty for every (crsp, year) pair, computed in one vectorised pass.
+
+    Returns one list per CRSP value holding, for each year, the same dict
+    calculate_duty() would return (or None for out-of-range years).
+    """
+    if not len(crsps):
+        return []
+    batch = calculate_duty_batch(np.asarray(crsps)[:, None], np.asarray(years)[None, :])
+    keys  = COMPONENTS + ["depr_pct", "age"]
+    cols  = {k: batch[k].tolist() for k in keys}
+    valid = batch["valid"].tolist()
+    return [
+        [
+            {k: cols[k][i][j] for k in keys} if valid[i][j] else None
+            for j in range(len(years))
+        ]
+        for i in range(len(crsps))
+    ]
@@ -0,0 +1,150 @@
+"""
+Precomputed duty matrix shipped alongside crsp_cascade.json.
+
+For every cascade entry and every valid year of manufacture, the matrix
+holds the total duty and its components, so pages and the client can look
+values up instead of recomputing them.
+
+Outputs (written by build_crsp_cascade.py):
+  data/duty_matrix.bin   — little-endian uint32, column-major:
+                           [column][entry][year], columns in COMPONENTS order
+  data/duty_matrix.json  — header: version, years (with their depreciation
+                           and age), columns, shape, the cascade's CRSP
+                           digest and the first entry index of every
+                           category/make
+
+Entries are numbered in cascade order (category → make → model, exactly as
+in crsp_cascade.json), so entry = index[category][make] + model position.
+
+The version stamp hashes DUTY_RATES, DEPRECIATION and CURRENT_YEAR; a
+matrix built under different rates is rejected by load_duty_matrix().
+generate_pages.py reads its duty tables from here through DutyMatrix.load(),
+which rebuilds in memory when the file is stale or was built from another
+cascade.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from duty import COMPONENTS, CURRENT_YEAR, DEPRECIATION, REGIME, VALID_YEARS, calculate_duty_batch
+from rate_tables import duty_rates
+
+DATA_DIR    = Path(__file__).parent.parent / "data"
+MATRIX_BIN  = DATA_DIR / "duty_matrix.bin"
+MATRIX_JSON = DATA_DIR / "duty_matrix.json"
+
+DTYPE = np.dtype("<u4")
+
+
+def matrix_version():
+    raw = json.dumps(
+        {"duty_rates": duty_rates(REGIME), "depreciation": DEPRECIATION, "current_year": CURRENT_YEAR},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def crsp_digest(cascade):
+    """Digest of what the matrix is built from: the layout and CRSP of every entry."""
+    raw = json.dumps(
+        [[category, make, [m["crsp"] for m in models]]
+         for category, makes in cascade.items() for make, models in makes.items()],
+        separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+# ── Build ────────────────────────────────────────────────────────────────────
+
+def build_duty_matrix(cascade):
+    """cascade: {category: {make: [entry, ...]}} → (header, uint32 array)"""
+    index = {}
+    crsps = []
+    for category, makes in cascade.items():
+        index[category] = {}
+        for make, models in makes.items():
+            index[category][make] = len(crsps)
+            crsps.extend(m["crsp"] for m in models)
+
+    batch = calculate_duty_batch(np.asarray(crsps)[:, None], np.asarray(VALID_YEARS)[None, :])
+    columns = np.stack([batch[c] for c in COMPONENTS])
+    if columns.size and columns.max() > np.iinfo(DTYPE).max:
+        raise ValueError("duty value exceeds uint32 range; widen DTYPE")
+
+    per_year = calculate_duty_batch(np.ones(len(VALID_YEARS)), np.asarray(VALID_YEARS))
+    header = {
+        "version": matrix_version(),
+        "cascade": crsp_digest(cascade),
+        "dtype": DTYPE.str,
+        "columns": COMPONENTS,
+        "years": VALID_YEARS,
+        "depr_pct": per_year["depr_pct"].tolist(),
+        "age": per_year["age"].tolist(),
+        "shape": [len(COMPONENTS), len(crsps), len(VALID_YEARS)],
+        "index": index,
+    }
+    return header, columns.astype(DTYPE)
+
+
+def write_duty_matrix(cascade):
+    header, matrix = build_duty_matrix(cascade)
+    MATRIX_BIN.write_bytes(matrix.tobytes())
+    MATRIX_JSON.write_text(json.dumps(header, separators=(",", ":"), ensure_ascii=False))
+    return header, len(matrix.tobytes())
+
+
+# ── Load ─────────────────────────────────────────────────────────────────────
+
+class DutyMatrix:
+    def __init__(self, header, matrix):
+        self.header  = header
+        self.matrix  = matrix
+        self.years   = header["years"]
+        self._col    = {c: i for i, c in enumerate(header["columns"])}
+        self._year   = {y: i for i, y in enumerate(self.years)}
+
+    def entry(self, category, make, position):
+        return self.header["index"][category][make] + position
+
+    def lookup(self, category, make, position, year):
+        """Duty components for one vehicle-year, or None if the year is not valid."""
+        j = self._year.get(year)
+        if j is None:
+            return None
+        i = self.entry(category, make, position)
+        return {c: int(self.matrix[k, i, j]) for c, k in self._col.items()}
+
+    def grid(self, category, make, count):
+        """duty.duty_grid() for the first count models of one make, read from the matrix."""
+        i = self.header["index"][category][make]
+        block = self.matrix[:, i:i + count, :].tolist()  # [column][model][year]
+        columns = list(enumerate(self.header["columns"]))
+        per_year = [{"depr_pct": d, "age": a} for d, a in zip(self.header["depr_pct"], self.header["age"])]
+        return [
+            [{**{c: block[k][m][j] for k, c in columns}, **per_year[j]} for j in range(len(self.years))]
+            for m in range(count)
+        ]
+
+    @classmethod
+    def load(cls, cascade):
+        """The persisted matrix if it matches these rates and this cascade, else one built in memory."""
+        if MATRIX_JSON.exists() and MATRIX_BIN.exists():
+            header = json.loads(MATRIX_JSON.read_text())
+            if header.get("version") == matrix_version() and header.get("cascade") == crsp_digest(cascade):
+                matrix = np.fromfile(MATRIX_BIN, dtype=np.dtype(header["dtype"])).reshape(header["shape"])
+                return cls(header, matrix)
+        return cls(*build_duty_matrix(cascade))
+
+
+def load_duty_matrix():
+    header = json.loads(MATRIX_JSON.read_text())
+    if header["version"] != matrix_version():
+        raise ValueError(
+            f"stale duty matrix (built for {header['version']}, rates are {matrix_version()}); "
+            "rerun scripts/build_crsp_cascade.py"
+        )
+    matrix = np.fromfile(MATRIX_BIN, dtype=np.dtype(header["dtype"])).reshape(header["shape"])
+    return DutyMatrix(header, matrix)
@@ -0,0 +1,293 @@
+"""
+Fuzzy CRSP matching for messy make/model text from import paperwork
+("LANDCRUISER PRADO", "TOYOTA HARIER 2.0", "MERCEDES BENZ C200 AVANTGARDE").
+
+Where search_index.py answers typed prefix queries exactly, this scores
+how close free text is to each CRSP entry and tolerates typos, merged or
+split words and extra tokens:
+
+  1. Blocking. The leading words are matched against the make names
+     (spacing, punctuation and small typos ignored, plus MAKE_ALIASES),
+     and only that make's entries are considered. Text with no
+     recognisable make falls back to every entry.
+  2. Candidates. Each block has an inverted index of character trigrams
+     over the compacted model name ("landcruiserprado"); the entries
+     sharing the most trigrams with the query (CANDIDATES of them) are
+     scored. A model number anywhere in the text pulls its entries in too.
+  3. Scoring. 0–100 from trigram overlap — half Dice, half how much of
+     the query the entry covers, so a short query still scores high
+     against a longer CRSP name — times a confidence factor for how the
+     make was found. A matching model number scores at least 95.
+
+Usage:
+  matcher = FuzzyMatcher.load()
+  matcher.match("LANDCRUISER PRADO")  → [{"category", "make", "position", "label", "crsp", "score"}, ...]
+  match_many(lines, jobs=4)            → (line, candidates) per line, in order
+
+Run: python3 scripts/fuzzy_match.py "LANDCRUISER PRADO" [--limit 5]
+     python3 scripts/fuzzy_match.py --batch FILE|- [--jobs N] > matches.ndjson
+Benchmark: python3 scripts/bench_fuzzy_match.py
+"""
+
+import argparse
+import difflib
+import heapq
+import json
+import os
+import re
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from crsp_store import load_cascade
+from search_index import tokenize
+
+CANDIDATES = 40  # entries per query that get a full score
+
+# Names in paperwork that aren't a spelling of the CRSP make. CRSP makes
+# listed here as aliases share a block with their target ("Mercedes-benz"
+# trucks are found from "Mercedes" and vice versa).
+MAKE_ALIASES = {
+    "vw": "Volkswagen",
+    "benz": "Mercedes",
+    "mercedesbenz": "Mercedes",
+    "iveco": "Iveco Daily",
+    "landrover": "Landrover",
+    "rangerover": "Landrover",
+    "fuso": "Mitsubishi Fuso",
+    "ud": "Nissan Diesel/ud",
+    "nissandiesel": "Nissan Diesel/ud",
+    "suzukimaruti": "Maruti Suzuki",
+    "maruti": "Maruti Suzuki",
+    "rollsroyce": "Rolls-royce",
+}
+
+# Score factor by how the make was recognised
+EXACT_MAKE, FUZZY_MAKE, NO_MAKE = 1.0, 0.95, 0.9
+MN_SCORE = 95
+# Engine size in the text ("2.0", "1998cc") is left out of the model name
+# comparison and instead adds CC_BONUS to entries of that displacement
+CC_RE = re.compile(r"\d\.\d|\d{3,4}cc")
+CC_BONUS = 5
+
+
+def compact(tokens):
+    return "".join(tokens)
+
+
+def engine_litres(token):
+    return float(token) if "." in token else int(token[:-2]) / 1000
+
+
+def trigrams(text):
+    text = f"^{text}$"
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# ── Index ─────────────────────────────────────────────────────────────────
+
+class FuzzyMatcher:
+    def __init__(self, cascade):
+        self.docs = []          # (category, make, position, label, crsp)
+        self.doc_grams = []     # trigram set per doc
+        self.doc_litres = []    # engine size per doc, None if unknown
+        self.blocks = {}        # make key → {"docs": [...], "grams": {trigram: [...]}}
+        self.makes = {}         # make key → [make names sharing it]
+        self.by_mn = {}         # compacted model number → [doc ids]
+        all_grams = {}
+        self.aliases = {alias: compact(tokenize(make)) for alias, make in MAKE_ALIASES.items()}
+
+        for category, makes in cascade["data"].items():
+            for make, models in makes.items():
+                key = compact(tokenize(make))
+                key = self.aliases.get(key, key)
+                self.makes.setdefault(key, [])
+                if make not in self.makes[key]:
+                    self.makes[key].append(make)
+                block = self.blocks.setdefault(key, {"docs": [], "grams": {}})
+                for position, entry in enumerate(models):
+                    doc = len(self.docs)
+                    grams = trigrams(compact(tokenize(entry["model"])))
+                    self.docs.append((category, make, position, f"{make} {entry['model']}", entry["crsp"]))
+                    self.doc_grams.append(grams)
+                    cc = entry.get("cc")
+                    self.doc_litres.append(cc / 1000 if isinstance(cc, int) else None)
+                    block["docs"].append(doc)
+                    for g in grams:
+                        block["grams"].setdefault(g, []).append(doc)
+                        all_grams.setdefault(g, []).append(doc)
+                    mn = compact(tokenize(entry.get("mn", "")))
+                    if mn:
+                        self.by_mn.setdefault(mn, []).append(doc)
+        self.everything = {"docs": list(range(len(self.docs))), "grams": all_grams}
+        self.make_keys = sorted(self.makes, key=len, reverse=True)
+
+    @classmethod
+    def load(cls):
+        return cls(load_cascade())
+
+    # ── Blocking ──────────────────────────────────────────────────────────
+
+    def find_make(self, tokens):
+        """(make key or None, tokens left for the model, confidence factor)."""
+        for n in (3, 2, 1):
+            if len(tokens) < n:
+                continue
+            head = compact(tokens[:n])
+            key = self.aliases.get(head) or (head if head in self.makes else None)
+            if key:
+                return key, tokens[n:], EXACT_MAKE
+        for n in (2, 1):
+            if len(tokens) < n:
+                continue
+            head = compact(tokens[:n])
+            if len(head) < 4:
+                continue
+            close = difflib.get_close_matches(head, self.make_keys, n=1, cutoff=0.8)
+            if close:
+                return close[0], tokens[n:], FUZZY_MAKE
+        return None, tokens, NO_MAKE
+
+    # ── Matching ──────────────────────────────────────────────────────────
+
+    def candidates(self, block, grams, limit=CANDIDATES):
+        counts = Counter()
+        index = block["grams"]
+        for g in grams:
+            docs = index.get(g)
+            if docs:
+                counts.update(docs)
+        # Ties broken by doc id, not by set order (which varies with the hash seed)
+        return heapq.nsmallest(limit, counts, key=lambda doc: (-counts[doc], doc))
+
+    def score(self, grams, doc):
+        other = self.doc_grams[doc]
+        shared = len(grams & other)
+        if not shared:
+            return 0.0
+        dice = 2 * shared / (len(grams) + len(other))
+        covered = shared / len(grams)
+        return 100 * (dice + covered) / 2
+
+    def match(self, text, limit=5, block_by_make=True):
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        key, rest, factor = self.find_make(tokens) if block_by_make else (None, tokens, NO_MAKE)
+        block = self.blocks[key] if key else self.everything
+        litres = {engine_litres(t) for t in rest if CC_RE.fullmatch(t)}
+        rest = [t for t in rest if not CC_RE.fullmatch(t)]
+        grams = trigrams(compact(rest or tokens))
+
+        docs = set(self.candidates(block, grams) if block_by_make else block["docs"])
+        mn_docs = set()
+        for n in (1, 2, 3):
+            for i in range(len(tokens) - n + 1):
+                mn_docs.update(self.by_mn.get(compact(tokens[i:i + n]), ()))
+        if key:
+            mn_docs = {d for d in mn_docs if compact(tokenize(self.docs[d][1])) == key}
+        docs |= mn_docs
+
+        scored = []
+        for doc in docs:
+            s = self.score(grams, doc) * factor
+            size = self.doc_litres[doc]
+            if litres and size and any(abs(size - l) < 0.06 for l in litres):
+                s = min(s + CC_BONUS, 100)
+            if doc in mn_docs:
+                s = max(s, MN_SCORE)
+            if s > 0:
+                scored.append((-s, len(self.docs[doc][3]), doc))
+        scored.sort()
+
+        results = []
+        for neg, _, doc in scored[:limit]:
+            category, make, position, label, crsp = self.docs[doc]
+            results.append({
+                "category": category, "make": make, "position": position,
+                "label": label, "crsp": crsp, "score": round(-neg, 1),
+            })
+        return results
+
+
+# ── Batch ─────────────────────────────────────────────────────────────────
+
+_matcher = None
+
+
+def init_worker():
+    global _matcher
+    _matcher = FuzzyMatcher.load()
+
+
+def match_chunk(texts, limit=5):
+    return [_matcher.match(t, limit) for t in texts]
+
+
+def chunked(items, size):
+    items = iter(items)
+    while True:
+        block = list(islice(items, size))
+        if not block:
+            return
+        yield block
+
+
+def match_many(texts, jobs=1, limit=5, chunk=256):
+    """(text, candidates) for every text, in input order.
+
+    jobs > 1 spreads chunks of texts over a process pool; each worker
+    builds its own matcher once. At most 2 × jobs chunks are in flight, so
+    memory stays bounded however long the input is: the next chunk is only
+    read once the oldest one has been yielded.
+    """
+    if jobs <= 1:
+        if _matcher is None:
+            init_worker()
+        for block in chunked(texts, chunk):
+            yield from zip(block, match_chunk(block, limit))
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        pending = deque()
+        for block in chunked(texts, chunk):
+            pending.append((block, pool.submit(match_chunk, block, limit)))
+            if len(pending) >= 2 * jobs:
+                block, future = pending.popleft()
+                yield from zip(block, future.result())
+        while pending:
+            block, future = pending.popleft()
+            yield from zip(block, future.result())
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Best CRSP matches for free-text vehicle descriptions.")
+    parser.add_argument("text", nargs="*", help="description to match")
+    parser.add_argument("--batch", metavar="FILE", help="match every line of FILE (- for stdin), NDJSON to stdout")
+    parser.add_argument("--limit", type=int, default=5, help="candidates per description (default: 5)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for --batch (0 = all CPUs)")
+    args = parser.parse_args(argv)
+    if not args.batch and not args.text:
+        parser.error("text is required unless --batch is given")
+
+    if args.batch:
+        src = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        jobs = args.jobs or os.cpu_count() or 1
+        try:
+            lines = (line.rstrip("\n") for line in src)
+            for query, results in match_many(lines, jobs=jobs, limit=args.limit):
+                print(json.dumps({"query": query, "candidates": results}, ensure_ascii=False))
+        finally:
+            if src is not sys.stdin:
+                src.close()
+        return
+
+    matcher = FuzzyMatcher.load()
+    for r in matcher.match(" ".join(args.text), args.limit):
+        print(f"{r['score']:>5}  {r['category']:<15} {r['label']:<50} KES {r['crsp']:,}")
+
+
+if __name__ == "__main__":
+    main()
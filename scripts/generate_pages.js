@@ -8,7 +8,7 @@
 
 import { mkdirSync, writeFileSync } from "fs";
 import { resolve } from "path";
-import { slugify, renderUrl, relatedVehiclesCrossMake } from "../plugins/render.js";
+import { slugify, makeSlugFor, buildModelIndex, renderUrl, relatedVehiclesCrossMake } from "../plugins/render.js";
 
 const ROOT       = new URL("..", import.meta.url).pathname;
 const OUT_DIR    = resolve(ROOT, "dist");
@@ -21,16 +21,6 @@ const LASTMOD    = new Date().toISOString().slice(0, 10); // build date
 import { readFileSync } from "fs";
 const crsp = JSON.parse(readFileSync(resolve(ROOT, "data/crsp_cascade.json"), "utf-8"));
 
-function buildModelIndex(models) {
-  const seen = {};
-  return models.map((m, i) => {
-    let slug = slugify(m.model) || `model-${i}`;
-    if (seen[slug] !== undefined) slug = `${slug}-${i}`;
-    seen[slug] = i;
-    return { ...m, slug };
-  });
-}
-
 let count = 0;
 
 // ── Sitemap helpers ──────────────────────────────────────────────────────────
@@ -71,7 +61,7 @@ for (const category of crsp.categories) {
   const catUrls = [];
 
   for (const [make, models] of Object.entries(crsp.data[category])) {
-    const makeSlug = slugify(make);
+    const makeSlug = makeSlugFor(category, make);
     const makeDir  = `${catDir}/${makeSlug}`;
     mkdirSync(makeDir, { recursive: true });
 
@@ -82,7 +72,7 @@ for (const category of crsp.categories) {
       catUrls.push(urlEntry(`/${catSlug}/${makeSlug}/`, "0.7", "monthly"));
     }
 
-    for (const m of buildModelIndex(models)) {
+    for (const m of buildModelIndex(category, make, models)) {
       const modelDir = `${makeDir}/${m.slug}`;
       mkdirSync(modelDir, { recursive: true });
 
@@ -124,8 +114,8 @@ const seenPairs = new Set();
 for (const category of crsp.categories) {
   const catSlug = slugify(category);
   for (const [make, models] of Object.entries(crsp.data[category])) {
-    const makeSlug = slugify(make);
-    const indexed  = buildModelIndex(models);
+    const makeSlug = makeSlugFor(category, make);
+    const indexed  = buildModelIndex(category, make, models);
     for (const m of indexed) {
       const comboA = `${makeSlug}-${m.slug}`;
       // Cross-make: pair with the closest-CRSP models across the whole
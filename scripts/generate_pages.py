@@ -8,86 +8,89 @@ Page hierarchy:
   /suv/                           → category listing (makes + counts)
   /suv/toyota/                    → make listing (all Toyota SUVs)
   /suv/toyota/harrier/            → model page (duty table for all valid years)
+  /suv/toyota/harrier/2022/       → year page (full duty breakdown for one year)
   /motorcycle/honda/cb400x/       → etc.
 
-Run: python3 scripts/generate_pages.py
+Only pages whose inputs changed since the last run are rewritten; see
+data/.pages-manifest.json, or pass --force to rebuild everything. After a
+CRSP release, --changes data/crsp_changes.json (from crsp_diff.py) limits
+the run to the makes that actually changed.
+
+Run: python3 scripts/generate_pages.py [--jobs N] [--force] [--no-years] [--minify] [--output BACKEND]
+                                      [--changes FILE] [--trace PATH]
 Also called by: npm run generate
 """
 
+import argparse
+import hashlib
 import json
-import re
+import os
 import math
 import shutil
+import sys
+import threading
+import time
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Array
+from functools import lru_cache, partial
+
+from crsp_store import json_default, load_cascade
+from page_output import DIRECTORY_BACKENDS, PipelinedOutput, is_archive, open_output
+from duty import CURRENT_YEAR, MAX_AGE, DIVISOR, REGIME, VALID_YEARS, duty_grid
+from duty_matrix import DutyMatrix
+from slug_index import SlugIndex
+from slugs import slugify
+from templates import Template, minify_html
+import tracing
 
 # ── Config ────────────────────────────────────────────────────────────────
 
 ROOT         = Path(__file__).parent.parent
 CASCADE_FILE = ROOT / "data" / "crsp_cascade.json"
 PUBLIC_DIR   = ROOT / "public"
+# Kept out of public/, which Vite copies into dist/ as-is
+MANIFEST_FILE = ROOT / "data" / ".pages-manifest.json"
+LEGACY_MANIFEST_FILE = PUBLIC_DIR / ".pages-manifest.json"
+
+# Bump whenever the page templates change so the next run rewrites every page.
+TEMPLATE_VERSION = 3
 
 SITE_URL     = "https://carduty.co.ke"
 CSS_PATH     = "/css/styles.css"
 
-CURRENT_YEAR = 2026
-MAX_AGE      = 8
-DIVISOR      = 2.4469
-
-FINANCE_ACT_URL = "https://new.kenyalaw.org/akn/ke/act/2025/9/eng"
+FINANCE_ACT_URL = REGIME["url"]
 CRSP_EXCEL_URL  = "https://www.kra.go.ke/images/publications/New-CRSP---July-2025.xlsx"
 KRA_DUTY_PAGE   = "https://www.kra.go.ke/14-motor-vehicle-import-duty"
 
-DEPRECIATION = [
-    (1,  0.00),
-    (2,  0.20),
-    (3,  0.30),
-    (4,  0.40),
-    (5,  0.50),
-    (6,  0.55),
-    (7,  0.60),
-    (8,  0.65),
-]
+# Rate wording on every page, from the duty regime in force (rate_tables.py)
+
+def pct(rate):
+    return f"{rate * 100:g}%"
+
+RATE_LABELS = {
+    "divisor":         f"{REGIME['divisor']:g}",
+    "import_duty_pct": pct(REGIME["rates"]["import_duty"]),
+    "excise_pct":      pct(REGIME["rates"]["excise"]),
+    "vat_pct":         pct(REGIME["rates"]["vat"]),
+    "idf_pct":         pct(REGIME["rates"]["idf"]),
+    "rdl_pct":         pct(REGIME["rates"]["rdl"]),
+    "idf_minimum":     f"{REGIME['idf_minimum']:,}",
+    "max_age":         MAX_AGE,
+    "finance_act":     REGIME.get("act", REGIME["id"]),
+    "act_citation":    ", ".join(filter(None, [REGIME.get("act", REGIME["id"]), REGIME.get("citation")])),
+}
+DEPRECIATION_RANGE = f"{REGIME['depreciation'][0][1] * 100:g}–{pct(REGIME['depreciation'][-1][1])}"
 
 # ── Helpers ───────────────────────────────────────────────────────────────
 
-def slugify(s):
-    s = str(s).lower()
-    s = re.sub(r"[^a-z0-9\s-]", "", s)
-    s = re.sub(r"[\s]+", "-", s.strip())
-    return re.sub(r"-+", "-", s)
-
 def kes(n):
     return f"KES {int(n):,}"
 
-def get_depreciation(age):
-    for max_age, rate in DEPRECIATION:
-        if age <= max_age:
-            return rate
-    return None
-
-def calculate_duty(crsp, year):
-    age  = CURRENT_YEAR - year
-    depr = get_depreciation(age)
-    if depr is None:
-        return None
-    pre   = crsp / DIVISOR
-    cv    = pre * (1 - depr)
-    id_   = cv * 0.25
-    ed    = (cv + id_) * 0.20
-    vat   = (cv + id_ + ed) * 0.16
-    idf   = max(cv * 0.0225, 5000)
-    rdl   = cv * 0.015
-    total = id_ + ed + vat + idf + rdl
-    return {
-        "cv": round(cv), "import_duty": round(id_),
-        "excise": round(ed), "vat": round(vat),
-        "idf": round(idf), "rdl": round(rdl),
-        "total": round(total), "depr_pct": int(depr * 100), "age": age,
-    }
-
 # ── Shared HTML partials ──────────────────────────────────────────────────
 
+@lru_cache(maxsize=None)
 def header(back_label=None, back_href="/"):
     back = f'<a href="{back_href}" class="text-xs text-amber hover:underline">{back_label}</a>' if back_label else ""
     return f"""
@@ -105,6 +108,7 @@ def header(back_label=None, back_href="/"):
     </div>
   </header>"""
 
+@lru_cache(maxsize=None)
 def footer_html():
     return f"""
     <footer class="text-center text-xs text-text-subtle pb-10 space-y-2">
@@ -112,7 +116,7 @@ def footer_html():
         Source:
         <a href="{CRSP_EXCEL_URL}" class="text-amber hover:underline" target="_blank" rel="noopener noreferrer">KRA CRSP July 2025 (Excel)</a>
         &nbsp;·&nbsp;
-        <a href="{FINANCE_ACT_URL}" class="text-amber hover:underline" target="_blank" rel="noopener noreferrer">Finance Act 2025</a>
+        <a href="{FINANCE_ACT_URL}" class="text-amber hover:underline" target="_blank" rel="noopener noreferrer">{RATE_LABELS["finance_act"]}</a>
         &nbsp;·&nbsp;
         <a href="{KRA_DUTY_PAGE}" class="text-amber hover:underline" target="_blank" rel="noopener noreferrer">KRA Motor Vehicle Import Duty</a>
       </p>
@@ -156,23 +160,38 @@ def breadcrumb_html(crumbs):
     inner = " ".join(parts)
     return f'<nav class="text-xs text-text-muted flex items-center gap-1.5 flex-wrap">{inner}</nav>'
 
-# ── Category page: /suv/ ──────────────────────────────────────────────────
+FORMULA = """<section class="bg-surface border border-border rounded-2xl px-5 py-4">
+      <h3 class="font-semibold text-sm mb-3">How KRA calculated this</h3>
+      <div class="bg-surface-2 border border-border rounded-xl px-4 py-3 font-mono text-xs text-text-muted space-y-1 leading-relaxed">
+        <div>CRSP ({{crsp}}) <span class="text-text-subtle">÷ {{divisor}}</span> = pre-depreciation value</div>
+        <div>× (1 − depreciation) = <strong class="text-text">Customs Value</strong></div>
+        <div class="border-t border-border pt-1.5 mt-1.5"></div>
+        <div>CV × {{import_duty_pct}} = Import Duty</div>
+        <div>(CV + ID) × {{excise_pct}} = Excise Duty</div>
+        <div>(CV + ID + ED) × {{vat_pct}} = VAT</div>
+        <div>CV × {{idf_pct}} = IDF (min KES {{idf_minimum}})</div>
+        <div>CV × {{rdl_pct}} = RDL</div>
+      </div>
+      <div class="mt-3 text-xs text-text-muted space-y-1">
+        <p>Source: <a href="{{crsp_excel_url}}" class="text-amber hover:underline" target="_blank" rel="noopener">KRA CRSP July 2025</a></p>
+        <p>Rates: <a href="{{finance_act_url}}" class="text-amber hover:underline" target="_blank" rel="noopener">{{act_citation}}</a></p>
+      </div>
+    </section>"""
 
-def make_category_page(category, makes, cat_slug):
-    makes_sorted = sorted(makes.items())
-    total_models = sum(len(ms) for ms in makes.values())
+def formula_html(crsp, minify=False):
+    return templates(minify)["formula"].render(
+        crsp=kes(crsp), crsp_excel_url=CRSP_EXCEL_URL, finance_act_url=FINANCE_ACT_URL,
+    )
+
+# ── Category page: /suv/ ──────────────────────────────────────────────────
 
-    cards = ""
-    for make, models in makes_sorted:
-        make_slug = slugify(make)
-        sample    = kes(min(m["crsp"] for m in models))
-        cards += f"""
-      <a href="/{cat_slug}/{make_slug}/"
+CATEGORY_CARD = """
+      <a href="/{{cat_slug}}/{{make_slug}}/"
          class="bg-surface border border-border rounded-xl px-4 py-3 hover:border-amber transition-colors block group">
         <div class="flex items-center justify-between">
           <div>
-            <p class="font-semibold text-sm text-text group-hover:text-amber transition-colors">{make}</p>
-            <p class="text-text-subtle text-xs mt-0.5">{len(models)} model{'' if len(models)==1 else 's'}</p>
+            <p class="font-semibold text-sm text-text group-hover:text-amber transition-colors">{{make}}</p>
+            <p class="text-text-subtle text-xs mt-0.5">{{count}}</p>
           </div>
           <svg class="w-4 h-4 text-text-subtle group-hover:text-amber transition-colors flex-shrink-0" fill="none" stroke="currentColor" stroke-width="2" viewBox="0 0 24 24">
             <path stroke-linecap="round" stroke-linejoin="round" d="M9 18l6-6-6-6"/>
@@ -180,25 +199,42 @@ def make_category_page(category, makes, cat_slug):
         </div>
       </a>"""
 
-    content = f"""
+CATEGORY_CONTENT = """
     <div class="bg-charcoal rounded-2xl px-5 py-6 border border-border-2">
       <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">Vehicle Category</p>
-      <h1 class="text-2xl font-bold text-white">{category}</h1>
-      <p class="text-text-muted text-sm mt-1">{len(makes_sorted)} makes · {total_models} models in the KRA CRSP July 2025</p>
+      <h1 class="text-2xl font-bold text-white">{{category}}</h1>
+      <p class="text-text-muted text-sm mt-1">{{make_count}} makes · {{total_models}} models in the KRA CRSP July 2025</p>
     </div>
     <section class="grid grid-cols-2 gap-3 sm:grid-cols-3">
-      {cards}
+      {{cards}}
     </section>
     <div class="bg-surface border border-amber/20 rounded-2xl px-5 py-4 text-center">
       <p class="text-sm text-text mb-2">Use the full interactive calculator</p>
-      <a href="/#{ cat_slug}" class="inline-block bg-amber text-white font-bold text-sm px-5 py-2.5 rounded-xl hover:bg-amber-dark transition-colors">
+      <a href="/#{{cat_slug}}" class="inline-block bg-amber text-white font-bold text-sm px-5 py-2.5 rounded-xl hover:bg-amber-dark transition-colors">
         Open Calculator →
       </a>
     </div>"""
 
+def model_count(n):
+    return f"{n} model{'' if n == 1 else 's'}"
+
+def make_category_page(category, makes, cat_slug, make_slugs, minify=False):
+    t = templates(minify)
+    makes_sorted = sorted(makes.items())
+    total_models = sum(len(ms) for ms in makes.values())
+
+    cards = "".join(
+        t["category_card"].render(cat_slug=cat_slug, make_slug=make_slugs[make], make=make,
+                                 count=model_count(len(models)))
+        for make, models in makes_sorted
+    )
+    content = t["category_content"].render(
+        category=category, make_count=len(makes_sorted), total_models=total_models,
+        cards=cards, cat_slug=cat_slug,
+    )
     bc = breadcrumb_html([("Home", "/"), (category, None)])
 
-    return page_shell(
+    return t["page"].render(
         title     = f"{category} Import Duty Kenya 2025 — CarDuty",
         desc      = f"Browse all {category} vehicles in the KRA CRSP July 2025 list. {len(makes_sorted)} makes, {total_models} models. Calculate your import duty instantly.",
         canonical = f"/{cat_slug}/",
@@ -208,56 +244,70 @@ def make_category_page(category, makes, cat_slug):
 
 # ── Make page: /suv/toyota/ ───────────────────────────────────────────────
 
-def make_make_page(category, make, models, cat_slug, make_slug):
-    cards = ""
-    for i, m in enumerate(sorted(models, key=lambda x: x["model"])):
-        model_slug = slugify(m["model"]) or f"model-{i}"
-        parts = [
-            f"{m['cc']}cc" if isinstance(m.get("cc"), int) else str(m["cc"]) if m.get("cc") else None,
-            m.get("fuel", "").title() or None,
-            m.get("tx"),
-        ]
-        meta = " · ".join(p for p in parts if p)
-
-        # Calculate cheapest duty (8-year-old = most depreciation)
-        cheapest = calculate_duty(m["crsp"], CURRENT_YEAR - MAX_AGE)
-        duty_from = kes(cheapest["total"]) if cheapest else "N/A"
-
-        cards += f"""
-      <a href="/{cat_slug}/{make_slug}/{model_slug}/"
+MAKE_CARD = """
+      <a href="/{{cat_slug}}/{{make_slug}}/{{model_slug}}/"
          class="bg-surface border border-border rounded-xl px-4 py-3 hover:border-amber transition-colors block group">
         <div class="flex items-start justify-between gap-3">
           <div class="min-w-0">
-            <p class="font-semibold text-sm text-text group-hover:text-amber transition-colors truncate">{m['model']}</p>
-            <p class="text-text-subtle text-xs mt-0.5 truncate">{meta}</p>
+            <p class="font-semibold text-sm text-text group-hover:text-amber transition-colors truncate">{{model}}</p>
+            <p class="text-text-subtle text-xs mt-0.5 truncate">{{meta}}</p>
           </div>
           <div class="text-right flex-shrink-0">
             <p class="text-text-subtle text-xs">CRSP</p>
-            <p class="font-semibold text-xs text-amber">{kes(m['crsp'])}</p>
-            <p class="text-text-subtle text-xs">duty from {duty_from}</p>
+            <p class="font-semibold text-xs text-amber">{{crsp}}</p>
+            <p class="text-text-subtle text-xs">duty from {{duty_from}}</p>
           </div>
         </div>
       </a>"""
 
-    content = f"""
+MAKE_CONTENT = """
     <div class="bg-charcoal rounded-2xl px-5 py-6 border border-border-2">
-      <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">{category}</p>
-      <h1 class="text-2xl font-bold text-white">{make}</h1>
-      <p class="text-text-muted text-sm mt-1">{len(models)} model{'' if len(models)==1 else 's'} in the KRA CRSP July 2025</p>
+      <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">{{category}}</p>
+      <h1 class="text-2xl font-bold text-white">{{make}}</h1>
+      <p class="text-text-muted text-sm mt-1">{{count}} in the KRA CRSP July 2025</p>
     </div>
     <section class="grid grid-cols-1 gap-2.5 sm:grid-cols-2">
-      {cards}
+      {{cards}}
     </section>
     <div class="bg-surface border border-amber/20 rounded-2xl px-5 py-4 text-center">
       <p class="text-sm text-text mb-2">Use the full interactive calculator</p>
-      <a href="/#{ cat_slug}/{make_slug}" class="inline-block bg-amber text-white font-bold text-sm px-5 py-2.5 rounded-xl hover:bg-amber-dark transition-colors">
+      <a href="/#{{cat_slug}}/{{make_slug}}" class="inline-block bg-amber text-white font-bold text-sm px-5 py-2.5 rounded-xl hover:bg-amber-dark transition-colors">
         Open Calculator →
       </a>
     </div>"""
 
+def make_make_page(category, make, models, cat_slug, make_slug, model_slugs, duties=None, minify=False):
+    """duties: precomputed duty_grid() rows for VALID_YEARS, one per model (computed if omitted)."""
+    t = templates(minify)
+    order = sorted(range(len(models)), key=lambda i: models[i]["model"])
+    # Cheapest duty per card (MAX_AGE-year-old = most depreciation)
+    if duties is None:
+        oldest = duty_grid([models[i]["crsp"] for i in order], [CURRENT_YEAR - MAX_AGE])
+    else:
+        oldest = [duties[i][-1:] for i in order]
+
+    card = t["make_card"].bind(cat_slug=cat_slug, make_slug=make_slug)
+    cards = []
+    for k, i in enumerate(order):
+        m = models[i]
+        parts = [
+            f"{m['cc']}cc" if isinstance(m.get("cc"), int) else str(m["cc"]) if m.get("cc") else None,
+            m.get("fuel", "").title() or None,
+            m.get("tx"),
+        ]
+        cheapest = oldest[k][0]
+        cards.append(card.render(
+            model_slug=model_slugs[i], model=m["model"], meta=" · ".join(p for p in parts if p),
+            crsp=kes(m["crsp"]), duty_from=kes(cheapest["total"]) if cheapest else "N/A",
+        ))
+
+    content = t["make_content"].render(
+        category=category, make=make, count=model_count(len(models)),
+        cards="".join(cards), cat_slug=cat_slug, make_slug=make_slug,
+    )
     bc = breadcrumb_html([("Home", "/"), (category, f"/{cat_slug}/"), (make, None)])
 
-    return page_shell(
+    return t["page"].render(
         title     = f"{make} {category} Import Duty Kenya 2025 — CarDuty",
         desc      = f"All {make} {category} models in the KRA CRSP July 2025. {len(models)} variants — click any model to see the full duty breakdown.",
         canonical = f"/{cat_slug}/{make_slug}/",
@@ -267,68 +317,35 @@ def make_make_page(category, make, models, cat_slug, make_slug):
 
 # ── Model page: /suv/toyota/harrier/ ─────────────────────────────────────
 
-def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug):
-    model = model_obj["model"]
-    crsp  = model_obj["crsp"]
-    cc    = model_obj.get("cc")
-    fuel  = model_obj.get("fuel", "")
-    tx    = model_obj.get("tx", "")
-
-    meta_parts = [
-        f"{cc}cc" if isinstance(cc, int) else str(cc) if cc else None,
-        fuel.title() if fuel else None,
-        tx or None,
-        category,
-    ]
-    meta_str = " · ".join(p for p in meta_parts if p)
-
-    # Build duty table rows
-    rows = ""
-    for yr in range(CURRENT_YEAR, CURRENT_YEAR - MAX_AGE - 1, -1):
-        d = calculate_duty(crsp, yr)
-        if not d:
-            continue
-        age_str = "New" if d["age"] == 0 else f"{d['age']} yr{'s' if d['age']!=1 else ''}"
-        rows += f"""
+MODEL_ROW = """
         <tr class="border-t border-border hover:bg-surface-2 transition-colors">
-          <td class="px-4 py-3 font-semibold text-sm text-text">{yr}</td>
-          <td class="px-4 py-3 text-sm text-text-muted">{age_str}</td>
-          <td class="px-4 py-3 text-sm text-text-muted">{d['depr_pct']}%</td>
-          <td class="px-4 py-3 text-sm text-text">{kes(d['cv'])}</td>
-          <td class="px-4 py-3 font-bold text-amber">{kes(d['total'])}</td>
+          <td class="px-4 py-3 font-semibold text-sm text-text"><a href="{{base}}{{year}}/" class="hover:text-amber transition-colors">{{year}}</a></td>
+          <td class="px-4 py-3 text-sm text-text-muted">{{age}}</td>
+          <td class="px-4 py-3 text-sm text-text-muted">{{depr_pct}}%</td>
+          <td class="px-4 py-3 text-sm text-text">{{cv}}</td>
+          <td class="px-4 py-3 font-bold text-amber">{{total}}</td>
         </tr>"""
 
-    cheapest = calculate_duty(crsp, CURRENT_YEAR - MAX_AGE)
-    duty_range = kes(cheapest["total"]) if cheapest else "N/A"
-
-    schema = json.dumps({
-        "@context": "https://schema.org",
-        "@type": "HowTo",
-        "name": f"How to calculate KRA import duty for {make} {model}",
-        "description": f"Step-by-step KRA duty calculation for {make} {model} using official CRSP July 2025",
-        "step": [
-            {"@type": "HowToStep", "name": "CRSP lookup",     "text": f"CRSP value is {kes(crsp)} per the KRA official list"},
-            {"@type": "HowToStep", "name": "Strip taxes",     "text": "Divide by 2.4469 to get pre-depreciation customs value"},
-            {"@type": "HowToStep", "name": "Depreciation",    "text": "Apply 0–65% depending on age (8-year rule)"},
-            {"@type": "HowToStep", "name": "Apply duty rates","text": "Import Duty 25% · Excise 20% · VAT 16% · IDF 2.25% · RDL 1.5%"},
-        ]
-    }, indent=2)
+# Same row without the year link, for --no-years builds (no year pages to link to)
+MODEL_ROW_PLAIN = MODEL_ROW.replace(
+    '<a href="{{base}}{{year}}/" class="hover:text-amber transition-colors">{{year}}</a>', "{{year}}"
+)
 
-    content = f"""
+MODEL_CONTENT = """
   <script type="application/ld+json">
-  {schema}
+  {{schema}}
   </script>
 
     <div class="bg-charcoal rounded-2xl px-5 py-6 border border-border-2">
       <div class="flex items-start justify-between gap-4">
         <div>
-          <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">{category}</p>
-          <h1 class="text-xl font-bold text-white leading-tight">{make} {model}</h1>
-          <p class="text-text-muted text-sm mt-1">{meta_str}</p>
+          <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">{{category}}</p>
+          <h1 class="text-xl font-bold text-white leading-tight">{{make}} {{model}}</h1>
+          <p class="text-text-muted text-sm mt-1">{{meta}}</p>
         </div>
         <div class="text-right flex-shrink-0">
           <p class="text-text-subtle text-xs">CRSP Value</p>
-          <p class="text-lg font-bold text-amber">{kes(crsp)}</p>
+          <p class="text-lg font-bold text-amber">{{crsp}}</p>
           <p class="text-text-subtle text-xs mt-0.5">July 2025</p>
         </div>
       </div>
@@ -338,7 +355,7 @@ def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug):
       <div class="px-5 py-4 border-b border-border">
         <h2 class="font-semibold text-base">KRA Duty by Year of Manufacture</h2>
         <p class="text-text-muted text-xs mt-0.5">
-          All years valid under Kenya's 8-year rule. Cars from before {CURRENT_YEAR - MAX_AGE} cannot be imported.
+          All years valid under Kenya's {{max_age}}-year rule. Cars from before {{oldest_year}} cannot be imported.
         </p>
       </div>
       <div class="overflow-x-auto">
@@ -352,36 +369,75 @@ def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug):
               <th class="px-4 py-2.5 text-left text-xs font-semibold text-text-muted uppercase tracking-wide">Total Duty</th>
             </tr>
           </thead>
-          <tbody>{rows}</tbody>
+          <tbody>{{rows}}</tbody>
         </table>
       </div>
     </section>
 
-    <section class="bg-surface border border-border rounded-2xl px-5 py-4">
-      <h3 class="font-semibold text-sm mb-3">How KRA calculated this</h3>
-      <div class="bg-surface-2 border border-border rounded-xl px-4 py-3 font-mono text-xs text-text-muted space-y-1 leading-relaxed">
-        <div>CRSP ({kes(crsp)}) <span class="text-text-subtle">÷ 2.4469</span> = pre-depreciation value</div>
-        <div>× (1 − depreciation) = <strong class="text-text">Customs Value</strong></div>
-        <div class="border-t border-border pt-1.5 mt-1.5"></div>
-        <div>CV × 25% = Import Duty</div>
-        <div>(CV + ID) × 20% = Excise Duty</div>
-        <div>(CV + ID + ED) × 16% = VAT</div>
-        <div>CV × 2.25% = IDF (min KES 5,000)</div>
-        <div>CV × 1.5% = RDL</div>
-      </div>
-      <div class="mt-3 text-xs text-text-muted space-y-1">
-        <p>Source: <a href="{CRSP_EXCEL_URL}" class="text-amber hover:underline" target="_blank" rel="noopener">KRA CRSP July 2025</a></p>
-        <p>Rates: <a href="{FINANCE_ACT_URL}" class="text-amber hover:underline" target="_blank" rel="noopener">Finance Act 2025, Act No. 9 of 2025</a></p>
-      </div>
-    </section>
+    {{formula}}
 
     <div class="bg-amber/10 border border-amber/30 rounded-2xl px-5 py-5 text-center">
       <p class="font-bold text-sm mb-1">Compare other vehicles or adjust the year interactively</p>
-      <a href="/#{ cat_slug}/{make_slug}" class="inline-block bg-amber text-white font-bold text-sm px-6 py-3 rounded-xl hover:bg-amber-dark transition-colors mt-2">
+      <a href="/#{{cat_slug}}/{{make_slug}}" class="inline-block bg-amber text-white font-bold text-sm px-6 py-3 rounded-xl hover:bg-amber-dark transition-colors mt-2">
         Open Calculator →
       </a>
     </div>"""
 
+def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug, duties=None, years=True,
+                    minify=False):
+    """duties: precomputed duty_grid() row for VALID_YEARS (computed if omitted).
+    years: link each table row to its year page (off for --no-years builds)."""
+    t     = templates(minify)
+    model = model_obj["model"]
+    crsp  = model_obj["crsp"]
+    cc    = model_obj.get("cc")
+    fuel  = model_obj.get("fuel", "")
+    tx    = model_obj.get("tx", "")
+
+    meta_parts = [
+        f"{cc}cc" if isinstance(cc, int) else str(cc) if cc else None,
+        fuel.title() if fuel else None,
+        tx or None,
+        category,
+    ]
+    meta_str = " · ".join(p for p in meta_parts if p)
+
+    # Build duty table rows
+    if duties is None:
+        duties = duty_grid([crsp])[0]
+    by_year = dict(zip(VALID_YEARS, duties))
+
+    row  = t["model_row" if years else "model_row_plain"].bind(base=f"/{cat_slug}/{make_slug}/{model_slug}/")
+    rows = "".join(
+        row.render(
+            year=yr, age="New" if d["age"] == 0 else f"{d['age']} yr{'s' if d['age']!=1 else ''}",
+            depr_pct=d["depr_pct"], cv=kes(d["cv"]), total=kes(d["total"]),
+        )
+        for yr, d in by_year.items() if d
+    )
+
+    cheapest = by_year[CURRENT_YEAR - MAX_AGE]
+    duty_range = kes(cheapest["total"]) if cheapest else "N/A"
+
+    schema = json.dumps({
+        "@context": "https://schema.org",
+        "@type": "HowTo",
+        "name": f"How to calculate KRA import duty for {make} {model}",
+        "description": f"Step-by-step KRA duty calculation for {make} {model} using official CRSP July 2025",
+        "step": [
+            {"@type": "HowToStep", "name": "CRSP lookup",     "text": f"CRSP value is {kes(crsp)} per the KRA official list"},
+            {"@type": "HowToStep", "name": "Strip taxes",     "text": f"Divide by {RATE_LABELS['divisor']} to get pre-depreciation customs value"},
+            {"@type": "HowToStep", "name": "Depreciation",    "text": f"Apply {DEPRECIATION_RANGE} depending on age ({MAX_AGE}-year rule)"},
+            {"@type": "HowToStep", "name": "Apply duty rates","text": "Import Duty {import_duty_pct} · Excise {excise_pct} · VAT {vat_pct} · IDF {idf_pct} · RDL {rdl_pct}".format(**RATE_LABELS)},
+        ]
+    }, **({"separators": (",", ":")} if minify else {"indent": 2}))
+
+    content = t["model_content"].render(
+        schema=schema, category=category, make=make, model=model, meta=meta_str, crsp=kes(crsp),
+        oldest_year=CURRENT_YEAR - MAX_AGE, rows=rows, formula=formula_html(crsp, minify),
+        cat_slug=cat_slug, make_slug=make_slug,
+    )
+
     bc = breadcrumb_html([
         ("Home", "/"),
         (category, f"/{cat_slug}/"),
@@ -389,7 +445,7 @@ def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug):
         (model, None),
     ])
 
-    return page_shell(
+    return t["page"].render(
         title     = f"{make} {model} Import Duty Kenya 2025 — CarDuty",
         desc      = f"KRA import duty for {make} {model}. CRSP: {kes(crsp)}. Duty from {duty_range} depending on year. Full breakdown verified against official KRA formula.",
         canonical = f"/{cat_slug}/{make_slug}/{model_slug}/",
@@ -397,62 +453,559 @@ def make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug):
         breadcrumb= bc,
     )
 
-# ── Main ──────────────────────────────────────────────────────────────────
+# ── Year page: /suv/toyota/harrier/2022/ ─────────────────────────────────
+# Year pages are ~9× the model pages, so they are not built from scratch.
+# The year page template is compiled once (header, footer and all static
+# markup joined up front); make_year_template() binds the per-model
+# fragments once per model, and make_year_page() only splices in the
+# year-specific values.
+
+def _breakdown_row(label, slot, strong=False):
+    cls = "font-bold text-amber" if strong else "text-text"
+    return f"""
+          <tr class="border-t border-border">
+            <td class="px-4 py-2.5 text-sm text-text-muted">{label}</td>
+            <td class="px-4 py-2.5 text-sm text-right {cls}">{{{{{slot}}}}}</td>
+          </tr>"""
+
+YEAR_CONTENT = """
+    <div class="bg-charcoal rounded-2xl px-5 py-6 border border-border-2">
+      <div class="flex items-start justify-between gap-4">
+        <div>
+          <p class="text-text-subtle text-xs uppercase tracking-widest mb-1">{{category}} · {{year}}</p>
+          <h1 class="text-xl font-bold text-white leading-tight">{{year}} {{make}} {{model}}</h1>
+          <p class="text-text-muted text-sm mt-1">{{meta}}</p>
+        </div>
+        <div class="text-right flex-shrink-0">
+          <p class="text-text-subtle text-xs">Total KRA Duty</p>
+          <p class="text-lg font-bold text-amber">{{total}}</p>
+          <p class="text-text-subtle text-xs mt-0.5">{{age}} · {{depr_pct}}% depreciation</p>
+        </div>
+      </div>
+    </div>
 
-def main():
-    data = json.loads(CASCADE_FILE.read_text())
+    <section class="bg-surface border border-border rounded-2xl overflow-hidden">
+      <div class="px-5 py-4 border-b border-border">
+        <h2 class="font-semibold text-base">Duty breakdown for a {{year}} {{make}} {{model}}</h2>
+        <p class="text-text-muted text-xs mt-0.5">Imported in {{current_year}} · KRA CRSP July 2025</p>
+      </div>
+      <table class="w-full text-sm">
+        <tbody>""" + "".join([
+    _breakdown_row("CRSP Value", "crsp"),
+    _breakdown_row("÷ {{divisor}} (pre-depreciation value)", "pre"),
+    _breakdown_row("Depreciation", "depr_pct_label"),
+    _breakdown_row("Customs Value (CV)", "cv"),
+    _breakdown_row("Import Duty ({{import_duty_pct}})", "import_duty"),
+    _breakdown_row("Excise Duty ({{excise_pct}})", "excise"),
+    _breakdown_row("VAT ({{vat_pct}})", "vat"),
+    _breakdown_row("IDF ({{idf_pct}}, min KES {{idf_minimum}})", "idf"),
+    _breakdown_row("RDL ({{rdl_pct}})", "rdl"),
+    _breakdown_row("Total KRA Duty", "total", strong=True),
+]) + """
+        </tbody>
+      </table>
+    </section>
 
-    stats = {"categories": 0, "makes": 0, "models": 0}
+    {{year_links}}
 
+    {{formula}}
+
+    <div class="bg-amber/10 border border-amber/30 rounded-2xl px-5 py-5 text-center">
+      <p class="font-bold text-sm mb-1">Compare other vehicles or adjust the year interactively</p>
+      <a href="/#{{cat_slug}}/{{make_slug}}" class="inline-block bg-amber text-white font-bold text-sm px-6 py-3 rounded-xl hover:bg-amber-dark transition-colors mt-2">
+        Open Calculator →
+      </a>
+    </div>"""
+
+YEAR_LINK = """
+        <a href="{{base}}{{year}}/" class="bg-surface-2 border border-border rounded-lg px-3 py-1.5 text-xs text-text hover:border-amber hover:text-amber transition-colors">{{year}}</a>"""
+
+YEAR_LINKS = """<section class="bg-surface border border-border rounded-2xl px-5 py-4">
+      <h3 class="font-semibold text-sm mb-3">Other years of the {{make}} {{model}}</h3>
+      <div class="flex flex-wrap gap-2">{{links}}
+      </div>
+    </section>"""
+
+def make_year_template(category, make, model_obj, cat_slug, make_slug, model_slug, minify=False):
+    """Bind everything that is constant across one model's year pages."""
+    t    = templates(minify)
+    crsp = model_obj["crsp"]
+    cc   = model_obj.get("cc")
+    fuel = model_obj.get("fuel", "")
+    meta_parts = [
+        f"{cc}cc" if isinstance(cc, int) else str(cc) if cc else None,
+        fuel.title() if fuel else None,
+        model_obj.get("tx") or None,
+        category,
+    ]
+    link  = t["year_link"].bind(base=f"/{cat_slug}/{make_slug}/{model_slug}/")
+    links = "".join(link.render(year=yr) for yr in VALID_YEARS)
+    year_links = t["year_links"].render(make=make, model=model_obj["model"], links=links)
+
+    return t["year_page"].bind(
+        category=category, make=make, model=model_obj["model"],
+        cat_slug=cat_slug, make_slug=make_slug, model_slug=model_slug,
+        meta=" · ".join(p for p in meta_parts if p),
+        crsp=kes(crsp), pre=kes(crsp / DIVISOR), current_year=CURRENT_YEAR,
+        year_links=year_links, formula=formula_html(crsp, minify),
+    )
+
+def make_year_page(template, year, d):
+    """template: make_year_template() result; d: calculate_duty() dict for year."""
+    return template.render(
+        year=year,
+        age="New" if d["age"] == 0 else f"{d['age']} yr{'s' if d['age'] != 1 else ''} old",
+        depr_pct=d["depr_pct"], depr_pct_label=f"{d['depr_pct']}%",
+        cv=kes(d["cv"]), import_duty=kes(d["import_duty"]), excise=kes(d["excise"]),
+        vat=kes(d["vat"]), idf=kes(d["idf"]), rdl=kes(d["rdl"]), total=kes(d["total"]),
+    )
+
+# ── Compiled templates ────────────────────────────────────────────────────
+# Every template above is compiled once per render mode. With --minify the
+# template *source* is minified before compiling (inter-tag whitespace
+# dropped, the most repeated utility-class lists swapped for the component
+# classes in src/style.css), so pages come out minified with no per-page
+# post-pass. The regime's rate wording (RATE_LABELS) is bound in at compile
+# time, so it costs nothing per page either.
+
+CLASS_ALIASES = {
+    "px-4 py-2.5 text-left text-xs font-semibold text-text-muted uppercase tracking-wide": "dc-th",
+    "border-t border-border hover:bg-surface-2 transition-colors": "dc-row",
+    "bg-surface border border-border rounded-xl px-4 py-3 hover:border-amber transition-colors block group": "dc-card group",
+    "bg-surface-2 border border-border rounded-lg px-3 py-1.5 text-xs text-text hover:border-amber hover:text-amber transition-colors": "dc-chip",
+    "px-4 py-2.5 text-sm text-text-muted": "dc-td-label",
+}
+
+TEMPLATE_SOURCES = {
+    "page":             page_shell("{{title}}", "{{desc}}", "{{canonical}}", "{{content}}", "{{breadcrumb}}"),
+    "formula":          FORMULA,
+    "category_card":    CATEGORY_CARD,
+    "category_content": CATEGORY_CONTENT,
+    "make_card":        MAKE_CARD,
+    "make_content":     MAKE_CONTENT,
+    "model_row":        MODEL_ROW,
+    "model_row_plain":  MODEL_ROW_PLAIN,
+    "model_content":    MODEL_CONTENT,
+    "year_link":        YEAR_LINK,
+    "year_links":       YEAR_LINKS,
+    "year_page":        page_shell(
+        title     = "{{year}} {{make}} {{model}} Import Duty Kenya — CarDuty",
+        desc      = "KRA import duty for a {{year}} {{make}} {{model}}: {{total}} ({{depr_pct}}% depreciation on CRSP {{crsp}}). Full breakdown verified against the official KRA formula.",
+        canonical = "/{{cat_slug}}/{{make_slug}}/{{model_slug}}/{{year}}/",
+        content   = YEAR_CONTENT,
+        breadcrumb= breadcrumb_html([
+            ("Home", "/"),
+            ("{{category}}", "/{{cat_slug}}/"),
+            ("{{make}}", "/{{cat_slug}}/{{make_slug}}/"),
+            ("{{model}}", "/{{cat_slug}}/{{make_slug}}/{{model_slug}}/"),
+            ("{{year}}", None),
+        ]),
+    ),
+}
+
+@lru_cache(maxsize=None)
+def templates(minify=False):
+    compiled = {}
+    for name, source in TEMPLATE_SOURCES.items():
+        if minify:
+            source = minify_html(source)
+            for classes, alias in CLASS_ALIASES.items():
+                source = source.replace(f'class="{classes}"', f'class="{alias}"')
+        compiled[name] = Template(source).bind(**RATE_LABELS)
+    return compiled
+
+# ── Build manifest ────────────────────────────────────────────────────────
+# data/.pages-manifest.json maps each page directory to a hash of the
+# inputs it was rendered from. A rerun only renders pages whose hash changed
+# and deletes pages that are no longer produced. Switching --minify on or off,
+# or a TEMPLATE_VERSION bump, rules out reusing any page; the old page list
+# is still used to find what to delete.
+
+def inputs_hash(inputs):
+    raw = json.dumps(
+        [TEMPLATE_VERSION, CURRENT_YEAR, REGIME, inputs],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=json_default,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def read_manifest():
+    # Builds before the move kept the manifest in public/
+    for path in (MANIFEST_FILE, LEGACY_MANIFEST_FILE):
+        if path.exists():
+            return json.loads(path.read_text())
+    return {"pages": {}}
+
+def load_manifest(minify=False):
+    """{rel_dir: inputs_hash} of pages that can be reused by this build."""
+    manifest = read_manifest()
+    if manifest.get("template_version") != TEMPLATE_VERSION or manifest.get("minify", False) != minify:
+        return {}
+    return manifest["pages"]
+
+def manifest_pages():
+    """Every page the previous build wrote, whatever mode it ran in."""
+    return set(read_manifest()["pages"])
+
+def write_manifest(pages, minify=False):
+    MANIFEST_FILE.write_text(json.dumps(
+        {"template_version": TEMPLATE_VERSION, "minify": minify, "pages": dict(sorted(pages.items()))},
+        indent=0, ensure_ascii=False,
+    ))
+    LEGACY_MANIFEST_FILE.unlink(missing_ok=True)
+
+def remove_page(rel_dir):
+    """Delete a stale page and any directories it leaves empty."""
+    page_dir = PUBLIC_DIR / rel_dir
+    (page_dir / "index.html").unlink(missing_ok=True)
+    while page_dir != PUBLIC_DIR and page_dir.is_dir() and not any(page_dir.iterdir()):
+        page_dir.rmdir()
+        page_dir = page_dir.parent
+
+# ── Sharded build ─────────────────────────────────────────────────────────
+# Work is split into shards: one per category index page, one per make
+# (make page + all of its model pages). Shards are independent, so they can
+# be rendered serially or across a process pool with identical output.
+
+_data = None
+_slugs = None
+_matrix = None
+_manifest = None
+_writer = None    # process-wide write pipeline (serial builds)
+_progress = None  # shared [pages queued, pages written] counters
+
+def load_data():
+    global _data
+    if _data is None:
+        _data = load_cascade(CASCADE_FILE)
+    return _data
+
+def load_slugs(data):
+    """Shared slug index (data/slug_index.json), rebuilt in memory if stale."""
+    global _slugs
+    if _slugs is None or _slugs[0] is not data:
+        _slugs = (data, SlugIndex.load(data))
+    return _slugs[1]
+
+def load_matrix(data):
+    """Shared duty matrix (data/duty_matrix.bin), rebuilt in memory if stale."""
+    global _matrix
+    if _matrix is None or _matrix[0] is not data:
+        _matrix = (data, DutyMatrix.load(data["data"]))
+    return _matrix[1]
+
+def old_manifest(force, minify=False):
+    global _manifest
+    if _manifest is None:
+        _manifest = {} if force else load_manifest(minify)
+    return _manifest
+
+def iter_shards(data):
+    """Yield (category, make) work units; make is None for the category page."""
     for category, makes in data["data"].items():
-        cat_slug = slugify(category)
-        cat_dir  = PUBLIC_DIR / cat_slug
-        cat_dir.mkdir(parents=True, exist_ok=True)
+        yield (category, None)
+        for make in makes:
+            yield (category, make)
+
+def changed_shards(data, touched):
+    """Shards for a crsp_diff.py change set: each touched make plus its category page.
+
+    Makes that no longer exist yield nothing; their pages go stale.
+    """
+    touched = set(touched)
+    for shard in iter_shards(data):
+        category, make = shard
+        if (make is None and any(c == category for c, _ in touched)) or shard in touched:
+            yield shard
+
+def untouched_pages(pages, touched, slugs):
+    """Manifest entries that belong to shards outside the change set."""
+    cat_dirs  = {slugify(c) for c, _ in touched}
+    # A removed make is no longer in the index: its pages used the plain slug
+    make_dirs = {(slugify(c), slugs.make_slug(c, m) if slugs.has_make(c, m) else slugify(m)) for c, m in touched}
+    return {
+        key: digest for key, digest in pages.items()
+        if key not in cat_dirs and tuple(key.split("/")[:2]) not in make_dirs
+    }
 
-        # Category index page
-        (cat_dir / "index.html").write_text(
-            make_category_page(category, makes, cat_slug), encoding="utf-8"
-        )
-        stats["categories"] += 1
-
-        for make, models in makes.items():
-            make_slug = slugify(make)
-            make_dir  = cat_dir / make_slug
-            make_dir.mkdir(parents=True, exist_ok=True)
-
-            # Make index page
-            (make_dir / "index.html").write_text(
-                make_make_page(category, make, models, cat_slug, make_slug), encoding="utf-8"
-            )
-            stats["makes"] += 1
-
-            seen_slugs = {}
-            for i, model_obj in enumerate(models):
-                model_slug = slugify(model_obj["model"]) or f"model-{i}"
-
-                # Deduplicate slugs within a make
-                if model_slug in seen_slugs:
-                    model_slug = f"{model_slug}-{i}"
-                seen_slugs[model_slug] = True
-
-                model_dir = make_dir / model_slug
-                model_dir.mkdir(parents=True, exist_ok=True)
-
-                (model_dir / "index.html").write_text(
-                    make_model_page(category, make, model_obj, cat_slug, make_slug, model_slug),
-                    encoding="utf-8"
-                )
-                stats["models"] += 1
-
-    total = stats["categories"] + stats["makes"] + stats["models"]
-    print(f"Generated {total} pages into public/")
+def shard_pages(data, category, make, years=True, minify=False):
+    """Yield (rel_dir, kind, inputs, render) for every page in one shard.
+
+    render() builds the HTML lazily so unchanged pages are never rendered.
+    """
+    makes    = data["data"][category]
+    cat_slug = slugify(category)
+
+    slugs = load_slugs(data)
+    if make is None:
+        make_slugs = {m: slugs.make_slug(category, m) for m in makes}
+        yield (Path(cat_slug), "categories", {"category": category, "makes": makes, "make_slugs": make_slugs},
+               lambda: make_category_page(category, makes, cat_slug, make_slugs, minify))
+        return
+
+    models      = makes[make]
+    make_slug   = slugs.make_slug(category, make)
+    make_dir    = Path(cat_slug) / make_slug
+    model_slugs = slugs.model_slugs(category, make)
+    # Duty for every model × year of this make, from the precomputed matrix
+    grid = load_matrix(data).grid(category, make, len(models))
+    yield (make_dir, "makes", {"category": category, "make": make, "models": models, "slugs": model_slugs},
+           lambda: make_make_page(category, make, models, cat_slug, make_slug, model_slugs, duties=grid,
+                                  minify=minify))
+
+    for i, (model_obj, model_slug) in enumerate(zip(models, model_slugs)):
+        model_dir = make_dir / model_slug
+        inputs    = {"category": category, "make": make, "model": model_obj, "slug": model_slug}
+        # The year links differ with --no-years, so it is part of the model page inputs
+        yield (model_dir, "models", inputs if years else {**inputs, "years": False},
+               lambda m=model_obj, s=model_slug, d=grid[i]:
+                   make_model_page(category, make, m, cat_slug, make_slug, s, duties=d, years=years,
+                                   minify=minify))
+
+        if not years:
+            continue
+        # Bound once per model, on first use, then shared by its year pages
+        year_template = lru_cache(maxsize=None)(partial(
+            make_year_template, category, make, model_obj, cat_slug, make_slug, model_slug, minify
+        ))
+        for yr, d in zip(VALID_YEARS, grid[i]):
+            if d:
+                yield (model_dir / str(yr), "years", {**inputs, "year": yr},
+                       lambda t=year_template, yr=yr, d=d: make_year_page(t(), yr, d))
+
+def open_writer(output, writers):
+    """Output backend, behind a write pipeline unless writers == 0."""
+    if writers:
+        return PipelinedOutput(output, PUBLIC_DIR, threads=writers, progress=_progress)
+    return open_output(output, PUBLIC_DIR)
+
+def init_worker(progress):
+    global _progress
+    _progress = progress
+    tracing.worker_init("generate_pages worker")
+
+def run_shard(shard, force=False, years=True, minify=False, output="buffered", writers=2):
+    """Render and write the changed pages of one shard.
+
+    Returns (stats, {rel_dir: inputs_hash}, files) for every page in the
+    shard; stats also carries render/write seconds and bytes written. For
+    archive output nothing is written here: every page is rendered and
+    returned in files as (rel_path, bytes) for the parent to archive.
+
+    Pages go to the process-wide pipeline when one is open (serial builds),
+    else to a writer opened for this shard.
+    """
+    category, make = shard
+    archive  = is_archive(output)
+    previous = {} if archive else old_manifest(force, minify)
+    writer   = None if archive else _writer or open_writer(output, writers)
+    stats = Counter()
+    pages = {}
+    files = []
+    for rel_dir, kind, inputs, render in shard_pages(load_data(), category, make, years, minify):
+        key    = rel_dir.as_posix()
+        digest = inputs_hash(inputs)
+        pages[key] = digest
+        stats[kind] += 1
+
+        out_dir = PUBLIC_DIR / rel_dir
+        if previous.get(key) == digest and (out_dir / "index.html").exists():
+            stats["unchanged"] += 1
+            continue
+        t0   = time.perf_counter()
+        html = render().encode("utf-8")
+        t1   = time.perf_counter()
+        stats["render_s"] += t1 - t0
+        stats[f"render_s.{kind}"] += t1 - t0
+        if archive:
+            files.append((f"{key}/index.html", html))
+        else:
+            writer.write(rel_dir / "index.html", html)
+            if not writers and _progress is not None:
+                with _progress.get_lock():
+                    _progress[1] += 1
+        stats["bytes"]    += len(html)
+        stats[f"bytes.{kind}"] += len(html)
+        stats[f"written.{kind}"] += 1
+        stats["written"]  += 1
+    if writer and writer is not _writer:
+        written = writer.close()
+        stats["write_s"]   += written["seconds"]
+        stats["identical"] += written["identical"]
+    return stats, pages, files
+
+def traced_shard(shard, **kwargs):
+    """run_shard() inside a "shard" trace span, with page and byte counters."""
+    category, make = shard
+    with tracing.span(make or "(category page)", cat="shard", category=category):
+        stats, pages, files = run_shard(shard, **kwargs)
+    tracing.count("pages_written", stats["written"])
+    tracing.count("pages_unchanged", stats["unchanged"])
+    tracing.count("bytes_written", stats["bytes"])
+    tracing.flush()
+    return stats, pages, files
+
+def show_progress(progress, stop, interval=0.5):
+    """Redraw pages written, pages/s and write-queue depth until stop is set."""
+    last_n, last_t = 0, time.perf_counter()
+    while not stop.wait(interval):
+        queued, written = progress[:]
+        now = time.perf_counter()
+        rate = (written - last_n) / (now - last_t)
+        last_n, last_t = written, now
+        print(f"\r  {written:>7,} pages  {rate:>7,.0f} pages/s  queue {queued:>4}", end="", file=sys.stderr, flush=True)
+    print("\r\033[K", end="", file=sys.stderr, flush=True)
+
+# ── Main ──────────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate static SEO pages into public/.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="worker processes (0 = one per CPU core; default: 1, serial)",
+    )
+    parser.add_argument(
+        "--no-years", dest="years", action="store_false",
+        help="skip the /cat/make/model/year/ pages",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="ignore the build manifest and rewrite every page",
+    )
+    parser.add_argument(
+        "--minify", action="store_true",
+        help="emit minified HTML (compact whitespace, JSON-LD and class lists)",
+    )
+    parser.add_argument(
+        "--writers", type=int, default=2,
+        help="writer threads per process draining the render queue (0 = write inline; default: 2)",
+    )
+    parser.add_argument(
+        "--progress", action="store_true",
+        help="show pages/s and queue depth even when stderr is not a terminal",
+    )
+    parser.add_argument(
+        "--output", default="buffered", metavar="BACKEND",
+        help="direct, buffered (default), compare (skip identical files), "
+             "or an archive path ending in .tar, .tar.gz or .zip",
+    )
+    parser.add_argument(
+        "--changes", type=Path, metavar="FILE",
+        help="only rebuild the makes touched by a crsp_diff.py change set (data/crsp_changes.json)",
+    )
+    parser.add_argument(
+        "--trace", metavar="PATH",
+        help="write a Chrome trace with a span per shard (also: CRSP_TRACE; see tracing.py)",
+    )
+    args = parser.parse_args(argv)
+    if args.output not in DIRECTORY_BACKENDS and not is_archive(args.output):
+        parser.error(f"--output: expected {', '.join(DIRECTORY_BACKENDS)} or a .tar/.tar.gz/.zip path")
+    if args.changes and is_archive(args.output):
+        parser.error("--changes needs a directory output; an archive always holds every page")
+    return args
+
+def main(argv=None):
+    global _writer, _progress
+    args   = parse_args(argv)
+    tracing.start(args.trace, "generate_pages")
+    jobs   = args.jobs or os.cpu_count() or 1
+    with tracing.span("load"):
+        shards = list(iter_shards(load_data()))
+    pages  = {}
+    if args.changes:
+        from crsp_diff import load_touched  # imports build_crsp_cascade, which imports this module
+        touched  = load_touched(args.changes)
+        previous = load_manifest(args.minify)
+        if previous and not args.force:
+            shards = list(changed_shards(load_data(), touched))
+            pages  = untouched_pages(previous, touched, load_slugs(load_data()))
+            print(f"Change set touches {len(touched)} makes: rebuilding {len(shards)} of "
+                  f"{len(list(iter_shards(load_data())))} shards")
+        else:
+            print("No usable build manifest for --changes: rebuilding everything")
+    work   = partial(traced_shard if tracing.enabled() else run_shard, force=args.force, years=args.years, minify=args.minify,
+                     output=args.output, writers=args.writers)
+    _progress = Array("q", 2)  # [queued, written], shared with pool workers
+    # Archives hold every page, so they bypass the manifest entirely
+    archive = None
+    if is_archive(args.output):
+        archive = open_writer(args.output, args.writers)
+    elif jobs == 1 and args.writers:
+        _writer = open_writer(args.output, args.writers)
+
+    stop = threading.Event()
+    ticker = None
+    if args.progress or sys.stderr.isatty():
+        ticker = threading.Thread(target=show_progress, args=(_progress, stop), daemon=True)
+        ticker.start()
+
+    stats = Counter({"categories": 0, "makes": 0, "models": 0, "years": 0, "written": 0, "unchanged": 0,
+                     "identical": 0, "render_s": 0.0, "write_s": 0.0, "bytes": 0})
+    pool  = None
+    t0    = time.perf_counter()
+    if jobs == 1:
+        results = map(work, shards)
+    else:
+        # Small chunks keep the pool balanced: makes range from 1 to ~200 models.
+        pool    = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(_progress,))
+        results = pool.map(work, shards, chunksize=4)
+    with tracing.span("render + write", jobs=jobs):
+        for shard_stats, shard_hashes, files in results:
+            stats.update(shard_stats)
+            pages.update(shard_hashes)
+            for rel_path, html in files:
+                archive.write(rel_path, html)
+        if pool:
+            pool.shutdown()
+        if _writer:
+            written, _writer = _writer.close(), None
+            stats["write_s"]   += written["seconds"]
+            stats["identical"] += written["identical"]
+    tracing.rollup("shard", "category")
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    if ticker:
+        ticker.join()
+
+    stale = set()
+    with tracing.span("finalise"):
+        if archive:
+            written = archive.close()
+            stats["write_s"] += written["seconds"]
+            destination = f"{args.output} ({written['archive_bytes']/2**20:.1f} MB)"
+        else:
+            # Pages listed in the previous manifest but no longer produced
+            stale = manifest_pages() - set(pages)
+            for rel_dir in sorted(stale, reverse=True):
+                remove_page(rel_dir)
+            write_manifest(pages, args.minify)
+            destination = "public/"
+    tracing.count("pages_removed", len(stale))
+
+    total = stats["categories"] + stats["makes"] + stats["models"] + stats["years"]
+    print(f"Generated {total} pages into {destination}" + (f" ({jobs} jobs)" if jobs > 1 else ""))
     print(f"  {stats['categories']} category pages")
     print(f"  {stats['makes']} make pages")
     print(f"  {stats['models']} model pages")
+    print(f"  {stats['years']} year pages")
+    print(f"  {stats['written']} written, {stats['unchanged']} unchanged, {len(stale)} removed"
+          + (f", {stats['identical']} identical on disk" if args.output == "compare" else ""))
+    print(f"  render {stats['render_s']:.2f}s, write {stats['write_s']:.2f}s, {stats['bytes']/2**20:.1f} MB"
+          + (" (minified)" if args.minify else ""))
+    print(f"  {elapsed:.2f}s wall, {stats['written'] / elapsed:,.0f} pages/s"
+          + (f" (write time is summed over {args.writers} writer threads per process)" if args.writers else ""))
+    for kind in ("models", "years"):
+        if stats[f"render_s.{kind}"]:
+            per_page = stats[f"render_s.{kind}"] / stats[f"written.{kind}"] * 1e6
+            per_kb   = stats[f"bytes.{kind}"] / stats[f"written.{kind}"] / 1024
+            print(f"  {kind[:-1]} pages: {per_page:.0f} µs/page to render, {per_kb:.1f} KB/page")
     print(f"\nExamples:")
     print(f"  /suv/")
     print(f"  /suv/toyota/")
     print(f"  /suv/toyota/harrier/")
+    if args.years:
+        print(f"  /suv/toyota/harrier/{CURRENT_YEAR - 4}/")
+    tracing.finish()
+    return stats
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,63 @@
+"""
+Merge the generated model-URL redirects into vercel.json.
+
+build_crsp_cascade.py writes data/redirects.json (see slug_index.py) and
+never touches vercel.json, which is maintained by hand. This script copies
+the generated rules into its "redirects" list:
+
+  - rules whose source is a model URL (/{category}/{make}/{model}/:path*,
+    for a category of the current cascade) are owned by data/redirects.json
+    and replaced wholesale, so rules for URLs that came back are dropped
+  - every other rule, and every other key, is kept as written
+
+--check only reports whether vercel.json is up to date (exit 1 if not),
+for CI.
+
+Run: python3 scripts/merge_redirects.py [--check]
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from slugs import slugify
+
+ROOT           = Path(__file__).parent.parent
+REDIRECTS_FILE = ROOT / "data" / "redirects.json"
+CASCADE_FILE   = ROOT / "data" / "crsp_cascade.json"
+VERCEL_FILE    = ROOT / "vercel.json"
+
+
+def merged_config(config, generated, categories):
+    """vercel.json config with its generated model redirects replaced."""
+    owned = re.compile(rf"^/(?:{'|'.join(map(re.escape, categories))})/[^/]+/[^/]+/:path\*$")
+    kept = [r for r in config.get("redirects", []) if not owned.match(r.get("source", ""))]
+    return {**config, "redirects": kept + generated}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge data/redirects.json into vercel.json.")
+    parser.add_argument("--check", action="store_true", help="exit 1 if vercel.json is out of date, write nothing")
+    args = parser.parse_args(argv)
+
+    generated = json.loads(REDIRECTS_FILE.read_text())
+    categories = [slugify(c) for c in json.loads(CASCADE_FILE.read_text())["categories"]]
+    config = json.loads(VERCEL_FILE.read_text())
+    merged = merged_config(config, generated, categories)
+
+    if args.check:
+        if merged != config:
+            print("vercel.json redirects are out of date: run python3 scripts/merge_redirects.py")
+            sys.exit(1)
+        print("vercel.json redirects are up to date")
+        return
+
+    VERCEL_FILE.write_text(json.dumps(merged, indent=2, ensure_ascii=False) + "\n")
+    print(f"{len(generated)} generated + {len(merged['redirects']) - len(generated)} other redirects")
+    print("Written → vercel.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Output backends for generated pages.
+
+Every backend takes (rel_path, bytes) pairs through write() and reports what
+it did from close(). generate_pages.py picks one with --output:
+
+  direct     mkdir(parents=True) + write_bytes per page — the original path
+  buffered   (default) pages are queued and flushed in batches: every missing
+             directory in a batch is created once, in sorted order, then the
+             files are written with one open/write/close each
+  compare    buffered, but a page whose file already has the same size and
+             content is left untouched (mtime preserved, no write)
+  *.tar, *.tar.gz, *.zip
+             one archive for deployment instead of a directory tree
+
+Directory backends write below a root (public/ for the generator); archive
+backends write a single file at the given path. PipelinedOutput puts any of
+them behind a bounded queue drained by writer threads.
+
+Benchmark: python3 scripts/bench_page_output.py
+"""
+
+import io
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+DIRECTORY_BACKENDS = ("direct", "buffered", "compare")
+BATCH_BYTES = 8 * 2**20
+
+
+def is_archive(output):
+    return str(output).endswith((".tar", ".tar.gz", ".tgz", ".zip"))
+
+
+def open_output(output, root):
+    """Backend for an --output value; root is used by directory backends."""
+    if output == "direct":
+        return DirectWriter(root)
+    if output == "buffered":
+        return BufferedWriter(root)
+    if output == "compare":
+        return BufferedWriter(root, compare=True)
+    if is_archive(output):
+        return ArchiveWriter(output)
+    raise ValueError(f"unknown output backend: {output!r}")
+
+
+class DirectWriter:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.stats = {"written": 0, "identical": 0, "bytes": 0, "seconds": 0.0}
+
+    def write(self, rel_path, data):
+        t0 = time.perf_counter()
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.stats["written"] += 1
+        self.stats["bytes"] += len(data)
+        self.stats["seconds"] += time.perf_counter() - t0
+
+    def close(self):
+        return self.stats
+
+
+class BufferedWriter:
+    def __init__(self, root, compare=False, batch_bytes=BATCH_BYTES):
+        self.root = str(root)
+        self.compare = compare
+        self.batch_bytes = batch_bytes
+        self.stats = {"written": 0, "identical": 0, "dirs": 0, "bytes": 0, "seconds": 0.0}
+        self._pending = []
+        self._pending_bytes = 0
+        self._dirs = set()
+
+    def write(self, rel_path, data):
+        self._pending.append((str(rel_path), data))
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        t0 = time.perf_counter()
+        root = self.root
+        new_dirs = {os.path.dirname(rel) for rel, _ in self._pending} - self._dirs
+        for rel_dir in sorted(new_dirs):
+            os.makedirs(os.path.join(root, rel_dir), exist_ok=True)
+            self.stats["dirs"] += 1
+        self._dirs |= new_dirs
+
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        for rel, data in self._pending:
+            path = os.path.join(root, rel)
+            if self.compare and _same_content(path, data):
+                self.stats["identical"] += 1
+                continue
+            fd = os.open(path, flags, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            self.stats["written"] += 1
+            self.stats["bytes"] += len(data)
+        self._pending.clear()
+        self._pending_bytes = 0
+        self.stats["seconds"] += time.perf_counter() - t0
+
+    def close(self):
+        self.flush()
+        return self.stats
+
+
+def _same_content(path, data):
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+class ArchiveWriter:
+    """Single .tar / .tar.gz / .zip; entries keep the public/ layout."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats = {"written": 0, "identical": 0, "bytes": 0, "seconds": 0.0}
+        self._mtime = time.time()
+        if self.path.suffix == ".zip":
+            self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED, compresslevel=6)
+            self._tar = None
+        else:
+            mode = "w:gz" if self.path.name.endswith((".tar.gz", ".tgz")) else "w"
+            self._tar = tarfile.open(self.path, mode)
+            self._zip = None
+
+    def write(self, rel_path, data):
+        t0 = time.perf_counter()
+        name = Path(rel_path).as_posix()
+        if self._zip:
+            self._zip.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime, info.mode = len(data), self._mtime, 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        self.stats["written"] += 1
+        self.stats["bytes"] += len(data)
+        self.stats["seconds"] += time.perf_counter() - t0
+
+    def close(self):
+        t0 = time.perf_counter()
+        (self._zip or self._tar).close()
+        self.stats["seconds"] += time.perf_counter() - t0
+        self.stats["archive_bytes"] = self.path.stat().st_size
+        return self.stats
+
+
+
+# ── Pipelined writes ──────────────────────────────────────────────────────
+# Rendering is pure Python and holds the GIL; file syscalls release it. A
+# bounded queue in front of a few writer threads lets the disk work while the
+# next pages render, and a full queue blocks the renderer (backpressure), so
+# memory stays at roughly max_pages pages plus each backend's own batch.
+
+class PipelinedOutput:
+    """write() enqueues; `threads` writers drain into their own backend."""
+
+    def __init__(self, output, root, threads=4, max_pages=256, progress=None):
+        if is_archive(output):
+            threads = 1  # one archive file, one writer
+        self.queue = queue.Queue(max_pages)
+        self.progress = progress  # optional shared [queued, written] counters
+        self._error = None
+        self._backends = [open_output(output, root) for _ in range(threads)]
+        self._threads = [threading.Thread(target=self._drain, args=(b,), daemon=True) for b in self._backends]
+        for t in self._threads:
+            t.start()
+
+    def write(self, rel_path, data):
+        if self._error:
+            raise self._error
+        if self.progress is not None:
+            with self.progress.get_lock():
+                self.progress[0] += 1
+        self.queue.put((rel_path, data))
+
+    def _drain(self, backend):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            # After an error keep draining, so the producer never blocks forever
+            if self._error is None:
+                try:
+                    backend.write(*item)
+                except BaseException as e:
+                    self._error = e
+            if self.progress is not None:
+                with self.progress.get_lock():
+                    self.progress[0] -= 1
+                    self.progress[1] += 1
+
+    def close(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for t in self._threads:
+            t.join()
+        stats = {}
+        for backend in self._backends:
+            try:
+                backend_stats = backend.close()
+            except BaseException as e:
+                self._error = self._error or e
+                continue
+            for k, v in backend_stats.items():
+                stats[k] = stats.get(k, 0) + v
+        if self._error:
+            raise self._error
+        return stats
@@ -0,0 +1,255 @@
+"""
+Make-style runner for the data pipeline.
+
+  crsp_to_json        New-CRSP---July-2025.xlsx → data/crsp_*.json,
+                      depreciation.json, duty_rates.json
+  validate_crsp       data/crsp_*.json → data/validation_report.json; fails
+                      the build when a data-quality check is over threshold
+  build_crsp_cascade  data/crsp_*.json → data/crsp_cascade.json + derived
+                      artifacts (shards, search/slug indexes, duty matrix)
+  generate_pages      data/crsp_cascade.json → public/
+
+Each stage declares its input files (its own scripts included), the
+parameters it is built from (DUTY_RATES, CATEGORY_MAP, CATEGORY_ORDER, the
+duty constants) and its outputs. After a stage runs, data/.pipeline-state.json
+records the sha1 of every input, parameter and output. A stage is skipped
+when all of them still match the record. When a stage does run, the next
+stage compares its actual output checksums, so an upstream rerun that
+reproduces the same files (e.g. a workbook re-saved without changes) stops
+there.
+
+Run: python3 scripts/pipeline.py [TARGET] [--explain] [--force] [-n] [--trace PATH]
+  TARGET        last stage to bring up to date (default: generate_pages)
+  --explain     print why each stage runs or is skipped
+  --force       run every stage up to TARGET
+  -n            dry run: decide and explain, run nothing
+  --trace PATH  one Chrome trace of every stage that runs (see tracing.py)
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import tracing
+
+ROOT        = Path(__file__).parent.parent
+SCRIPTS_DIR = ROOT / "scripts"
+DATA_DIR    = ROOT / "data"
+STATE_FILE  = DATA_DIR / ".pipeline-state.json"
+STATE_VERSION = 1
+
+
+# ── Stages ────────────────────────────────────────────────────────────────
+# Script inputs are the stage's entry point plus the local modules it imports.
+# Parameters are read from those modules at decision time; they are also
+# covered by the script hashes, but listing them by name lets --explain say
+# which one changed.
+
+def _crsp_to_json_params():
+    from crsp_to_json import DUTY_RATES
+    return {"DUTY_RATES": DUTY_RATES}
+
+
+def _validate_params():
+    from validate_crsp import OUTLIER_MIN_GROUP, OUTLIER_Z, THRESHOLDS
+    return {"THRESHOLDS": THRESHOLDS, "OUTLIER_Z": OUTLIER_Z, "OUTLIER_MIN_GROUP": OUTLIER_MIN_GROUP}
+
+
+def _cascade_params():
+    from build_crsp_cascade import CATEGORY_MAP, CATEGORY_ORDER
+    from duty import CURRENT_YEAR, REGIME
+    # duty_matrix.bin is computed under the active regime and year
+    return {"CATEGORY_MAP": CATEGORY_MAP, "CATEGORY_ORDER": CATEGORY_ORDER,
+            "CURRENT_YEAR": CURRENT_YEAR, "REGIME": REGIME}
+
+
+def _pages_params():
+    from duty import CURRENT_YEAR, REGIME
+    from generate_pages import TEMPLATE_VERSION
+    return {"TEMPLATE_VERSION": TEMPLATE_VERSION, "CURRENT_YEAR": CURRENT_YEAR, "REGIME": REGIME}
+
+
+# tracing.py is left out of "scripts": it never changes a stage's outputs
+STAGES = {
+    "crsp_to_json": {
+        "scripts": ["crsp_to_json.py", "rate_tables.py", "xlsx_reader.py"],
+        "inputs":  ["New-CRSP---July-2025.xlsx", "data/duty_regimes.json"],
+        "params":  _crsp_to_json_params,
+        "outputs": ["data/crsp_vehicles.json", "data/crsp_motorcycles.json",
+                    "data/depreciation.json", "data/duty_rates.json"],
+    },
+    "validate_crsp": {
+        "scripts": ["validate_crsp.py", "build_crsp_cascade.py", "crsp_store.py"],
+        "inputs":  ["data/crsp_vehicles.json", "data/crsp_motorcycles.json"],
+        "params":  _validate_params,
+        "outputs": ["data/validation_report.json"],
+    },
+    "build_crsp_cascade": {
+        "scripts": ["build_crsp_cascade.py", "cascade_codec.py", "crsp_store.py", "duty.py",
+                    "duty_matrix.py", "rate_tables.py", "search_index.py", "slug_index.py", "slugs.py"],
+        "inputs":  ["data/crsp_vehicles.json", "data/crsp_motorcycles.json", "data/duty_regimes.json"],
+        "params":  _cascade_params,
+        "outputs": ["data/crsp_cascade.json", "public/data/cascade/manifest.json",
+                    "data/search_index.json", "data/slug_index.json", "data/slug_collisions.json",
+                    "data/redirects.json", "data/duty_matrix.bin", "data/duty_matrix.json"],
+    },
+    "generate_pages": {
+        "scripts": ["generate_pages.py", "crsp_store.py", "duty.py", "duty_matrix.py", "page_output.py",
+                    "rate_tables.py", "slug_index.py", "slugs.py", "templates.py"],
+        "inputs":  ["data/crsp_cascade.json", "data/slug_index.json", "data/duty_matrix.bin",
+                    "data/duty_matrix.json", "data/duty_regimes.json"],
+        "params":  _pages_params,
+        # Individual pages are tracked by generate_pages' own manifest
+        "outputs": ["data/.pages-manifest.json"],
+    },
+}
+
+
+# ── Checksums ─────────────────────────────────────────────────────────────
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def files_sha1(rel_paths):
+    """{rel_path: sha1 or None when missing}."""
+    return {rel: file_sha1(ROOT / rel) if (ROOT / rel).is_file() else None for rel in rel_paths}
+
+
+def params_sha1(params):
+    return {
+        name: hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        for name, value in params.items()
+    }
+
+
+def stage_fingerprint(name):
+    stage = STAGES[name]
+    return {
+        "inputs": files_sha1([f"scripts/{s}" for s in stage["scripts"]] + stage["inputs"]),
+        "params": params_sha1(stage["params"]()),
+    }
+
+
+# ── State ─────────────────────────────────────────────────────────────────
+
+def load_state():
+    try:
+        state = json.loads(STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION:
+        return {}
+    return state.get("stages", {})
+
+
+def save_state(stages):
+    STATE_FILE.write_text(json.dumps({"version": STATE_VERSION, "stages": stages}, indent=1, sort_keys=True))
+
+
+def reasons_to_run(name, fingerprint, record):
+    """Why the stage is out of date — [] when it can be skipped."""
+    if not record:
+        return ["no previous run recorded"]
+    reasons = []
+    for rel, digest in fingerprint["inputs"].items():
+        if digest is None:
+            reasons.append(f"input missing: {rel}")
+        elif rel not in record["inputs"]:
+            reasons.append(f"new input: {rel}")
+        elif record["inputs"][rel] != digest:
+            reasons.append(f"input changed: {rel}")
+    for param, digest in fingerprint["params"].items():
+        if record["params"].get(param) != digest:
+            reasons.append(f"parameter changed: {param}")
+    for rel, digest in files_sha1(STAGES[name]["outputs"]).items():
+        if digest is None:
+            reasons.append(f"output missing: {rel}")
+        elif record["outputs"].get(rel) != digest:
+            reasons.append(f"output modified since last run: {rel}")
+    return reasons
+
+
+def run_stage(name):
+    t0 = time.perf_counter()
+    try:
+        with tracing.span(name, cat="pipeline"):
+            subprocess.run([sys.executable, str(SCRIPTS_DIR / f"{name}.py")], cwd=ROOT, check=True)
+    except subprocess.CalledProcessError as e:
+        tracing.finish()  # keep what was traced up to the failure
+        raise SystemExit(f"── {name}: failed (exit {e.returncode}); later stages not run")
+    return time.perf_counter() - t0
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data pipeline, skipping stages that are up to date.")
+    parser.add_argument("target", nargs="?", default="generate_pages", choices=list(STAGES),
+                        help="last stage to bring up to date (default: generate_pages)")
+    parser.add_argument("--explain", action="store_true", help="print why each stage runs or is skipped")
+    parser.add_argument("--force", action="store_true", help="run every stage up to TARGET")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="decide and explain, run nothing")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of every stage that runs")
+    args = parser.parse_args(argv)
+    if not args.dry_run:
+        tracing.start(args.trace, "pipeline")
+
+    names = list(STAGES)
+    names = names[:names.index(args.target) + 1]
+    state = load_state()
+    upstream_ran = None  # dry run only: the first stage that would have run
+    ran = []
+
+    for name in names:
+        fingerprint = stage_fingerprint(name)
+        if args.force:
+            reasons = ["--force"]
+        elif upstream_ran:
+            # Upstream outputs aren't rebuilt yet, so this stage can't be decided
+            reasons = [f"depends on {upstream_ran}, which would run first; "
+                       "skipped for real if its outputs come out identical"]
+        else:
+            reasons = reasons_to_run(name, fingerprint, state.get(name))
+
+        if not reasons:
+            print(f"── {name}: up to date")
+            if args.explain:
+                print("   inputs, parameters and outputs match the last run")
+            continue
+
+        status = "running" if not args.dry_run else "may run" if upstream_ran else "would run"
+        print(f"── {name}: {status}")
+        if args.explain:
+            for reason in reasons:
+                print(f"   {reason}")
+        if args.dry_run:
+            upstream_ran = upstream_ran or name
+            continue
+
+        missing = [rel for rel, digest in fingerprint["inputs"].items() if digest is None]
+        if missing:
+            raise SystemExit(f"{name}: missing input {', '.join(missing)}")
+        sys.stdout.flush()
+        seconds = run_stage(name)
+        state[name] = {**fingerprint, "outputs": files_sha1(STAGES[name]["outputs"])}
+        save_state(state)
+        ran.append(name)
+        print(f"── {name}: done in {seconds:.1f}s")
+
+    if not args.dry_run:
+        print(f"\n{len(ran)} of {len(names)} stages ran" + (f" ({', '.join(ran)})" if ran else ""))
+    tracing.finish()
+    return ran
+
+
+if __name__ == "__main__":
+    main()
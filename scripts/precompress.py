@@ -0,0 +1,167 @@
+"""
+Precompress generated output: write .gz and .br siblings next to every
+page, data file and sitemap so the host can serve them without compressing
+on the fly.
+
+Covers:
+  **/index.html          generated pages
+  **/*.json under data/  cascade, shards, search/slug indexes
+  sitemap*.xml           sitemaps
+
+.gz is always written (level 9, mtime 0 so output is reproducible). .br is
+written when the `brotli` module is installed (pip install brotli); without
+it the stage still runs and says so.
+
+A manifest (.precompress-manifest.json in the output root) records each
+source file's content hash, so unchanged files are skipped on the next run
+and siblings of files that disappeared are removed.
+
+Scope: this is not part of `npm run build` and does nothing for the Vercel
+deployment. Vercel's static output compresses responses itself and never
+negotiates prebuilt .gz/.br files. The siblings only pay off when dist/ is
+self-hosted behind a server that serves them for a matching Accept-Encoding
+(nginx gzip_static/brotli_static, Caddy file_server precompressed). Run it
+explicitly (npm run compress) as the last step of such a build.
+scripts/render_server.py doesn't read them either.
+
+Run: python3 scripts/precompress.py [--root dist] [-j 0] [--force]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT          = Path(__file__).parent.parent
+DEFAULT_DIR   = ROOT / "dist"
+MANIFEST_NAME = ".precompress-manifest.json"
+
+PATTERNS = ["**/index.html", "data/**/*.json", "sitemap*.xml"]
+ENCODINGS = [".gz", ".br"] if brotli else [".gz"]
+
+
+def find_sources(root):
+    files = set()
+    for pattern in PATTERNS:
+        files.update(p for p in root.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def compress_file(path):
+    """Write siblings for one file → (sha1, {suffix: bytes})."""
+    raw = path.read_bytes()
+    sizes = {"": len(raw)}
+    out = {".gz": gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli:
+        out[".br"] = brotli.compress(raw, quality=11)
+    for suffix, data in out.items():
+        path.with_name(path.name + suffix).write_bytes(data)
+        sizes[suffix] = len(data)
+    return hashlib.sha1(raw).hexdigest(), sizes
+
+
+def sibling_sizes(path):
+    sizes = {"": path.stat().st_size}
+    for suffix in ENCODINGS:
+        sizes[suffix] = path.with_name(path.name + suffix).stat().st_size
+    return sizes
+
+
+def file_hash(path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def is_fresh(path, digest):
+    return all(path.with_name(path.name + s).exists() for s in ENCODINGS) and file_hash(path) == digest
+
+
+def load_manifest(root):
+    try:
+        manifest = json.loads((root / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("encodings") != ENCODINGS:
+        return {}
+    return manifest.get("files", {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for generated pages and data.")
+    parser.add_argument("--root", type=Path, default=DEFAULT_DIR, help="output directory (default: dist/)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: 0 = one per CPU core)")
+    parser.add_argument("--force", action="store_true", help="recompress every file")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    if not root.is_dir():
+        raise SystemExit(f"{root} does not exist — build first")
+    if not brotli:
+        print("brotli module not installed: writing .gz only (pip install brotli for .br)")
+
+    previous = {} if args.force else load_manifest(root)
+    sources  = find_sources(root)
+    files, todo, sizes = {}, [], {}
+    for path in sources:
+        rel = path.relative_to(root).as_posix()
+        if rel in previous and is_fresh(path, previous[rel]):
+            files[rel] = previous[rel]
+            sizes[rel] = sibling_sizes(path)
+        else:
+            todo.append(path)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = map(compress_file, todo)
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(compress_file, todo, chunksize=64)
+    for path, (digest, file_sizes) in zip(todo, results):
+        rel = path.relative_to(root).as_posix()
+        files[rel], sizes[rel] = digest, file_sizes
+    if jobs != 1:
+        pool.shutdown()
+
+    # Sources that are gone since the last run
+    removed = 0
+    for rel in set(previous) - set(files):
+        for suffix in (".gz", ".br"):
+            sibling = root / (rel + suffix)
+            if sibling.exists():
+                sibling.unlink()
+                removed += 1
+
+    (root / MANIFEST_NAME).write_text(json.dumps(
+        {"encodings": ENCODINGS, "files": dict(sorted(files.items()))}, separators=(",", ":"),
+    ))
+
+    # ── Report ────────────────────────────────────────────────────────────
+    by_type = defaultdict(lambda: defaultdict(int))
+    for rel, file_sizes in sizes.items():
+        kind = Path(rel).suffix or rel
+        by_type[kind]["files"] += 1
+        for suffix, n in file_sizes.items():
+            by_type[kind][suffix] += n
+
+    print(f"Precompressed {len(todo)} files, {len(sources) - len(todo)} unchanged, "
+          f"{removed} stale siblings removed  ({jobs} jobs)")
+    header = f"  {'type':<6} {'files':>7} {'raw MB':>9}" + "".join(f" {s + ' MB':>9} {'saved':>6}" for s in ENCODINGS)
+    print(header)
+    for kind, t in sorted(by_type.items(), key=lambda kv: -kv[1][""]):
+        line = f"  {kind:<6} {t['files']:>7} {t[''] / 2**20:>9.2f}"
+        for s in ENCODINGS:
+            line += f" {t[s] / 2**20:>9.2f} {1 - t[s] / max(t[''], 1):>6.1%}"
+        print(line)
+    return by_type
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Versioned duty rate tables.
+
+data/duty_regimes.json lists every tax regime (in practice: each Finance
+Act) as a record with the date it takes effect:
+
+  {"id": "finance-act-2025", "effective": "2025-07-01",
+   "act": "Finance Act 2025", "citation": "Act No. 9 of 2025", "url": ...,
+   "note": ..., "divisor": 2.4469,
+   "rates": {"import_duty": 0.25, "excise": 0.20, "vat": 0.16, "idf": 0.0225, "rdl": 0.015},
+   "idf_minimum": 5000,
+   "depreciation": [[max age, rate], ...]}
+
+A new Finance Act is a new record here, not a code change. The regime in
+force is the latest one whose effective date has passed; DUTY_REGIME=<id>
+pins one instead (reproducible builds, previews of a draft regime).
+
+engine(regime, current_year) compiles a regime once into closures with its
+rates bound as locals, cached per regime and year:
+
+  e = engine(current_regime(), 2026)
+  e.duty(crsp, year)       one vehicle-year → dict, None past the age limit
+  e.batch(crsps, years)    NumPy arrays over broadcastable inputs
+
+duty.py builds its public calculate_duty / calculate_duty_batch on the
+current regime's engine.
+
+Old vs new duty for every CRSP entry, loading the cascade once:
+  python3 scripts/rate_tables.py                          list regimes
+  python3 scripts/rate_tables.py --compare OLD NEW        ids, or a .json file holding one regime record
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+REGIMES_FILE = Path(__file__).parent.parent / "data" / "duty_regimes.json"
+
+RATE_KEYS = ("import_duty", "excise", "vat", "idf", "rdl")
+REQUIRED = ("id", "effective", "divisor", "rates", "idf_minimum", "depreciation")
+COMPONENTS = ["cv", "import_duty", "excise", "vat", "idf", "rdl", "total"]
+
+
+# ── Regimes ───────────────────────────────────────────────────────────────
+
+def check_regime(regime):
+    missing = [k for k in REQUIRED if k not in regime] + \
+              [f"rates.{k}" for k in RATE_KEYS if k not in regime.get("rates", {})]
+    if missing:
+        raise ValueError(f"regime {regime.get('id', '?')}: missing {', '.join(missing)}")
+    datetime.date.fromisoformat(regime["effective"])
+    ages = [age for age, _ in regime["depreciation"]]
+    if not ages or ages != sorted(set(ages)):
+        raise ValueError(f"regime {regime['id']}: depreciation ages must be increasing")
+    return regime
+
+
+@lru_cache(maxsize=None)
+def load_regimes(path=REGIMES_FILE):
+    """All regimes, oldest first."""
+    regimes = [check_regime(r) for r in json.loads(Path(path).read_text())["regimes"]]
+    ids = [r["id"] for r in regimes]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: duplicate regime ids")
+    return sorted(regimes, key=lambda r: r["effective"])
+
+
+def regime_by_id(regime_id, path=REGIMES_FILE):
+    for regime in load_regimes(path):
+        if regime["id"] == regime_id:
+            return regime
+    raise KeyError(f"no regime {regime_id!r} in {path}")
+
+
+def active_regime(on=None, path=REGIMES_FILE):
+    """The regime in force on a date (default: today)."""
+    if on is None:
+        on = datetime.date.today()
+    if not isinstance(on, str):
+        on = on.isoformat()
+    in_force = [r for r in load_regimes(path) if r["effective"] <= on]
+    if not in_force:
+        raise ValueError(f"no duty regime in force on {on}")
+    return in_force[-1]
+
+
+def current_regime(path=REGIMES_FILE):
+    """DUTY_REGIME=<id> if set, else the regime in force today."""
+    pinned = os.environ.get("DUTY_REGIME")
+    return regime_by_id(pinned, path) if pinned else active_regime(path=path)
+
+
+def regime_digest(regime):
+    raw = json.dumps(regime, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def duty_rates(regime):
+    """data/duty_rates.json shape (read by the calculator UI)."""
+    rates = regime["rates"]
+    return {
+        "import_duty_rate": rates["import_duty"],
+        "excise_duty_rate": rates["excise"],
+        "vat_rate": rates["vat"],
+        "idf_rate": rates["idf"],
+        "rdl_rate": rates["rdl"],
+        "idf_minimum_kes": regime["idf_minimum"],
+        "crsp_tax_strip_divisor": regime["divisor"],
+        "note": regime.get("note", ""),
+    }
+
+
+# ── Engine ────────────────────────────────────────────────────────────────
+
+class Engine:
+    """A regime compiled for one valuation year; see engine()."""
+
+    __slots__ = ("regime", "current_year", "max_age", "depreciation", "duty", "batch")
+
+    def __init__(self, regime, current_year, max_age, depreciation, duty, batch):
+        self.regime = regime
+        self.current_year = current_year
+        self.max_age = max_age
+        self.depreciation = depreciation
+        self.duty = duty
+        self.batch = batch
+
+
+_ENGINES = {}
+
+
+def engine(regime, current_year):
+    """Compiled engine for a regime, cached by (id, content, year)."""
+    key = (regime["id"], regime_digest(regime), current_year)
+    if key not in _ENGINES:
+        _ENGINES[key] = _compile(regime, current_year)
+    return _ENGINES[key]
+
+
+def _compile(regime, current_year):
+    # Same float64 operations in the same order as the original literals, so
+    # every rounded component is unchanged
+    divisor = regime["divisor"]
+    id_rate, ed_rate, vat_rate, idf_rate, rdl_rate = (regime["rates"][k] for k in RATE_KEYS)
+    idf_minimum = regime["idf_minimum"]
+    table = [(age, rate) for age, rate in regime["depreciation"]]
+    ages = np.array([a for a, _ in table])
+    rates = np.array([r for _, r in table])
+    last = len(table) - 1
+
+    def depreciation(age):
+        for max_age, rate in table:
+            if age <= max_age:
+                return rate
+        return None
+
+    def duty(crsp, year):
+        age  = current_year - year
+        depr = depreciation(age)
+        if depr is None:
+            return None
+        pre   = crsp / divisor
+        cv    = pre * (1 - depr)
+        id_   = cv * id_rate
+        ed    = (cv + id_) * ed_rate
+        vat   = (cv + id_ + ed) * vat_rate
+        idf   = max(cv * idf_rate, idf_minimum)
+        rdl   = cv * rdl_rate
+        total = id_ + ed + vat + idf + rdl
+        return {
+            "cv": round(cv), "import_duty": round(id_),
+            "excise": round(ed), "vat": round(vat),
+            "idf": round(idf), "rdl": round(rdl),
+            "total": round(total), "depr_pct": int(depr * 100), "age": age,
+        }
+
+    def batch(crsp, years):
+        crsp  = np.asarray(crsp, dtype=np.float64)
+        years = np.asarray(years, dtype=np.int64)
+        crsp, years = np.broadcast_arrays(crsp, years)
+
+        age   = current_year - years
+        idx   = np.searchsorted(ages, age, side="left")
+        valid = idx <= last
+        depr  = rates[np.minimum(idx, last)]
+
+        pre   = crsp / divisor
+        cv    = pre * (1 - depr)
+        id_   = cv * id_rate
+        ed    = (cv + id_) * ed_rate
+        vat   = (cv + id_ + ed) * vat_rate
+        idf   = np.maximum(cv * idf_rate, idf_minimum)
+        rdl   = cv * rdl_rate
+        total = id_ + ed + vat + idf + rdl
+
+        out = {
+            name: np.where(valid, np.round(values), 0).astype(np.int64)
+            for name, values in zip(COMPONENTS, (cv, id_, ed, vat, idf, rdl, total))
+        }
+        out["depr_pct"] = np.where(valid, (depr * 100).astype(np.int64), 0)
+        out["age"]      = age
+        out["valid"]    = valid
+        return out
+
+    return Engine(regime, current_year, table[-1][0], depreciation, duty, batch)
+
+
+def compare(old, new, crsps, years, current_year):
+    """Duty under two regimes for every (crsp, year) pair, in one pass each.
+
+    crsps and years are 1-D; results are (len(crsps), len(years)) arrays:
+    {"old": batch, "new": batch, "delta": new total − old total, "valid": both valid}.
+    """
+    crsps = np.asarray(crsps, dtype=np.float64)[:, None]
+    years = np.asarray(years, dtype=np.int64)[None, :]
+    a = engine(old, current_year).batch(crsps, years)
+    b = engine(new, current_year).batch(crsps, years)
+    valid = a["valid"] & b["valid"]
+    return {"old": a, "new": b, "delta": np.where(valid, b["total"] - a["total"], 0), "valid": valid}
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────
+
+def resolve(spec, path=REGIMES_FILE):
+    """Regime id, or a .json file holding one regime record (a draft)."""
+    if spec.endswith(".json"):
+        return check_regime(json.loads(Path(spec).read_text()))
+    return regime_by_id(spec, path)
+
+
+def report(old, new, current_year, year=None):
+    """Per-category old-vs-new summary over the whole cascade."""
+    from crsp_store import load_cascade
+
+    cascade = load_cascade()
+    crsps, cats = [], []
+    for cat, makes in cascade["data"].items():
+        for models in makes.values():
+            for m in models:
+                crsps.append(m["crsp"])
+                cats.append(cat)
+    max_age = max(old["depreciation"][-1][0], new["depreciation"][-1][0])
+    years = [year] if year else list(range(current_year, current_year - max_age - 1, -1))
+    result = compare(old, new, crsps, years, current_year)
+
+    cats = np.array(cats)
+    rows = {}
+    for cat in list(cascade["data"]) + [None]:
+        mask = np.ones(len(crsps), bool) if cat is None else cats == cat
+        valid = result["valid"][mask]
+        n = int(valid.sum())
+        old_total = result["old"]["total"][mask][valid]
+        new_total = result["new"]["total"][mask][valid]
+        delta = result["delta"][mask][valid]
+        rows[cat or "All"] = {
+            "entries": int(mask.sum()), "pairs": n,
+            "old_mean": float(old_total.mean()) if n else 0.0,
+            "new_mean": float(new_total.mean()) if n else 0.0,
+            "delta_mean": float(delta.mean()) if n else 0.0,
+            "delta_max": int(delta.max()) if n else 0,
+            "delta_min": int(delta.min()) if n else 0,
+            "changed": int((delta != 0).sum()),
+        }
+    return {"old": old["id"], "new": new["id"], "years": years, "categories": rows}
+
+
+def main(argv=None):
+    from duty import CURRENT_YEAR
+
+    parser = argparse.ArgumentParser(description="List duty regimes or compare two of them.")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="regime ids, or .json files holding one regime record")
+    parser.add_argument("--year", type=int, help="only this year of manufacture (default: every valid year)")
+    parser.add_argument("--json", type=Path, help="also write the comparison to this file")
+    args = parser.parse_args(argv)
+
+    if not args.compare:
+        current = current_regime()
+        for r in load_regimes():
+            flag = "*" if r is current else " "
+            print(f"{flag} {r['id']:<24} effective {r['effective']}  {r.get('act', '')}")
+        return load_regimes()
+
+    old, new = (resolve(spec) for spec in args.compare)
+    result = report(old, new, CURRENT_YEAR, args.year)
+    print(f"{old['id']} → {new['id']}  ({len(result['years'])} years, KES, mean over valid vehicle-years)")
+    print(f"  {'category':<16} {'entries':>7} {'old mean':>12} {'new mean':>12} {'Δ mean':>10} "
+          f"{'Δ min':>10} {'Δ max':>10} {'changed':>8}")
+    for cat, r in result["categories"].items():
+        print(f"  {cat:<16} {r['entries']:>7} {r['old_mean']:>12,.0f} {r['new_mean']:>12,.0f} "
+              f"{r['delta_mean']:>+10,.0f} {r['delta_min']:>+10,} {r['delta_max']:>+10,} {r['changed']:>8}")
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+        print(f"Written → {args.json}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Preview render server: renders category/make/model pages on demand.
+
+Loads crsp_cascade.json once, builds a URL → page index at startup from the
+same shard_pages() the static generator uses, and renders pages lazily on
+first request. Rendered pages are kept in a size-bounded LRU cache and
+served with an ETag, so repeat visits with If-None-Match get a 304.
+
+Run: python3 scripts/render_server.py [--port 8787] [--cache-mb 64] [--minify]
+Load test: python3 scripts/bench_render_server.py
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from generate_pages import iter_shards, load_data, shard_pages
+
+
+# ── Page index ────────────────────────────────────────────────────────────
+
+def build_routes(data, minify=False):
+    """{"/suv/toyota/harrier/": render} for every page the generator emits."""
+    routes = {}
+    for category, make in iter_shards(data):
+        for rel_dir, _kind, _inputs, render in shard_pages(data, category, make, minify=minify):
+            routes[f"/{rel_dir.as_posix()}/"] = render
+    return routes
+
+
+# ── LRU page cache ────────────────────────────────────────────────────────
+
+class PageCache:
+    """LRU of path → (etag, body), bounded by total body bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            page = self._pages.get(path)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(path)
+            self.hits += 1
+            return page
+
+    def put(self, path, page):
+        size = len(page[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._pages.pop(path, None)
+            if old is not None:
+                self.bytes -= len(old[1])
+            self._pages[path] = page
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, body) = self._pages.popitem(last=False)
+                self.bytes -= len(body)
+
+    def __len__(self):
+        return len(self._pages)
+
+
+def etag_for(body):
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+# An entity tag: optional weak prefix, then a quoted opaque string (which may
+# itself contain commas, so the header isn't simply split on ",")
+ETAG_RE = re.compile(r'(?:W/)?"[^"]*"|\*')
+
+
+def etag_matches(header, etag):
+    """If-None-Match check: "*" or any listed tag equal to etag under weak
+    comparison (a W/ prefix on either side is ignored). Anything else in the
+    header, malformed tags included, never matches."""
+    if not header:
+        return False
+    tags = ETAG_RE.findall(header)
+    if "*" in tags:
+        return True
+    ours = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == ours for tag in tags)
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────
+
+class RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for load generators and browsers
+    server_version = "DutyCheckPreview/1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if not path.endswith("/"):
+            path += "/"
+
+        routes, cache = self.server.routes, self.server.cache
+        page = cache.get(path)
+        if page is None:
+            render = routes.get(path)
+            if render is None:
+                return self._send(404, b"Not found\n", "text/plain; charset=utf-8")
+            body = render().encode("utf-8")
+            page = (etag_for(body), body)
+            cache.put(path, page)
+
+        etag, body = page
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            return self._send(304, b"", None, etag)
+        self._send(200, body, "text/html; charset=utf-8", etag)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+
+def make_server(host="127.0.0.1", port=8787, cache_mb=64, quiet=False, minify=False):
+    t0 = time.perf_counter()
+    server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.daemon_threads = True
+    server.routes = build_routes(load_data(), minify)
+    server.cache = PageCache(cache_mb * 1024 * 1024)
+    server.quiet = quiet
+    server.startup_s = time.perf_counter() - t0
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated pages on demand.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--cache-mb", type=int, default=64, help="LRU page cache size (default: 64)")
+    parser.add_argument("--quiet", action="store_true", help="don't log every request")
+    parser.add_argument("--minify", action="store_true", help="serve minified HTML, as generate_pages.py --minify")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.cache_mb, args.quiet, args.minify)
+    host, port = server.server_address[:2]
+    print(f"Indexed {len(server.routes)} pages in {server.startup_s * 1000:.0f} ms")
+    print(f"Serving on http://{host}:{port}/  (cache {args.cache_mb} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
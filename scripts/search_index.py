@@ -0,0 +1,199 @@
+"""
+Prebuilt search index over the CRSP cascade for instant make/model lookup
+("harrier 2.0", "prado 2.8 diesel", "cb400").
+
+Output: data/search_index.json (written by build_crsp_cascade.py)
+Shape:
+{
+  "v": 1,
+  "categories": ["Motorcycle", ...],
+  "makes":      ["Honda", ...],
+  "docs":       [cat_id, make_id, position, ...],  # flat triples, cascade order
+  "labels":     ["Honda 400x", ...],
+  "vocab":      ["0", "1.5", "100", ...],         # sorted tokens
+  "primary":    [[doc deltas], ...],              # per token: make/model hits
+  "secondary":  [[doc deltas], ...]               # per token: model no./cc/fuel hits
+}
+
+Every query token is matched as a prefix of indexed tokens (a sorted
+vocabulary + bisect acts as a flattened prefix trie). Make/model matches
+outrank model-number/cc/fuel matches and exact tokens outrank prefixes; a
+document must match every query token.
+
+Usage:
+  index = SearchIndex.load()
+  index.search("harrier 2.0")  → [{"category", "make", "position", "label", "score"}, ...]
+"""
+
+import json
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+DATA_DIR   = Path(__file__).parent.parent / "data"
+INDEX_FILE = DATA_DIR / "search_index.json"
+
+FORMAT_VERSION = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+# Score per query token, by where and how it matched
+EXACT_PRIMARY, PREFIX_PRIMARY, EXACT_SECONDARY, PREFIX_SECONDARY = 4, 2, 2, 1
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def entry_tokens(make, entry):
+    """(primary, secondary) token sets for one cascade entry."""
+    primary = set(tokenize(make)) | set(tokenize(entry["model"]))
+    secondary = set(tokenize(entry.get("mn", "")))
+    cc = entry.get("cc")
+    if isinstance(cc, int):
+        # 1998 → "1998" and "2.0", so both "1998cc" and "2.0" style queries hit
+        secondary |= {str(cc), f"{cc / 1000:.1f}"}
+    elif cc:
+        secondary |= set(tokenize(cc))
+    secondary |= set(tokenize(entry.get("fuel", "")))
+    return primary, secondary - primary
+
+
+# ── Build ────────────────────────────────────────────────────────────────────
+
+def _deltas(ids):
+    out, prev = [], 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+def build_index(cascade):
+    categories = cascade["categories"]
+    makes = sorted({make for makes in cascade["data"].values() for make in makes})
+    make_id = {make: i for i, make in enumerate(makes)}
+
+    docs, labels = [], []
+    primary, secondary = defaultdict(list), defaultdict(list)
+    for c, category in enumerate(categories):
+        for make, models in cascade["data"][category].items():
+            for pos, entry in enumerate(models):
+                doc = len(labels)
+                docs += [c, make_id[make], pos]
+                labels.append(f"{make} {entry['model']}")
+                p, s = entry_tokens(make, entry)
+                for t in p:
+                    primary[t].append(doc)
+                for t in s:
+                    secondary[t].append(doc)
+
+    vocab = sorted(primary.keys() | secondary.keys())
+    return {
+        "v": FORMAT_VERSION,
+        "categories": categories,
+        "makes": makes,
+        "docs": docs,
+        "labels": labels,
+        "vocab": vocab,
+        "primary": [_deltas(primary.get(t, [])) for t in vocab],
+        "secondary": [_deltas(secondary.get(t, [])) for t in vocab],
+    }
+
+
+def write_index(cascade):
+    index = build_index(cascade)
+    raw = json.dumps(index, separators=(",", ":"), ensure_ascii=False)
+    INDEX_FILE.write_text(raw)
+    return index, len(raw.encode("utf-8"))
+
+
+# ── Query ────────────────────────────────────────────────────────────────────
+
+class SearchIndex:
+    """In-memory query side. Per-token scores are int8 vectors over all
+    documents (cached), so a query is a few vector adds plus a partial sort."""
+
+    def __init__(self, raw):
+        if raw.get("v") != FORMAT_VERSION:
+            raise ValueError(f"unsupported search index version: {raw.get('v')}")
+        self.categories = raw["categories"]
+        self.makes      = raw["makes"]
+        self.docs       = raw["docs"]
+        self.labels     = raw["labels"]
+        self.vocab      = raw["vocab"]
+        self.primary    = [np.cumsum(p, dtype=np.int32) for p in raw["primary"]]
+        self.secondary  = [np.cumsum(s, dtype=np.int32) for s in raw["secondary"]]
+
+        # Tie-break among equal scores: shorter labels first, then cascade order
+        n = len(self.labels)
+        order = sorted(range(n), key=lambda d: (len(self.labels[d]), d))
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+        self._tiebreak = n - rank  # higher = better
+        self._n = n
+        self.token_scores = lru_cache(maxsize=4096)(self._token_scores)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        return cls(json.loads(Path(path).read_text()))
+
+    @classmethod
+    def from_cascade(cls, cascade):
+        return cls(build_index(cascade))
+
+    def _token_scores(self, token):
+        """Best score per document over all indexed tokens starting with `token`."""
+        lo = bisect_left(self.vocab, token)
+        hi = bisect_left(self.vocab, token + "\uffff", lo)
+        scores = np.zeros(self._n, dtype=np.int8)
+        for t in range(lo, hi):
+            exact = self.vocab[t] == token
+            for weight, postings in (
+                (EXACT_SECONDARY if exact else PREFIX_SECONDARY, self.secondary[t]),
+                (EXACT_PRIMARY if exact else PREFIX_PRIMARY, self.primary[t]),
+            ):
+                if len(postings):
+                    np.maximum.at(scores, postings, weight)
+        scores.flags.writeable = False
+        return scores
+
+    def search(self, query, limit=10):
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        vectors = [self.token_scores(t) for t in tokens]
+        total = np.sum(vectors, axis=0, dtype=np.int64)
+        matched = np.logical_and.reduce([v > 0 for v in vectors])
+        count = int(matched.sum())
+        if not count:
+            return []
+
+        key = np.where(matched, total * (self._n + 1) + self._tiebreak, -1)
+        k = min(limit, count)
+        top = np.argpartition(-key, k - 1)[:k]
+        top = top[np.argsort(-key[top])]
+
+        results = []
+        for doc in top.tolist():
+            c, m, pos = self.docs[3 * doc: 3 * doc + 3]
+            results.append({
+                "category": self.categories[c],
+                "make": self.makes[m],
+                "position": pos,
+                "label": self.labels[doc],
+                "score": int(total[doc]),
+            })
+        return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    index = SearchIndex.load()
+    for r in index.search(" ".join(sys.argv[1:]) or "harrier 2.0"):
+        print(f"{r['score']:>3}  {r['category']:<15} {r['label']}")
@@ -0,0 +1,288 @@
+"""
+Slug resolution index: one precomputed answer to "what is this entry's URL".
+
+Most entries simply use slugify(model), and most makes slugify(make). When
+several models of one make slugify to the same value (853 groups in July
+2025, e.g. three Honda "400x" rows), every slug in the group is derived from
+the rows' content, never from their position, so URLs don't move when KRA
+reorders or inserts rows:
+
+  - the member whose content sorts first (descriptive fields, then price)
+    keeps the plain slug
+  - every other member gets the first of these suffixes that no other
+    member shares and no other model of the make already uses:
+      1. "mn"     its model number
+      2. "hash"   a short hash of its descriptive fields (everything but
+                  crsp, so a price revision doesn't move the page)
+      3. "price"  a short hash of the whole entry, price included (rows
+                  that differ only in price)
+  - rows identical in every field, price included, share that last hash and
+    are numbered -2, -3…; they render identical pages, so which row gets
+    which number is not observable
+
+Makes whose names slugify to the same value within a category are resolved
+the same way: the name that sorts first keeps the plain slug, the others
+get a hash of their name. Every slug is checked to be unique.
+
+Output (written by build_crsp_cascade.py):
+  data/slug_index.json      — {"v", "cascade", "makes": {category: {make: slug}},
+                               "overrides": {category: {make: {position: slug}}}}
+                              only makes/entries whose slug isn't plain slugify();
+                              read by plugins/render.js and shipped to the
+                              calculator in the cascade shards
+  data/slug_collisions.json — one record per collision group, for review
+  data/redirects.json       — Vercel redirects from the positional URLs earlier
+                              builds used (/{base}-{position}/) to current ones;
+                              merged into vercel.json by merge_redirects.py
+
+SlugIndex.load() expands this into O(1) lookups both ways:
+  index.make_slug(category, make)    → slug
+  index.model_slugs(category, make)  → [slug per position]
+  index.resolve("suv/toyota/harrier") → (category, make, position)
+"""
+
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from crsp_store import json_default
+from slugs import slugify
+
+DATA_DIR        = Path(__file__).parent.parent / "data"
+SLUG_INDEX_FILE = DATA_DIR / "slug_index.json"
+COLLISIONS_FILE = DATA_DIR / "slug_collisions.json"
+REDIRECTS_FILE  = DATA_DIR / "redirects.json"
+
+FORMAT_VERSION = 3
+
+
+def cascade_digest(cascade):
+    raw = json.dumps(cascade, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=json_default)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def _hash(value):
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:6]
+
+
+def _descriptive(entry):
+    return {k: v for k, v in entry.items() if k != "crsp"}
+
+
+def _content_key(entry):
+    """Order of a collision group's members: by content, never by position."""
+    return (json.dumps(_descriptive(entry), sort_keys=True, ensure_ascii=False), entry["crsp"])
+
+
+def _suffixes(entry):
+    """Candidate (strategy, suffix) pairs for one entry, most readable first."""
+    mn = slugify(entry.get("mn", ""))
+    return ([("mn", mn)] if mn else []) + [("hash", _hash(_descriptive(entry))), ("price", _hash(entry))]
+
+
+def assign_model_slugs(models):
+    """Slug per position for one make's models, plus the collision records."""
+    groups = defaultdict(list)
+    for i, m in enumerate(models):
+        groups[slugify(m["model"]) or "model"].append(i)
+
+    slugs, collisions = [None] * len(models), []
+    taken = set(groups)
+    for base in sorted(groups):
+        idx = sorted(groups[base], key=lambda i: _content_key(models[i]))
+        slugs[idx[0]] = base
+        if len(idx) == 1:
+            continue
+        # A suffix shared by two members can't tell them apart
+        shared = Counter(s for i in idx for s in _suffixes(models[i]))
+        strategies = ["plain"]
+        for i in idx[1:]:
+            candidates = _suffixes(models[i])
+            strategy, suffix = next(
+                ((st, sx) for st, sx in candidates if shared[(st, sx)] == 1 and f"{base}-{sx}" not in taken),
+                candidates[-1],
+            )
+            slug, n = f"{base}-{suffix}", 2
+            if shared[(strategy, suffix)] > 1:
+                # Rows identical down to the price: number them
+                strategy = "duplicate"
+                while slug in taken:
+                    slug, n = f"{base}-{suffix}-{n}", n + 1
+            if slug in taken:
+                raise ValueError(f"no free slug for {models[i]['model']!r}: {slug} is taken")
+            taken.add(slug)
+            slugs[i] = slug
+            strategies.append(strategy)
+        collisions.append({"base": base, "positions": idx, "slugs": [slugs[i] for i in idx],
+                           "strategies": strategies})
+
+    if len(set(slugs)) != len(slugs):
+        raise ValueError(f"duplicate model slugs: {sorted(s for s, n in Counter(slugs).items() if n > 1)}")
+    return slugs, collisions
+
+
+def assign_make_slugs(makes):
+    """{make: slug} for one category's make names, plus the collision records."""
+    groups = defaultdict(list)
+    for make in makes:
+        groups[slugify(make) or "make"].append(make)
+
+    slugs, collisions = {}, []
+    taken = set(groups)
+    for base in sorted(groups):
+        names = sorted(groups[base])
+        slugs[names[0]] = base
+        for make in names[1:]:
+            slug = f"{base}-{_hash(make)}"
+            if slug in taken:
+                raise ValueError(f"no free slug for make {make!r}: {slug} is taken")
+            taken.add(slug)
+            slugs[make] = slug
+        if len(names) > 1:
+            collisions.append({"base": base, "makes": names, "slugs": [slugs[m] for m in names]})
+    return slugs, collisions
+
+
+def _legacy_slugify(s):
+    """slugify() as plugins/render.js had it: a trailing "-" left by a
+    stripped symbol was kept."""
+    return re.sub(r"-+", "-", re.sub(r"\s+", "-", re.sub(r"[^a-z0-9\s-]", "", str(s).lower()))).strip()
+
+
+def legacy_slugs(models):
+    """The positional slugs earlier builds (and the Node renderer) used:
+    slugify(model), or slugify(model)-{position} for every repeat."""
+    seen, slugs = set(), []
+    for i, m in enumerate(models):
+        slug = _legacy_slugify(m["model"]) or f"model-{i}"
+        if slug in seen:
+            slug = f"{slug}-{i}"
+        seen.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def build_slug_index(cascade):
+    make_overrides, overrides, report = {}, {}, []
+    for category, makes in cascade["data"].items():
+        make_slugs, make_collisions = assign_make_slugs(makes)
+        for make, slug in make_slugs.items():
+            if slug != slugify(make):
+                make_overrides.setdefault(category, {})[make] = slug
+        for c in make_collisions:
+            report.append({"category": category, "make_slug": c["base"], "makes": [
+                {"make": m, "slug": s, "strategy": "hash" if k else "plain"}
+                for k, (m, s) in enumerate(zip(c["makes"], c["slugs"]))
+            ]})
+
+        for make, models in makes.items():
+            slugs, collisions = assign_model_slugs(models)
+            for i, (m, slug) in enumerate(zip(models, slugs)):
+                if slug != slugify(m["model"]):
+                    overrides.setdefault(category, {}).setdefault(make, {})[str(i)] = slug
+            for c in collisions:
+                report.append({
+                    "category": category, "make": make, "base": c["base"],
+                    "entries": [
+                        {"slug": slug, "strategy": strategy, "model": models[i]["model"],
+                         "mn": models[i].get("mn"), "crsp": models[i]["crsp"]}
+                        for i, slug, strategy in zip(c["positions"], c["slugs"], c["strategies"])
+                    ],
+                })
+
+    index = {"v": FORMAT_VERSION, "cascade": cascade_digest(cascade), "makes": make_overrides,
+             "overrides": overrides}
+    return index, report
+
+
+def write_slug_index(cascade):
+    index, report = build_slug_index(cascade)
+    SLUG_INDEX_FILE.write_text(json.dumps(index, separators=(",", ":"), ensure_ascii=False))
+    # How each slug in a collision group was chosen, model and make groups alike
+    summary = Counter(e["strategy"] for r in report for e in r.get("entries", r.get("makes")))
+    COLLISIONS_FILE.write_text(json.dumps(
+        {"groups": len(report), "by_strategy": dict(sorted(summary.items())), "collisions": report},
+        indent=1, ensure_ascii=False,
+    ))
+    return index, report
+
+
+def build_redirects(cascade, index):
+    """Vercel redirects from every legacy model URL that no longer exists.
+
+    One rule per model, covering its year pages too (:path*). Compare pages
+    embed two model slugs and are not redirected: there are too many pairs
+    for Vercel's route limit.
+    """
+    lookup = SlugIndex(cascade, index)
+    redirects = []
+    for category, makes in cascade["data"].items():
+        cat_slug = slugify(category)
+        for make, models in makes.items():
+            old_make, make_slug = _legacy_slugify(make), lookup.make_slug(category, make)
+            slugs = lookup.model_slugs(category, make)
+            live = set(slugs) if old_make == make_slug else set()
+            for old, new in zip(legacy_slugs(models), slugs):
+                if old not in live:
+                    redirects.append({
+                        "source":      f"/{cat_slug}/{old_make}/{old}/:path*",
+                        "destination": f"/{cat_slug}/{make_slug}/{new}/:path*",
+                        "permanent":   True,
+                    })
+    return redirects
+
+
+def write_redirects(cascade, index):
+    redirects = build_redirects(cascade, index)
+    REDIRECTS_FILE.write_text(json.dumps(redirects, indent=1, ensure_ascii=False) + "\n")
+    return redirects
+
+
+# ── Lookup ───────────────────────────────────────────────────────────────────
+
+class SlugIndex:
+    def __init__(self, cascade, index):
+        if index.get("v") != FORMAT_VERSION:
+            raise ValueError(f"unsupported slug index version: {index.get('v')}")
+        self._makes = {}
+        self._slugs = {}
+        self._paths = {}
+        for category, makes in cascade["data"].items():
+            cat_slug = slugify(category)
+            self._paths[cat_slug] = (category, None, None)
+            make_extra = index["makes"].get(category, {})
+            for make, models in makes.items():
+                make_slug = self._makes[(category, make)] = make_extra.get(make) or slugify(make)
+                self._paths[f"{cat_slug}/{make_slug}"] = (category, make, None)
+                extra = index["overrides"].get(category, {}).get(make, {})
+                slugs = [extra.get(str(i)) or slugify(m["model"]) for i, m in enumerate(models)]
+                self._slugs[(category, make)] = slugs
+                for i, slug in enumerate(slugs):
+                    self._paths[f"{cat_slug}/{make_slug}/{slug}"] = (category, make, i)
+
+    @classmethod
+    def load(cls, cascade, path=SLUG_INDEX_FILE):
+        """Use the persisted index if it was built from this cascade by this
+        version, else rebuild."""
+        path = Path(path)
+        if path.exists():
+            index = json.loads(path.read_text())
+            if index.get("v") == FORMAT_VERSION and index.get("cascade") == cascade_digest(cascade):
+                return cls(cascade, index)
+        return cls(cascade, build_slug_index(cascade)[0])
+
+    def has_make(self, category, make):
+        return (category, make) in self._makes
+
+    def make_slug(self, category, make):
+        return self._makes[(category, make)]
+
+    def model_slugs(self, category, make):
+        return self._slugs[(category, make)]
+
+    def resolve(self, path):
+        """"suv/toyota/harrier" → (category, make, position); None if unknown."""
+        return self._paths.get(path.strip("/"))
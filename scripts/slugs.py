@@ -0,0 +1,18 @@
+"""
+URL slugs for categories, makes and models.
+
+Shared by generate_pages.py, build_crsp_cascade.py and slug_index.py so none
+of them has to import another just for this. slugify() in plugins/render.js
+and src/calculator.js must produce the same output.
+
+  slugify("Land Cruiser Prado") → "land-cruiser-prado"
+"""
+
+import re
+
+
+def slugify(s):
+    s = str(s).lower()
+    s = re.sub(r"[^a-z0-9\s-]", "", s)
+    s = re.sub(r"[\s]+", "-", s.strip())
+    return re.sub(r"-+", "-", s)
@@ -0,0 +1,66 @@
+"""
+Minimal compiled string templates for high-volume page generation.
+
+A Template is compiled once from source text containing {{slot}} markers
+into alternating static chunks and slot names. bind() fills some slots and
+returns a new Template whose adjacent static chunks are pre-joined, so the
+invariant parts of a page (header, footer, per-model fragments) are
+concatenated once and only the remaining slots are spliced per render.
+
+    page  = Template("<h1>{{model}}</h1><p>{{year}}: {{total}}</p>")
+    model = page.bind(model="Harrier")          # once per model
+    model.render(year=2022, total="KES 1,234")  # once per year page
+
+Values are inserted with str(); escaping is the caller's job.
+
+minify_html() strips the indentation out of template source before it is
+compiled, so a minified Template costs nothing extra per render.
+"""
+
+import re
+
+SLOT_RE = re.compile(r"\{\{(\w+)\}\}")
+
+# Line breaks plus indentation between tags (or a tag and a slot) are pure
+# source formatting; between a tag and text they collapse to one space.
+_TAG_GAP_RE  = re.compile(r"(>|\}\}|^)\s*\n\s*(?=<|\{\{|$)")
+_TEXT_GAP_RE = re.compile(r"\s*\n\s*")
+# Column-aligned attributes: <meta property="og:url"         content=...>
+_ATTR_GAP_RE = re.compile(r'(?<=")  +(?=[\w:-]+=")')
+
+
+def minify_html(source):
+    """Collapse formatting whitespace in template source; slots are kept."""
+    source = _TEXT_GAP_RE.sub(" ", _TAG_GAP_RE.sub(r"\1", source))
+    return _ATTR_GAP_RE.sub(" ", source)
+
+
+class Template:
+    __slots__ = ("chunks", "slots")
+
+    def __init__(self, source=None, *, _parts=None):
+        if _parts is None:
+            pieces = SLOT_RE.split(source)
+            _parts = (pieces[0::2], pieces[1::2])
+        self.chunks, self.slots = _parts  # len(chunks) == len(slots) + 1
+
+    def bind(self, **values):
+        """Fill the given slots now; returns a smaller Template for the rest."""
+        chunks, slots = [self.chunks[0]], []
+        for name, chunk in zip(self.slots, self.chunks[1:]):
+            if name in values:
+                chunks[-1] += str(values[name]) + chunk
+            else:
+                slots.append(name)
+                chunks.append(chunk)
+        return Template(_parts=(chunks, slots))
+
+    def render(self, **values):
+        out = [self.chunks[0]]
+        for name, chunk in zip(self.slots, self.chunks[1:]):
+            out.append(str(values[name]))
+            out.append(chunk)
+        return "".join(out)
+
+    def __repr__(self):
+        return f"Template(slots={self.slots!r})"
@@ -0,0 +1,230 @@
+"""
+Span and counter tracing for the pipeline scripts, written as a Chrome
+trace: open the file in https://ui.perfetto.dev or chrome://tracing.
+
+  tracing.start()                       on when CRSP_TRACE=path.json is set
+  tracing.start("build.trace.json")     or with an explicit path
+  with tracing.span("write shards", category="SUV"):
+      ...
+  tracing.count("bytes_written", n)     running total, drawn as a counter track
+  tracing.finish()                      write the trace
+
+crsp_to_json.py, build_crsp_cascade.py and generate_pages.py take
+--trace PATH (or CRSP_TRACE); pipeline.py --trace PATH collects every stage
+it runs into one file. Spans carry their pid/tid, every span end samples
+peak RSS into a "peak_rss_mb" counter, and the file's otherData holds the
+final counter totals and the peak RSS of the whole run.
+
+Processes: the process that calls start() first owns the trace and sets
+CRSP_TRACE_OWNER for its children. Other traced processes — pipeline
+stages, generate_pages pool workers (call worker_init() in the pool
+initializer, flush() after each unit of work) — append their events to
+"<path>.<pid>.part", and the owner folds those in at finish().
+
+Disabled, span() returns one shared no-op context manager and count() is
+a global check and a return.
+"""
+
+import glob
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+ENV_PATH  = "CRSP_TRACE"
+ENV_OWNER = "CRSP_TRACE_OWNER"
+GAUGES = {"peak_rss_mb"}  # counters that are levels, not running totals
+
+_events = None  # list while tracing, else None
+_totals = {}
+_path = None
+_owner = False
+
+
+def _now():
+    # CLOCK_MONOTONIC: one timeline across every process of the run
+    return time.perf_counter_ns() // 1000
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def enabled():
+    return _events is not None
+
+
+# ── Recording ─────────────────────────────────────────────────────────────
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "ts")
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.ts = _now()
+        return self
+
+    def __exit__(self, *exc):
+        end = _now()
+        pid, tid = os.getpid(), threading.get_native_id()
+        _events.append({"name": self.name, "cat": self.cat, "ph": "X", "ts": self.ts, "dur": end - self.ts,
+                        "pid": pid, "tid": tid, "args": self.args})
+        _events.append({"name": "peak_rss_mb", "ph": "C", "ts": end, "pid": pid,
+                        "args": {"peak_rss_mb": peak_rss_mb()}})
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name, cat="stage", **args):
+    """Context manager timing one block; args show up in the viewer."""
+    if _events is None:
+        return NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def count(name, value=1):
+    """Add value to a per-process running total."""
+    if _events is None:
+        return
+    total = _totals[name] = _totals.get(name, 0) + value
+    _events.append({"name": name, "ph": "C", "ts": _now(), "pid": os.getpid(), "args": {name: total}})
+
+
+def _name_process(label):
+    _events.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": label}})
+
+
+# ── Lifecycle ─────────────────────────────────────────────────────────────
+
+def start(path=None, label=None):
+    """Start tracing to path (default: $CRSP_TRACE); no-op when neither is set."""
+    global _events, _path, _owner
+    path = path or os.environ.get(ENV_PATH)
+    if not path or _events is not None:
+        return
+    _events, _path = [], str(path)
+    _owner = not os.environ.get(ENV_OWNER)
+    if _owner:
+        os.environ[ENV_PATH] = _path
+        os.environ[ENV_OWNER] = str(os.getpid())
+    _name_process(label or os.path.basename(sys.argv[0]) or "python")
+
+
+def worker_init(label=None):
+    """Pool initializer hook: trace this worker if the parent is tracing."""
+    global _events, _totals, _path, _owner
+    if not os.environ.get(ENV_OWNER):
+        return
+    # A forked worker inherits the parent's buffer; start it empty
+    _events, _totals, _path, _owner = [], {}, os.environ[ENV_PATH], False
+    _name_process(label or f"{os.path.basename(sys.argv[0])} worker")
+
+
+def flush():
+    """Non-owner processes: append buffered events to this process's part file."""
+    global _events
+    if _events is None or _owner or not _events:
+        return
+    with open(f"{_path}.{os.getpid()}.part", "a", encoding="utf-8") as f:
+        for event in _events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _events = []
+
+
+def rollup(cat, by):
+    """At finish(), add one span per distinct args[by] of the cat spans.
+
+    Each covers its group's first start to last end, across processes, on
+    its own track: generate_pages times shards ("shard" spans, one per make)
+    and rolls them up by category. Recorded as an event, so it also works
+    from a process that doesn't own the trace.
+    """
+    if _events is not None:
+        _events.append({"name": "rollup", "ph": "M", "pid": os.getpid(), "args": {"cat": cat, "by": by}})
+
+
+def _rolled_up(events, rollups):
+    out = []
+    for marker in rollups:
+        pid, cat, by = marker["pid"], marker["args"]["cat"], marker["args"]["by"]
+        groups = {}
+        for e in events:
+            if e["ph"] == "X" and e.get("cat") == cat and by in e["args"]:
+                groups.setdefault(e["args"][by], []).append(e)
+        if not groups:
+            continue
+        out.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"by {by}"}})
+        for value, spans in groups.items():
+            ts = min(e["ts"] for e in spans)
+            out.append({
+                "name": str(value), "cat": f"{cat} by {by}", "ph": "X", "ts": ts,
+                "dur": max(e["ts"] + e["dur"] for e in spans) - ts, "pid": pid, "tid": 0,
+                "args": {cat: len(spans), "busy_ms": round(sum(e["dur"] for e in spans) / 1000, 1)},
+            })
+    return out
+
+
+def _collect_parts():
+    events = []
+    for part in sorted(glob.glob(glob.escape(_path) + ".*.part")):
+        with open(part, encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f)
+        os.unlink(part)
+    return events
+
+
+def summary(events):
+    """Final counter totals (summed over processes) and peak RSS (max)."""
+    last = {}
+    for e in events:
+        if e["ph"] == "C":
+            for name, value in e["args"].items():
+                last[(e["pid"], name)] = value
+    totals = {}
+    for (_, name), value in last.items():
+        totals[name] = max(totals.get(name, 0), value) if name in GAUGES else totals.get(name, 0) + value
+    return totals
+
+
+def finish():
+    """Write the trace (owner) or this process's part file (everyone else)."""
+    global _events
+    if _events is None:
+        return None
+    if not _owner:
+        flush()
+        _events = None
+        return None
+    events, rollups = [], []
+    for e in _events + _collect_parts():
+        (rollups if e["name"] == "rollup" and e["ph"] == "M" else events).append(e)
+    events += _rolled_up(events, rollups)
+    _events = None
+    totals = summary(events)
+    trace = {
+        "traceEvents": sorted(events, key=lambda e: e.get("ts", 0)),
+        "displayTimeUnit": "ms",
+        "otherData": {"command": " ".join(sys.argv), "counters": totals,
+                      "peak_rss_mb": totals.get("peak_rss_mb")},
+    }
+    with open(_path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, ensure_ascii=False)
+    print(f"Trace: {len(events):,} events → {_path}")
+    return trace
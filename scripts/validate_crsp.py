@@ -0,0 +1,301 @@
+"""
+Data-quality checks over the parsed CRSP sheets, before the cascade build.
+
+crsp_to_json.py keeps whatever the workbook holds and build_crsp_cascade.py
+drops rows it can't categorise with only a count. This stage looks at the
+whole release at once and says what is wrong with it:
+
+  invalid_value       engine_cc / gvw / seating that isn't a number and
+                      can't be read as one ("HEAVY DUTY TRUCK", "480 HP",
+                      "1130(1045)"). Values that coerce cleanly ("2000cc",
+                      "2100 kg", "5 seat") and battery sizes in the cc
+                      column ("EV", "(84Kwh)") are counted, not flagged.
+  bad_price           CRSP of zero or less
+  unknown_body_type   body types CATEGORY_MAP doesn't know (these rows are
+                      left out of the cascade)
+  junk_body_type      body types that are mapped but don't look like a
+                      body type (no letters, or stray symbols: "3",
+                      "PRIM£ MOVER") — worth fixing in the workbook
+  crsp_outlier        prices far from the rest of their make / model
+                      family ("Toyota Land ..."): robust z-score of log
+                      CRSP over OUTLIER_Z, in families of OUTLIER_MIN_GROUP+
+  duplicate_conflict  rows with the same make, model and model number but
+                      different CRSP values
+
+Each check works on whole columns: categorical fields are classified once
+per distinct value (crsp_store code tables) and counted with NumPy over the
+code arrays; grouping is np.unique over stacked code columns.
+
+Output: data/validation_report.json — per check its severity, row count,
+threshold and up to MAX_EXAMPLES example rows. The run fails (exit 1) when
+any check's row count is over its threshold; THRESHOLDS holds the defaults,
+--max check=N (rows) or check=N% (of all rows) overrides one.
+
+Run: python3 scripts/validate_crsp.py [--max crsp_outlier=20] [--quiet]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+from build_crsp_cascade import CATEGORY_MAP
+from crsp_store import CODES, CrspStore
+
+DATA_DIR    = Path(__file__).parent.parent / "data"
+REPORT_FILE = DATA_DIR / "validation_report.json"
+FORMAT_VERSION = 1
+
+# Most rows a check may flag before the build fails (July 2025: 5,742 rows)
+THRESHOLDS = {
+    "invalid_value":      120,
+    "bad_price":          0,
+    "unknown_body_type":  100,
+    "junk_body_type":     60,
+    "crsp_outlier":       60,
+    "duplicate_conflict": 600,
+}
+SEVERITY = {
+    "invalid_value": "warning", "bad_price": "error", "unknown_body_type": "error",
+    "junk_body_type": "warning", "crsp_outlier": "warning", "duplicate_conflict": "warning",
+}
+
+NUMERIC_FIELDS = ("engine_cc", "gvw", "seating")
+OUTLIER_Z = 6.0
+OUTLIER_MIN_GROUP = 5
+MAX_EXAMPLES = 20
+
+# Value classes for the numeric fields
+MISSING, NUMBER, COERCED, BATTERY, INVALID = range(5)
+CLASS_NAMES = ("missing", "number", "coerced", "battery", "invalid")
+_COERCIBLE_RE = re.compile(r"\d[\d,]*(\.\d+)?\s*(cc|kg|seats?)?", re.I)
+_BATTERY_RE = re.compile(r"\(?\s*(ev|[\d.]+(\s*[–-]\s*[\d.]+)?\s*kwh)\s*\)?", re.I)
+_BODY_RE = re.compile(r"[A-Za-z][A-Za-z ./-]*")
+
+
+def classify(value):
+    if value is None:
+        return MISSING
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return NUMBER
+    text = str(value).strip()
+    if _COERCIBLE_RE.fullmatch(text):
+        return COERCED
+    if _BATTERY_RE.fullmatch(text):
+        return BATTERY
+    return INVALID
+
+
+# ── Columns ───────────────────────────────────────────────────────────────
+
+def lookup(field, fn, dtype=np.int8):
+    """fn applied once per code of CODES[field], as an array indexable by code."""
+    return np.array([fn(v) for v in CODES[field].values], dtype=dtype)
+
+
+def factorize(values):
+    """Integer id per value (equal values, equal ids)."""
+    ids = {}
+    return np.fromiter((ids.setdefault(v, len(ids)) for v in values), dtype=np.int64, count=len(values))
+
+
+class Columns:
+    """Both sheets stacked into NumPy columns, with a row → (sheet, index) map."""
+
+    def __init__(self, store):
+        sheets = store.sheets()
+        self.sheet, self.index = [], []
+        codes, text, prices = {}, {}, []
+        for kind, sheet in sheets.items():
+            n = len(sheet)
+            self.sheet += [kind] * n
+            self.index += range(n)
+            for field in CODES:
+                column = sheet.codes(field) if field in sheet.fields else [0] * n
+                codes.setdefault(field, []).append(np.asarray(column, dtype=np.int64))
+            for field in ("model", "model_number"):
+                text.setdefault(field, []).extend(sheet.codes(field))
+            prices.append(np.frombuffer(sheet.codes("crsp_kes"), dtype=np.int64))
+        self.codes = {field: np.concatenate(parts) for field, parts in codes.items()}
+        self.text = text
+        self.crsp = np.concatenate(prices)
+        self.sheets = sheets
+        self.n = len(self.crsp)
+        self.is_vehicle = np.array([kind == "vehicle" for kind in self.sheet])
+
+    def row(self, i):
+        kind = self.sheet[i]
+        return {"sheet": kind, "row": self.index[i], **self.sheets[kind].row(self.index[i])}
+
+
+# ── Checks ────────────────────────────────────────────────────────────────
+# Each returns (flagged row ids, extra report fields).
+
+def check_invalid_value(cols):
+    flagged, summary = np.zeros(cols.n, dtype=bool), {}
+    for field in NUMERIC_FIELDS:
+        classes = lookup(field, classify)[cols.codes[field]]
+        counts = np.bincount(classes, minlength=len(CLASS_NAMES))
+        summary[field] = dict(zip(CLASS_NAMES, counts.tolist()))
+        flagged |= classes == INVALID
+    return np.flatnonzero(flagged), {"by_field": summary}
+
+
+def check_bad_price(cols):
+    return np.flatnonzero(cols.crsp <= 0), {}
+
+
+def _body_rows(cols, test):
+    """Vehicle rows whose body type fails test, and a count per body type."""
+    bad = lookup("body_type", test, dtype=bool)[cols.codes["body_type"]] & cols.is_vehicle
+    rows = np.flatnonzero(bad)
+    values, counts = np.unique(cols.codes["body_type"][rows], return_counts=True)
+    names = CODES["body_type"].values
+    return rows, {"values": {str(names[v]): int(c) for v, c in zip(values.tolist(), counts.tolist())}}
+
+
+def check_unknown_body_type(cols):
+    return _body_rows(cols, lambda body: not (body and CATEGORY_MAP.get(body.strip())))
+
+
+def check_junk_body_type(cols):
+    return _body_rows(cols, lambda body: bool(body and CATEGORY_MAP.get(body.strip()))
+                      and not _BODY_RE.fullmatch(body.strip()))
+
+
+def check_crsp_outlier(cols):
+    family = factorize([(m.split() or [""])[0].upper() for m in cols.text["model"]])
+    sheet = factorize(cols.sheet)
+    _, group = np.unique(np.stack([sheet, cols.codes["make"], family]), axis=1, return_inverse=True)
+    group = group.ravel()
+    logp = np.log(np.maximum(cols.crsp, 1).astype(np.float64))
+
+    order = np.argsort(group, kind="stable")
+    bounds = np.flatnonzero(np.diff(group[order])) + 1
+    z = np.zeros(cols.n)
+    for members in np.split(order, bounds):
+        if len(members) < OUTLIER_MIN_GROUP:
+            continue
+        values = logp[members]
+        median = np.median(values)
+        mad = np.median(np.abs(values - median)) * 1.4826
+        if mad > 0:
+            z[members] = np.abs(values - median) / mad
+    rows = np.flatnonzero(z > OUTLIER_Z)
+    rows = rows[np.argsort(-z[rows])]
+    return rows, {"z": [round(float(z[r]), 1) for r in rows[:MAX_EXAMPLES]]}  # per example
+
+
+def check_duplicate_conflict(cols):
+    if cols.n == 0:  # no groups: group.max() below would raise
+        return np.zeros(0, dtype=np.intp), {"groups": 0}
+    numbered = np.array([bool(mn) for mn in cols.text["model_number"]])
+    key = np.stack([
+        factorize(cols.sheet), cols.codes["make"],
+        factorize(cols.text["model"]), factorize(cols.text["model_number"]),
+    ])
+    _, group = np.unique(key, axis=1, return_inverse=True)
+    group = group.ravel()
+    groups = group.max() + 1
+    # Groups whose rows don't all share one price
+    lowest = np.full(groups, np.iinfo(np.int64).max)
+    highest = np.zeros(groups, dtype=np.int64)
+    np.minimum.at(lowest, group, cols.crsp)
+    np.maximum.at(highest, group, cols.crsp)
+    conflict = (lowest != highest)[group] & numbered
+    rows = np.flatnonzero(conflict)
+    # Group members together, groups in order of their first row (not of their
+    # np.unique id, which follows the category codes)
+    first = np.full(groups, cols.n)
+    np.minimum.at(first, group, np.arange(cols.n))
+    rows = rows[np.argsort(first[group[rows]], kind="stable")]
+    return rows, {"groups": int(len(np.unique(group[rows])))}
+
+
+CHECKS = {
+    "invalid_value":      check_invalid_value,
+    "bad_price":          check_bad_price,
+    "unknown_body_type":  check_unknown_body_type,
+    "junk_body_type":     check_junk_body_type,
+    "crsp_outlier":       check_crsp_outlier,
+    "duplicate_conflict": check_duplicate_conflict,
+}
+
+
+# ── Report ────────────────────────────────────────────────────────────────
+
+def validate(store, thresholds=THRESHOLDS):
+    """Run every check; returns the report dict (report["failed"] lists failed checks)."""
+    cols = Columns(store)
+    checks, failed = {}, []
+    for name, check in CHECKS.items():
+        rows, extra = check(cols)
+        limit = thresholds.get(name)
+        ok = limit is None or len(rows) <= limit
+        checks[name] = {
+            "severity": SEVERITY[name], "rows": int(len(rows)), "threshold": limit, "ok": ok,
+            **extra,
+            "examples": [cols.row(int(i)) for i in rows[:MAX_EXAMPLES]],
+        }
+        if not ok:
+            failed.append(name)
+    return {
+        "v": FORMAT_VERSION,
+        "rows": {kind: len(sheet) for kind, sheet in cols.sheets.items()},
+        "checks": checks,
+        "failed": failed,
+    }
+
+
+def parse_threshold(spec, total):
+    name, _, value = spec.partition("=")
+    if name not in CHECKS or not value:
+        raise argparse.ArgumentTypeError(f"expected CHECK=N or CHECK=N%, CHECK one of {', '.join(CHECKS)}")
+    try:
+        if value.endswith("%"):
+            return name, int(total * float(value[:-1]) / 100)
+        return name, int(value)
+    except (ValueError, OverflowError):  # "abc", "inf%"
+        raise argparse.ArgumentTypeError(f"{name}: expected a number of rows or a percentage, got {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the parsed CRSP data; exit 1 over thresholds.")
+    parser.add_argument("--max", action="append", default=[], metavar="CHECK=N",
+                        help="row limit for one check, N rows or N%% of all rows (repeatable)")
+    parser.add_argument("--report", type=Path, default=REPORT_FILE)
+    parser.add_argument("--quiet", action="store_true", help="only print failures")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    store = CrspStore.load(DATA_DIR)
+    total = len(store.vehicles) + len(store.motorcycles)
+    thresholds = dict(THRESHOLDS)
+    for spec in args.max:
+        try:
+            name, limit = parse_threshold(spec, total)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        thresholds[name] = limit
+
+    report = validate(store, thresholds)
+    seconds = time.perf_counter() - t0
+    args.report.write_text(json.dumps(report, indent=1, ensure_ascii=False))
+
+    if not args.quiet:
+        print(f"Validated {total:,} rows in {seconds * 1000:.0f} ms")
+        for name, check in report["checks"].items():
+            mark = "ok  " if check["ok"] else "FAIL"
+            print(f"  {mark} {name:<20} {check['rows']:>5} rows  (max {check['threshold']}, {check['severity']})")
+        print(f"Written → {os.path.relpath(args.report)}")
+    if report["failed"]:
+        raise SystemExit(f"Validation failed: {', '.join(report['failed'])} over threshold (see {os.path.relpath(args.report)})")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Streaming .xlsx reader for the CRSP workbook, without openpyxl.
+
+Even with read_only=True, openpyxl builds an ElementTree element and a cell
+dict for every cell of every row, then the parsers throw most columns away.
+This reader runs expat straight over the sheet XML inside the zip, keeps
+only the columns it is asked for (max_col) and converts just those values.
+
+It covers the slice of openpyxl's API that crsp_to_json.py uses:
+
+  wb = XlsxReader(path)
+  wb.sheetnames, wb[name]
+  ws.iter_rows(min_row=1, max_row=None, max_col=None, values_only=True)
+  wb.close()
+
+Values come out as openpyxl gives them with data_only=True: shared and
+inline strings, numbers as int or float by the same rule, booleans, error
+strings ("#N/A"), and datetimes for numbers in cells with a date format.
+Missing rows and cells are None-filled up to max_col (or the sheet's
+<dimension>), as in openpyxl's read-only mode.
+
+Use it with: python3 scripts/crsp_to_json.py --fast
+Timing vs openpyxl: python3 scripts/bench_xlsx_reader.py
+"""
+
+import datetime
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+CHUNK_BYTES = 1 << 16
+SHEET_TAGS = ("row", "c", "v", "is", "t", "rPh", "dimension")
+_ROOT_RE = re.compile(rb"<([\w.-]+:)?worksheet[\s>]")
+
+# Built-in number formats openpyxl treats as dates (46 is a duration)
+BUILTIN_DATE_FORMATS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+BUILTIN_TIMEDELTA_FORMATS = {46}
+# Same tests as openpyxl.styles.numbers.is_date_format / is_timedelta_format
+_STRIP_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_RE = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+_TIMEDELTA_RE = re.compile(r"\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?", re.I)
+
+WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+MAC_EPOCH = datetime.datetime(1904, 1, 1)
+
+
+def _local(name):
+    """Tag without its namespace prefix ("x:row" → "row")."""
+    return name[name.find(":") + 1:]
+
+
+def _column_index(ref, cache={}):
+    """"AB12" → 28 (1-based column of a cell reference)."""
+    letters = ref.rstrip("0123456789")
+    col = cache.get(letters)
+    if col is None:
+        col = 0
+        for ch in letters:
+            col = col * 26 + ord(ch) - 64
+        cache[letters] = col
+    return col
+
+
+def _cast_number(text):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def _from_excel(value, epoch, timedelta=False):
+    """Excel serial → datetime / time / timedelta, as openpyxl.utils.datetime.from_excel."""
+    if timedelta:
+        td = datetime.timedelta(days=value)
+        if td.microseconds:
+            td = datetime.timedelta(seconds=td.total_seconds() // 1, microseconds=round(td.microseconds, -3))
+        return td
+    day, fraction = divmod(value, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        seconds, microseconds = divmod(diff.seconds * 10**6 + diff.microseconds, 10**6)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        return datetime.time(hour, minute, second, microseconds)
+    if 0 < value < 60 and epoch == WINDOWS_EPOCH:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + diff
+
+
+# ── Workbook ──────────────────────────────────────────────────────────────
+
+class XlsxReader:
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path)
+        workbook = ET.fromstring(self._zip.read("xl/workbook.xml"))
+        rels = ET.fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        targets, self._shared_strings_path, self._styles_path = {}, None, None
+        for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+            target = rel.get("Target")
+            target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+            kind = rel.get("Type").rsplit("/", 1)[-1]
+            targets[rel.get("Id")] = target
+            if kind == "sharedStrings":
+                self._shared_strings_path = target
+            elif kind == "styles":
+                self._styles_path = target
+
+        self._sheets = {
+            sheet.get("name"): targets[sheet.get(f"{REL_NS}id")]
+            for sheet in workbook.iter(f"{MAIN_NS}sheet")
+        }
+        props = workbook.find(f"{MAIN_NS}workbookPr")
+        date1904 = props is not None and props.get("date1904") in ("1", "true")
+        self.epoch = MAC_EPOCH if date1904 else WINDOWS_EPOCH
+        self._strings = None
+        self._date_styles = None
+
+    @property
+    def sheetnames(self):
+        return list(self._sheets)
+
+    def __getitem__(self, name):
+        return XlsxSheet(self, self._sheets[name])
+
+    def close(self):
+        self._zip.close()
+
+    # Loaded on first use and shared by every sheet
+    @property
+    def shared_strings(self):
+        if self._strings is None:
+            self._strings = read_shared_strings(self._zip, self._shared_strings_path) \
+                if self._shared_strings_path else []
+        return self._strings
+
+    @property
+    def date_styles(self):
+        """({style index with a date format}, {... with a duration format})."""
+        if self._date_styles is None:
+            self._date_styles = read_date_styles(self._zip, self._styles_path) \
+                if self._styles_path else (set(), set())
+        return self._date_styles
+
+
+def read_shared_strings(zf, path):
+    """Plain text of every <si>: its <t> plus the <t> of each rich-text run, no phonetic runs."""
+    strings, parts = [], []
+    state = {"collect": False, "phonetic": 0}
+
+    def start(name, attrs):
+        name = _local(name)
+        if name == "t":
+            state["collect"] = not state["phonetic"]
+        elif name == "rPh":
+            state["phonetic"] += 1
+
+    def end(name):
+        name = _local(name)
+        if name == "t":
+            state["collect"] = False
+        elif name == "rPh":
+            state["phonetic"] -= 1
+        elif name == "si":
+            strings.append("".join(parts).replace("x005F_", ""))
+            parts.clear()
+
+    def text(data):
+        if state["collect"]:
+            parts.append(data)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler, parser.EndElementHandler, parser.CharacterDataHandler = start, end, text
+    with zf.open(path) as f:
+        parser.ParseFile(f)
+    return strings
+
+
+def read_date_styles(zf, path):
+    styles = ET.fromstring(zf.read(path))
+    custom = {int(f.get("numFmtId")): f.get("formatCode") for f in styles.iter(f"{MAIN_NS}numFmt")}
+    dates, durations = set(), set()
+    xfs = styles.find(f"{MAIN_NS}cellXfs")
+    for idx, xf in enumerate(xfs if xfs is not None else []):
+        fmt_id = int(xf.get("numFmtId", 0))
+        if fmt_id in custom:
+            fmt = custom[fmt_id].split(";")[0]
+            if _DATE_RE.search(_STRIP_RE.sub("", fmt)):
+                dates.add(idx)
+            if _TIMEDELTA_RE.search(fmt):
+                durations.add(idx)
+        else:
+            if fmt_id in BUILTIN_DATE_FORMATS:
+                dates.add(idx)
+            if fmt_id in BUILTIN_TIMEDELTA_FORMATS:
+                durations.add(idx)
+    return dates, durations
+
+
+# ── Sheets ────────────────────────────────────────────────────────────────
+
+class XlsxSheet:
+    def __init__(self, workbook, path):
+        self.workbook = workbook
+        self.path = path
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None, values_only=True):
+        """Row tuples of cell values from min_row, columns 1..max_col."""
+        if not values_only:
+            raise ValueError("XlsxSheet only reads values (values_only=True)")
+        rows = self._parse_rows(max_col)
+        counter = min_row
+        width = None
+        try:
+            for r, cells, width in rows:
+                if max_row is not None and r > max_row:
+                    break
+                if r < min_row:
+                    continue
+                empty = (None,) * width
+                while counter < r:  # rows missing from the XML
+                    counter += 1
+                    yield empty
+                counter += 1
+                yield cells
+        finally:
+            rows.close()
+
+    def _parse_rows(self, max_col):
+        """(row number, value tuple, width) for each <row>, streamed from the zip."""
+        wb = self.workbook
+        strings = wb.shared_strings
+        date_styles, duration_styles = wb.date_styles
+        epoch = wb.epoch
+        done = []
+        tags = {}  # qualified tag → local name, for the tags we care about
+        width = max_col
+        row_num = col = phonetic = 0
+        cells = None
+        keep = collect = inline = False
+        kind, style, text = "n", 0, []
+
+        def start(name, attrs):
+            nonlocal width, row_num, col, cells, keep, collect, inline, phonetic, kind, style, text
+            tag = tags.get(name)
+            if tag == "c":
+                ref = attrs.get("r")
+                col = _column_index(ref) if ref else col + 1
+                keep = not width or col <= width
+                if keep:
+                    kind = attrs.get("t", "n")
+                    style = int(attrs.get("s", 0))
+                    text = []
+            elif not keep:
+                if tag == "row":
+                    r = attrs.get("r")
+                    row_num = int(float(r)) if r else row_num + 1
+                    col = 0
+                    cells = [None] * width if width else []
+                elif tag == "dimension" and not width:
+                    width = _column_index(attrs.get("ref", "A1").split(":")[-1])
+            elif tag == "v":
+                collect = kind != "inlineStr"
+            elif tag == "is":
+                inline = True
+            elif tag == "t":
+                collect = inline and not phonetic
+            elif tag == "rPh":
+                phonetic += 1
+
+        def chars(data):
+            if collect:
+                text.append(data)
+
+        def end(name):
+            nonlocal keep, collect, inline, phonetic
+            tag = tags.get(name)
+            if tag == "c":
+                if keep:
+                    if col > len(cells):
+                        cells.extend([None] * (col - len(cells)))
+                    cells[col - 1] = convert()
+                    keep = False
+            elif tag == "v" or tag == "t":
+                collect = False
+            elif tag == "is":
+                inline = False
+            elif tag == "rPh":
+                phonetic -= 1
+            elif tag == "row":
+                n = width or len(cells)
+                if len(cells) < n:
+                    cells.extend([None] * (n - len(cells)))
+                done.append((row_num, tuple(cells), n))
+
+        def convert():
+            raw = "".join(text)
+            if kind == "inlineStr":
+                return raw if text else None
+            if not raw:
+                return None
+            if kind == "n":
+                value = _cast_number(raw)
+                if style in date_styles:
+                    try:
+                        return _from_excel(value, epoch, timedelta=style in duration_styles)
+                    except (OverflowError, ValueError):
+                        return "#VALUE!"
+                return value
+            if kind == "s":
+                return strings[int(raw)]
+            if kind == "b":
+                return bool(int(raw))
+            if kind == "d":
+                return datetime.datetime.fromisoformat(raw)
+            return raw  # "str" (formula result) and "e" (error) stay text
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler, parser.EndElementHandler, parser.CharacterDataHandler = start, end, chars
+        with wb._zip.open(self.path) as f:
+            while True:
+                chunk = f.read(CHUNK_BYTES)
+                if not tags:
+                    # Sheets are usually unprefixed, but "x:row" etc. is legal
+                    m = _ROOT_RE.search(chunk)
+                    prefix = m.group(1).decode() if m and m.group(1) else ""
+                    tags.update((prefix + t, t) for t in SHEET_TAGS)
+                parser.Parse(chunk, not chunk)
+                yield from done
+                done.clear()
+                if not chunk:
+                    break
@@ -2,8 +2,11 @@
  * Duty Check — KRA Import Duty Calculator
  * Cascade: Vehicle Type → Make → Model → Year → auto-calculate
  * Uses only safe DOM methods (no innerHTML with data).
+ * Category data is fetched per category on first click (see cascade.js).
  */
 
+import { createCascadeLoader } from "./cascade.js";
+
 // ── Constants ─────────────────────────────────────────────────────────────
 
 const CURRENT_YEAR = new Date().getFullYear();
@@ -88,23 +91,17 @@ function captureRefs() {
 function slugify(s) {
   return String(s).toLowerCase()
     .replace(/[^a-z0-9\s-]/g, "")
+    .trim()
     .replace(/\s+/g, "-")
-    .replace(/-+/g, "-")
-    .trim();
+    .replace(/-+/g, "-");
 }
 
-// Assign each model a de-duplicated slug, mirroring buildModelIndex in
-// plugins/render.js / scripts/generate_pages.js so client-built vehicle
-// URLs (e.g. the WhatsApp share link) match the generated static pages
-// even when two trims in a make slugify to the same value.
+// Give each model its page slug, mirroring buildModelIndex in
+// plugins/render.js so client-built vehicle URLs (e.g. the WhatsApp share
+// link) match the generated static pages. Entries whose slug isn't plain
+// slugify(model), e.g. two trims of one name, carry it from the shard.
 function buildModelIndex(models) {
-  const seen = {};
-  return models.map((m, i) => {
-    let slug = slugify(m.model) || `model-${i}`;
-    if (seen[slug] !== undefined) slug = `${slug}-${i}`;
-    seen[slug] = i;
-    return { ...m, slug };
-  });
+  return models.map((m) => (m.slug ? m : { ...m, slug: slugify(m.model) }));
 }
 
 // ── Collapsible section helpers ───────────────────────────────────────────
@@ -146,7 +143,9 @@ function makeHeaderClickable(id) {
 
 // ── State ─────────────────────────────────────────────────────────────────
 
-let crspData      = null;
+const cascade     = createCascadeLoader();
+let categories    = null;  // category names in display order, from the shard manifest
+let categoryData  = null;  // { make: [models] } of selectedCat
 let selectedCat   = null;
 let selectedMake  = null;
 let selectedModel = null;
@@ -166,9 +165,8 @@ export async function initCalculator() {
   // Reset any state carried over from a previous visit (JS runtime persists across Turbo visits).
   selectedCat = selectedMake = selectedModel = selectedYear = null;
 
-  if (!crspData) {
-    const res = await fetch("/data/crsp_cascade.json");
-    crspData  = await res.json();
+  if (!categories) {
+    categories = (await cascade.getManifest()).categories;
   }
 
   renderCategories();
@@ -201,7 +199,7 @@ function parseSvg(svgStr) {
 function renderCategories() {
   clear(categoryGrid);
 
-  for (const cat of crspData.categories) {
+  for (const cat of categories) {
     const catSlug = slugify(cat);
 
     const btn = document.createElement("button");
@@ -239,7 +237,7 @@ function renderCategories() {
   }
 }
 
-function selectCategory(cat, activeBtn) {
+async function selectCategory(cat, activeBtn) {
   selectedCat  = cat;
   selectedMake = selectedModel = selectedYear = null;
 
@@ -250,9 +248,20 @@ function selectCategory(cat, activeBtn) {
   activeBtn.classList.remove("border-border", "bg-surface-2", "text-text-muted");
   activeBtn.classList.add("border-amber", "bg-amber/10", "text-amber");
 
+  // This category's shard (fetched on first click, then memoised)
+  let makes;
+  try {
+    makes = await cascade.getCategory(cat);
+  } catch (err) {
+    console.error(err);
+    return;
+  }
+  if (selectedCat !== cat) return; // another category was picked while this one loaded
+  categoryData = makes;
+
   // Render make chips
   clear(makeGrid);
-  Object.keys(crspData.data[cat]).sort().forEach(make => {
+  Object.keys(makes).sort().forEach(make => {
     const chip = el("button", {
       cls:  "px-4 py-1.5 rounded-full border-2 text-sm font-medium transition-all border-border bg-surface-2 text-text-muted hover:border-amber hover:bg-amber/10 hover:text-amber",
       text: make,
@@ -296,7 +305,7 @@ function selectMake(make, activeChip) {
   activeChip.classList.add("border-amber", "bg-amber/10", "text-amber");
 
   // Render model chips (indexed so each carries its de-duplicated slug)
-  const models = buildModelIndex(crspData.data[selectedCat][make]);
+  const models = buildModelIndex(categoryData[make]);
   clear(modelGrid);
   models.forEach(m => {
     const chip = document.createElement("button");
@@ -441,7 +450,8 @@ function selectYear(year, activeBtn) {
   // model slug (matches the generated pages). Turbo makes this an instant
   // client-side visit; falls back to a full load if Turbo isn't present.
   const modelSlug = selectedModel.slug || slugify(selectedModel.model);
-  const path = `/${slugify(selectedCat)}/${slugify(selectedMake)}/${modelSlug}/${selectedYear}/`;
+  const makeSlug  = cascade.makeSlug(selectedCat, selectedMake) || slugify(selectedMake);
+  const path = `/${slugify(selectedCat)}/${makeSlug}/${modelSlug}/${selectedYear}/`;
   if (window.Turbo && typeof window.Turbo.visit === "function") {
     window.Turbo.visit(path);
   } else {
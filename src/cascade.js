@@ -0,0 +1,104 @@
+/**
+ * Duty Check — CRSP cascade data helpers
+ *
+ * decodeCascade() decodes the columnar encoding (format documented in
+ * scripts/cascade_codec.py) back into the
+ * { categories, data: { category: { make: [entry, ...] } } } shape the
+ * calculator consumes. createCascadeLoader() fetches per-category shards,
+ * each one columnar-encoded, on demand.
+ */
+
+const FORMAT_VERSION = 1;
+
+export function decodeCascade(col) {
+  if (col.v !== FORMAT_VERSION) {
+    throw new Error(`Unsupported columnar cascade version: ${col.v}`);
+  }
+
+  const ccText = new Map();
+  for (let k = 0; k < col.cc_text.length; k += 2) ccText.set(col.cc_text[k], col.cc_text[k + 1]);
+
+  const data = {};
+  let pos = 0;
+  col.categories.forEach((category, c) => {
+    const makes = (data[category] = {});
+    for (let g = col.cat_index[c]; g < col.cat_index[c + 1]; g++) {
+      const count  = col.groups[2 * g + 1];
+      const models = (makes[col.makes[col.groups[2 * g]]] = new Array(count));
+      for (let k = 0; k < count; k++) {
+        const i = pos + k;
+        const entry = { model: col.model[i], crsp: col.crsp[i] };
+        if (col.mn[i]) entry.mn = col.mn[i];
+        const cc = col.cc[i] || ccText.get(i);
+        if (cc) entry.cc = cc;
+        if (col.fuel[i]) entry.fuel = col.fuels[col.fuel[i] - 1];
+        if (col.tx[i])   entry.tx   = col.txs[col.tx[i] - 1];
+        models[k] = entry;
+      }
+      pos += count;
+    }
+  });
+
+  return { categories: col.categories, data };
+}
+
+// ── Lazy per-category loading ─────────────────────────────────────────────
+// public/data/cascade/manifest.json lists categories and their content-hashed
+// shard files (written by scripts/build_crsp_cascade.py). Each shard is
+// fetched on first use and memoised, so clicking "SUV" never downloads
+// Motorcycle data. A failed fetch is not memoised, so the next call retries.
+
+// A shard's "slugs" ({ make: { position: slug } }, from scripts/slug_index.py)
+// set .slug on the entries whose page URL isn't plain slugify(model).
+function withSlugs(makes, slugs = {}) {
+  for (const [make, positions] of Object.entries(slugs)) {
+    for (const [i, slug] of Object.entries(positions)) makes[make][i].slug = slug;
+  }
+  return makes;
+}
+
+async function fetchJson(url) {
+  const res = await fetch(url);
+  if (!res.ok) throw new Error(`${url}: HTTP ${res.status}`);
+  return res.json();
+}
+
+export function createCascadeLoader(base = "/data/cascade") {
+  let manifest = null;
+  const shards = new Map();
+  const makeSlugs = new Map(); // category → { make: slug } for makes whose slug isn't plain slugify(make)
+
+  async function getManifest() {
+    if (!manifest) {
+      manifest = fetchJson(`${base}/manifest.json`).catch((err) => {
+        manifest = null;
+        throw err;
+      });
+    }
+    return manifest;
+  }
+
+  async function getCategory(category) {
+    if (!shards.has(category)) {
+      const { shards: files } = await getManifest();
+      if (!files[category]) throw new Error(`Unknown category: ${category}`);
+      const shard = fetchJson(`${base}/${files[category].file}`)
+        .then((col) => {
+          makeSlugs.set(category, col.make_slugs || {});
+          return withSlugs(decodeCascade(col).data[category], col.slugs);
+        });
+      shards.set(category, shard.catch((err) => {
+        shards.delete(category);
+        throw err;
+      }));
+    }
+    return shards.get(category);
+  }
+
+  // Page slug of a make in a loaded category, if it isn't plain slugify(make)
+  function makeSlug(category, make) {
+    return makeSlugs.get(category)?.[make];
+  }
+
+  return { getManifest, getCategory, makeSlug };
+}